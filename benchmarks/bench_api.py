@@ -0,0 +1,99 @@
+"""Throughput and latency of the API methods and parsers against a fake inverter.
+
+    python benchmarks/bench_api.py [--requests 500] [--latency 0.005] [--jitter 0.002]
+                                   [--error-rate 0.0] [--concurrency 2]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from python_solarfrontier.api import SolarFrontierAPI  # noqa: E402
+from python_solarfrontier.fake_inverter import FakeInverter, default_payloads  # noqa: E402
+from python_solarfrontier.const import (  # noqa: E402
+    PATH_MEASUREMENTS,
+    PATH_SYSTEM_INFO,
+    PATH_YIELD_TOTAL
+)
+from python_solarfrontier.utils import SolarFrontierWebInfoParser  # noqa: E402
+
+METHODS = (
+    'get_system_info',
+    'get_measurements',
+    'get_yield_day',
+    'get_yield_month',
+    'get_yield_year',
+    'get_yield_total',
+    'get_snapshot',
+)
+
+
+def _report(name: str, timings: list, elapsed: float) -> None:
+    cuts = statistics.quantiles(timings, n=100)
+    print(
+        f'{name:22} {len(timings) / elapsed:10.0f}/s '
+        f'p50 {cuts[49] * 1000:8.3f} ms  p99 {cuts[98] * 1000:8.3f} ms'
+    )
+
+
+async def _bench_method(api: SolarFrontierAPI, name: str, requests: int, concurrency: int) -> None:
+    method = getattr(api, name)
+    timings = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call():
+        async with semaphore:
+            started = time.perf_counter()
+            await method()
+            timings.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(call() for _ in range(requests)))
+    _report(name, timings, time.perf_counter() - started)
+
+
+def _bench_parsers(number: int) -> None:
+    payloads = default_payloads()
+    cases = (
+        ('parse_system_info', SolarFrontierWebInfoParser.parse_system_info, payloads[PATH_SYSTEM_INFO]),
+        ('parse_measurements', SolarFrontierWebInfoParser.parse_measurements, payloads[PATH_MEASUREMENTS]),
+        ('parse_yield', SolarFrontierWebInfoParser.parse_yield, payloads[PATH_YIELD_TOTAL]),
+    )
+    for name, parse, payload in cases:
+        timings = []
+        started = time.perf_counter()
+        for _ in range(number):
+            call_started = time.perf_counter()
+            parse(payload)
+            timings.append(time.perf_counter() - call_started)
+        _report(name, timings, time.perf_counter() - started)
+
+
+async def main(args) -> None:
+    inverter = FakeInverter(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, seed=0)
+    await inverter.start()
+    api = SolarFrontierAPI(inverter.url)
+    print(f'{args.requests} requests per method, {args.concurrency} concurrent, '
+          f'latency {args.latency * 1000:.1f}+{args.jitter * 1000:.1f} ms, '
+          f'error rate {args.error_rate:.0%}')
+    for name in METHODS:
+        await _bench_method(api, name, args.requests, args.concurrency)
+    await api.close()
+    await inverter.stop()
+    _bench_parsers(args.requests * 20)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0.005)
+    parser.add_argument('--jitter', type=float, default=0.002)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--concurrency', type=int, default=2)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,73 @@
+"""Measure the TCP handshake cost per poll with and without connection reuse.
+
+Starts a local web server serving the inverter paths and polls it with
+`get_snapshot()`. The "before" run closes every connection after use, which
+is what happens when the poll interval outlives aiohttp's default 15 second
+keep-alive. The "after" run keeps connections alive between polls.
+
+    python benchmarks/bench_connection.py [--polls 200] [--accept-delay 0.002]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import aiohttp
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from python_solarfrontier.api import SolarFrontierAPI  # noqa: E402
+from python_solarfrontier.connection import ConnectionOptions  # noqa: E402
+from python_solarfrontier.fake_inverter import FakeInverter  # noqa: E402
+
+
+async def _poll(url: str, options: ConnectionOptions, polls: int) -> dict:
+    stats = {'connections': 0, 'connect_time': 0.0}
+
+    async def on_start(session, ctx, params):
+        ctx.started = time.perf_counter()
+
+    async def on_end(session, ctx, params):
+        stats['connections'] += 1
+        stats['connect_time'] += time.perf_counter() - ctx.started
+
+    trace = aiohttp.TraceConfig()
+    trace.on_connection_create_start.append(on_start)
+    trace.on_connection_create_end.append(on_end)
+    session = aiohttp.ClientSession(
+        connector=options.create_connector(), trace_configs=[trace])
+    api = SolarFrontierAPI(url, session=session)
+    started = time.perf_counter()
+    for _ in range(polls):
+        await api.get_snapshot()
+    stats['elapsed'] = time.perf_counter() - started
+    await session.close()
+    return stats
+
+
+async def main(polls: int, accept_delay: float) -> None:
+    inverter = FakeInverter(handshake_latency=accept_delay)
+    await inverter.start()
+    runs = (
+        ('before (no reuse)', ConnectionOptions(force_close=True)),
+        ('after (keep-alive)', ConnectionOptions()),
+    )
+    print(f'{polls} polls of 6 requests, {accept_delay * 1000:.1f} ms accept delay')
+    for name, options in runs:
+        stats = await _poll(inverter.url, options, polls)
+        print(
+            f'{name:20} connections/poll {stats["connections"] / polls:5.2f}  '
+            f'handshake ms/poll {stats["connect_time"] * 1000 / polls:7.3f}  '
+            f'poll ms {stats["elapsed"] * 1000 / polls:7.3f}'
+        )
+    await inverter.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--polls', type=int, default=200)
+    parser.add_argument('--accept-delay', type=float, default=0.002)
+    args = parser.parse_args()
+    asyncio.run(main(args.polls, args.accept_delay))
@@ -0,0 +1,45 @@
+"""Compare parsing archived payload files in one process and across a process pool.
+
+    python benchmarks/bench_ingest.py [--files 20000] [--processes 0]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from python_solarfrontier.fake_inverter import measurements_payload  # noqa: E402
+from python_solarfrontier.ingest import find_payloads, parse_files  # noqa: E402
+
+
+def _run(root: str, processes: int) -> float:
+    started = time.perf_counter()
+    files = sum(len(batch.paths) for batch in parse_files(find_payloads(root), typed=True, processes=processes))
+    elapsed = time.perf_counter() - started
+    print(f'{"in process" if processes == 0 else f"{processes} processes":14} '
+          f'{elapsed:6.2f} s {files / elapsed:10.0f} files/s')
+    return elapsed
+
+
+def main(files: int, processes: int) -> None:
+    random.seed(0)
+    with tempfile.TemporaryDirectory() as root:
+        for index in range(files):
+            payload = measurements_payload({'P DC': (str(random.randint(0, 5500)), 'W')})
+            with open(os.path.join(root, f'{index:08}.gen.measurements.table.js'), 'w') as handle:
+                handle.write(payload)
+        single = _run(root, 0)
+        pooled = _run(root, processes or os.cpu_count())
+        print(f'{single / pooled:.1f}x')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=20000)
+    parser.add_argument('--processes', type=int, default=0, help='pool size, all cores by default')
+    args = parser.parse_args()
+    main(args.files, args.processes)
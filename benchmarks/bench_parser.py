@@ -0,0 +1,108 @@
+"""Compare the precompiled parsers with the previous per-call regex parsers.
+
+    python benchmarks/bench_parser.py [--number 20000]
+"""
+
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from python_solarfrontier.fake_inverter import (  # noqa: E402
+    measurements_payload,
+    system_info_payload,
+    yield_payload
+)
+from python_solarfrontier.utils import (  # noqa: E402
+    MEASUREMENT_NAMES,
+    SolarFrontierWebInfoParser,
+    UnitConverter,
+    to_base_unit
+)
+
+SYSTEM_INFO = system_info_payload()
+MEASUREMENTS = measurements_payload()
+YIELD = yield_payload("12345.6kWh")
+
+
+class LegacyParser:
+    """The parsers as they were before patterns were precompiled."""
+
+    @staticmethod
+    def parse_system_info(html_content):
+        info = {}
+        model_match = re.search(r"<td>Name</td><td>(.*?)</td>", html_content)
+        if model_match:
+            info["model_name"] = model_match.group(1)
+        power_match = re.search(r"<td>Nominal Power</td><td>([\d.]+\s?[kM]?W)</td>", html_content)
+        if power_match:
+            info["nominal_power"] = power_match.group(1)
+        return info
+
+    @staticmethod
+    def parse_measurements(html_content):
+        name_mapping = dict(MEASUREMENT_NAMES)
+        units_data = {}
+        table_rows = re.findall(r"<tr><td>(.*?)</td><td align='right'>(.*?)</td><td>(.*?)</td></tr>", html_content)
+        for name, value, unit in table_rows:
+            key = name_mapping.get(name.strip(), name.strip().replace(" ", "_").lower())
+            try:
+                numeric_value = float(value.strip())
+            except ValueError:
+                numeric_value = None
+            units_data[key] = f"{numeric_value}{unit.strip()}" if numeric_value is not None else None
+        return units_data
+
+    @staticmethod
+    def parse_yield(html_content):
+        yield_match = re.search(r"document\.getElementById\(\"labelValueId\"\)\.innerHTML\s*=\s*\"[^\"]*?(\d+(\.\d+)?[kM]?Wh)", html_content)
+        if yield_match:
+            return yield_match.group(1)
+        return None
+
+
+def main(number: int) -> None:
+    cases = (
+        ('parse_system_info', SYSTEM_INFO),
+        ('parse_measurements', MEASUREMENTS),
+        ('parse_yield', YIELD),
+    )
+    print(f'{"parser":20} {"legacy us":>10} {"current us":>11} {"speedup":>8}')
+    for name, payload in cases:
+        legacy = getattr(LegacyParser, name)
+        current = getattr(SolarFrontierWebInfoParser, name)
+        assert legacy(payload) == current(payload), name
+        _report(name, legacy, current, payload, number)
+
+    # Numeric values: re-parsing the strings versus typed output
+    converter = UnitConverter()
+
+    def legacy_numeric(payload):
+        return {
+            key: to_base_unit(*converter.parse_measurement(value))
+            for key, value in LegacyParser.parse_measurements(payload).items()
+        }
+
+    def typed(payload):
+        return SolarFrontierWebInfoParser.parse_measurements(payload, typed=True)
+
+    assert legacy_numeric(MEASUREMENTS) == typed(MEASUREMENTS)
+    _report('measurements typed', legacy_numeric, typed, MEASUREMENTS, number)
+
+
+def _report(name, legacy, current, payload, number):
+    legacy_time = timeit.timeit(lambda: legacy(payload), number=number)
+    current_time = timeit.timeit(lambda: current(payload), number=number)
+    print(
+        f'{name:20} {legacy_time * 1e6 / number:10.2f} '
+        f'{current_time * 1e6 / number:11.2f} {legacy_time / current_time:7.2f}x'
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--number', type=int, default=20000)
+    main(parser.parse_args().number)
@@ -0,0 +1,72 @@
+"""Compare the aiohttp, asyncio-streams and in-memory transports.
+
+The fake inverter runs in a separate process, so the CPU time reported is
+the client's alone.
+
+    python benchmarks/bench_transport.py [--snapshots 300] [--concurrency 10]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from python_solarfrontier.api import SolarFrontierAPI  # noqa: E402
+from python_solarfrontier.fake_inverter import FakeInverter, default_payloads  # noqa: E402
+from python_solarfrontier.transport import MemoryTransport, StreamTransport  # noqa: E402
+
+
+def _serve(ports) -> None:
+    async def serve():
+        async with FakeInverter() as inverter:
+            ports.put(inverter.port)
+            await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+async def _bench(name: str, url: str, transport, snapshots: int, concurrency: int) -> None:
+    api = SolarFrontierAPI(url, transport=transport)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def snapshot():
+        async with semaphore:
+            result = await api.get_snapshot(max_concurrency=6)
+            assert result.ok, result.errors
+
+    # Warm up connections
+    await snapshot()
+    started, cpu_started = time.perf_counter(), time.process_time()
+    await asyncio.gather(*(snapshot() for _ in range(snapshots)))
+    elapsed, cpu = time.perf_counter() - started, time.process_time() - cpu_started
+    requests = snapshots * 6
+    print(f'{name:10} {requests / elapsed:8.0f} requests/s  {cpu / requests * 1e6:8.1f} us CPU per request')
+    await api.close()
+    if transport is not None:
+        await transport.close()
+
+
+async def main(args, port: int) -> None:
+    url = f'http://127.0.0.1:{port}'
+    print(f'{args.snapshots} snapshots of 6 requests, {args.concurrency} concurrent')
+    await _bench('aiohttp', url, None, args.snapshots, args.concurrency)
+    await _bench('stream', url, StreamTransport(), args.snapshots, args.concurrency)
+    await _bench('memory', url, MemoryTransport(default_payloads()), args.snapshots, args.concurrency)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--snapshots', type=int, default=300)
+    parser.add_argument('--concurrency', type=int, default=10)
+    args = parser.parse_args()
+    ports = multiprocessing.Queue()
+    server = multiprocessing.Process(target=_serve, args=(ports,), daemon=True)
+    server.start()
+    try:
+        asyncio.run(main(args, ports.get(timeout=10)))
+    finally:
+        server.terminate()
@@ -0,0 +1,41 @@
+"""Compare per-string UnitConverter parsing with the batch parse_many().
+
+    python benchmarks/bench_units.py [--readings 1000000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from python_solarfrontier.utils import UnitConverter, to_base_unit  # noqa: E402
+
+
+def main(readings: int) -> None:
+    # Archived readings repeat a lot, e.g. at night or around 50 Hz
+    random.seed(0)
+    units = ('W', 'kW', 'V', 'A', 'Hz', 'kWh')
+    measurements = [
+        f'{random.randint(0, 5000) / 10}{random.choice(units)}' for _ in range(readings)
+    ]
+    converter = UnitConverter()
+
+    started = time.perf_counter()
+    [to_base_unit(*converter.parse_measurement(m)) for m in measurements]
+    loop_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    converter.parse_many(measurements)
+    batch_time = time.perf_counter() - started
+
+    print(f'{readings} readings: per-string {loop_time:.2f} s, '
+          f'parse_many {batch_time:.2f} s ({loop_time / batch_time:.1f}x)')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--readings', type=int, default=1000000)
+    main(parser.parse_args().readings)
@@ -0,0 +1,35 @@
+"""Library to communicate with Solar Frontier inverters.
+
+Names are imported on first access, so the parsers can be used without
+loading aiohttp, e.g. `from python_solarfrontier import UnitConverter`.
+"""
+
+import importlib
+
+# Public name -> module defining it
+_EXPORTS = {
+    "SolarFrontierAPI": "api",
+    "SolarFrontierResponseError": "api",
+    "SolarFrontierSnapshot": "api",
+    "SolarFrontierFleet": "fleet",
+    "SolarFrontierSyncAPI": "sync",
+    "Reading": "utils",
+    "SolarFrontierWebInfoParser": "utils",
+    "UnitConverter": "utils",
+    "YieldSeries": "utils",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,210 @@
+"""Detect stale and implausible readings while polling.
+
+Every host and metric keeps a ring buffer of its last readings, so memory
+stays fixed however long the detector runs, and each check is O(1):
+
+    detector = AnomalyDetector()
+    detector.set_system_info(host, await api.get_system_info())
+    for anomaly in detector.check_snapshot(host, await api.get_snapshot()):
+        _LOGGER.warning("%s", anomaly)
+"""
+
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .const import (
+    DEFAULT_ANOMALY_HISTORY,
+    DEFAULT_DAYLIGHT_HOURS,
+    DEFAULT_LOW_OUTPUT_RATIO,
+    DEFAULT_YIELD_JUMP_TOLERANCE
+)
+from .utils import Reading, UnitConverter, as_reading, to_base_unit
+
+FROZEN = "frozen"
+MISSING = "missing"
+YIELD_JUMP = "yield_jump"
+LOW_OUTPUT = "low_output"
+
+# Metrics that fluctuate while the inverter works, unlike voltages or frequency
+FROZEN_METRICS = ("dc_power", "dc_current", "ac_power")
+
+_CONVERTER = UnitConverter()
+
+
+@dataclass
+class Anomaly:
+    """Something implausible about the readings of a host."""
+    host: str
+    metric: str
+    kind: str
+    timestamp: float
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.host} {self.metric}: {self.message}"
+
+
+def _resolution(value) -> float:
+    """Smallest step of a displayed value in base units, e.g. 10000 for "48.93MWh"."""
+    if isinstance(value, Reading) or not isinstance(value, str):
+        return 0.0
+    value = value.strip()
+    try:
+        unit = _CONVERTER.get_unit(value)
+    except ValueError:
+        return 0.0
+    decimals = len(value[:-len(unit)].strip().partition(".")[2])
+    return to_base_unit(10.0 ** -decimals, unit).value
+
+
+def _daytime(timestamp: float, hours: Tuple[int, int] = DEFAULT_DAYLIGHT_HOURS) -> bool:
+    return hours[0] <= time.localtime(timestamp).tm_hour < hours[1]
+
+
+class _Track:
+    """Ring buffer of the last readings of one metric with run counters."""
+    __slots__ = ("values", "repeats", "low")
+
+    def __init__(self, size: int) -> None:
+        self.values = deque(maxlen=size)
+        # Readings in a row equal to the last one, and below the low output limit
+        self.repeats = 0
+        self.low = 0
+
+    def add(self, value: float) -> None:
+        self.repeats = self.repeats + 1 if self.values and self.values[-1] == value else 1
+        self.values.append(value)
+
+
+class AnomalyDetector:
+    """Flag frozen values, impossible yield counter jumps and low output.
+
+    - `frozen`: one of `frozen_metrics` repeats the exact same non-zero value
+      `history` times in a row, typically a hung web server.
+    - `missing`: an empty measurement table or a yield that is not a value,
+      as returned by the API when requests fail.
+    - `yield_jump`: the total yield decreased, or grew more than the nominal
+      power could produce in the elapsed time (times `yield_tolerance`).
+    - `low_output`: the AC power stayed below `low_output_ratio` of the
+      nominal power for `history` readings while `daylight(timestamp)` holds,
+      by default between 10:00 and 15:00 local time.
+
+    Nominal power comes from `set_system_info()`; without it only yield
+    decreases and frozen or missing values are flagged.
+    """
+
+    def __init__(
+        self,
+        history: int = DEFAULT_ANOMALY_HISTORY,
+        low_output_ratio: float = DEFAULT_LOW_OUTPUT_RATIO,
+        yield_tolerance: float = DEFAULT_YIELD_JUMP_TOLERANCE,
+        frozen_metrics: Sequence[str] = FROZEN_METRICS,
+        daylight: Callable[[float], bool] = _daytime,
+    ) -> None:
+        """Initialize the detector keeping `history` readings per metric."""
+        self.history = history
+        self.low_output_ratio = low_output_ratio
+        self.yield_tolerance = yield_tolerance
+        self.frozen_metrics = frozenset(frozen_metrics)
+        self.daylight = daylight
+        self._tracks: Dict[Tuple[str, str], _Track] = {}
+        self._nominal_power: Dict[str, float] = {}
+        # host -> (time, total yield in Wh)
+        self._yield_total: Dict[str, Tuple[float, float]] = {}
+
+    def _track(self, host: str, metric: str) -> _Track:
+        track = self._tracks.get((host, metric))
+        if track is None:
+            track = self._tracks[(host, metric)] = _Track(self.history)
+        return track
+
+    def set_system_info(self, host: str, system_info: Optional[dict]) -> None:
+        """Take the nominal power of host from `get_system_info()`."""
+        reading = as_reading((system_info or {}).get("nominal_power"))
+        if reading is not None and reading.value > 0:
+            self._nominal_power[host] = reading.value
+
+    def recent(self, host: str, metric: str) -> List[float]:
+        """The last readings of a metric in base units, oldest first."""
+        track = self._tracks.get((host, metric))
+        return list(track.values) if track is not None else []
+
+    def check_measurements(self, host: str, measurements: Optional[dict], timestamp: Optional[float] = None) -> List[Anomaly]:
+        """Check the result of `get_measurements()`, typed or not."""
+        timestamp = time.time() if timestamp is None else timestamp
+        if not measurements:
+            return [Anomaly(host, "measurements", MISSING, timestamp, "no measurements returned")]
+
+        anomalies = []
+        for metric, value in measurements.items():
+            reading = as_reading(value)
+            if reading is None:
+                continue
+            track = self._track(host, metric)
+            track.add(reading.value)
+            if metric in self.frozen_metrics and reading.value != 0 and track.repeats == self.history:
+                anomalies.append(Anomaly(
+                    host, metric, FROZEN, timestamp,
+                    f"unchanged at {value} for {self.history} readings"))
+
+        nominal_power = self._nominal_power.get(host)
+        power = as_reading(measurements.get("ac_power"))
+        if nominal_power is not None and power is not None:
+            track = self._track(host, "ac_power")
+            limit = self.low_output_ratio * nominal_power
+            if power.value < limit and self.daylight(timestamp):
+                track.low += 1
+                if track.low == self.history:
+                    anomalies.append(Anomaly(
+                        host, "ac_power", LOW_OUTPUT, timestamp,
+                        f"below {limit:.0f} W for {self.history} readings in daylight"))
+            else:
+                track.low = 0
+        return anomalies
+
+    def check_yield_total(self, host: str, yield_total, timestamp: Optional[float] = None) -> List[Anomaly]:
+        """Check the result of `get_yield_total()`."""
+        timestamp = time.time() if timestamp is None else timestamp
+        reading = as_reading(yield_total)
+        if reading is None:
+            return [Anomaly(host, "yield_total", MISSING, timestamp, f"no total yield in {yield_total!r}")]
+
+        previous = self._yield_total.get(host)
+        self._yield_total[host] = (timestamp, reading.value)
+        self._track(host, "yield_total").add(reading.value)
+        if previous is None:
+            return []
+        previous_time, previous_value = previous
+        if reading.value < previous_value:
+            return [Anomaly(
+                host, "yield_total", YIELD_JUMP, timestamp,
+                f"decreased from {previous_value:.0f} Wh to {yield_total}")]
+        nominal_power = self._nominal_power.get(host)
+        if nominal_power is not None:
+            hours = max(0.0, timestamp - previous_time) / 3600
+            limit = nominal_power * hours * self.yield_tolerance + _resolution(yield_total)
+            if reading.value - previous_value > limit:
+                return [Anomaly(
+                    host, "yield_total", YIELD_JUMP, timestamp,
+                    f"grew {reading.value - previous_value:.0f} Wh in {hours * 3600:.0f} s, "
+                    f"more than {limit:.0f} Wh possible")]
+        return []
+
+    def check_snapshot(self, host: str, snapshot, timestamp: Optional[float] = None) -> List[Anomaly]:
+        """Check a `SolarFrontierSnapshot`, taking the nominal power from it too."""
+        timestamp = time.time() if timestamp is None else timestamp
+        if snapshot.system_info:
+            self.set_system_info(host, snapshot.system_info)
+        return (
+            self.check_measurements(host, snapshot.measurements, timestamp)
+            + self.check_yield_total(host, snapshot.yield_total, timestamp)
+        )
+
+    def forget(self, host: str) -> None:
+        """Drop all state of host, e.g. when it leaves the fleet."""
+        for key in [key for key in self._tracks if key[0] == host]:
+            del self._tracks[key]
+        self._nominal_power.pop(host, None)
+        self._yield_total.pop(host, None)
@@ -1,10 +1,24 @@
 "API to comunicate with the inverter."
 
+import asyncio
 import logging
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Dict, Hashable, Iterable, Optional, Set
 
-import aiohttp
+try:
+    import aiohttp
+except ImportError as err:
+    raise ImportError(
+        "The API client requires aiohttp: pip install python-solarfrontier[client]") from err
 
 from .const import (
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_TIMEOUT,
+    DEFAULT_POWER_CHANGE_THRESHOLD,
+    DEFAULT_SUBSCRIBE_IDLE_INTERVAL,
+    DEFAULT_SUBSCRIBE_MAX_INTERVAL,
+    DEFAULT_SUBSCRIBE_MIN_INTERVAL,
     PATH_SYSTEM_INFO,
     PATH_MEASUREMENTS,
     PATH_YIELD_DAY,
@@ -12,94 +26,430 @@ from .const import (
     PATH_YIELD_YEAR,
     PATH_YIELD_TOTAL
 )
-from .utils import SolarFrontierWebInfoParser
+from .cache import ResponseCache
+from .connection import ConnectionOptions
+from .metrics import MetricsHook, RequestTiming, create_trace_config
+from .resilience import HostGuard, is_transient
+from .transport import AiohttpTransport, Transport
+from .utils import Reading, SolarFrontierWebInfoParser, YieldSeries, as_reading
 
 _LOGGER = logging.getLogger(__name__)
 
+
+class SolarFrontierResponseError(Exception):
+    """Raised when the inverter answers with a non-200 status."""
+
+    def __init__(self, path: str, status: int) -> None:
+        super().__init__(f"{path} returned HTTP {status}")
+        self.path = path
+        self.status = status
+
+
+@dataclass
+class SolarFrontierSnapshot:
+    """All inverter endpoints fetched in one go.
+
+    A field is None when its request failed; the reason is kept in `errors`
+    under the field name. `changed` holds the fields whose payload differs
+    from the previous fetch.
+    """
+    system_info: Optional[dict] = None
+    measurements: Optional[dict] = None
+    yield_day: Optional[str] = None
+    yield_month: Optional[str] = None
+    yield_year: Optional[str] = None
+    yield_total: Optional[str] = None
+    errors: Dict[str, Exception] = field(default_factory=dict)
+    changed: Set[str] = field(default_factory=set)
+
+    @property
+    def ok(self) -> bool:
+        """True if every endpoint was fetched successfully."""
+        return not self.errors
+
+    def readings(self) -> Dict[str, Reading]:
+        """Measurements and yields in base units, without missing values."""
+        values = dict(self.measurements or {})
+        values.update(
+            yield_day=self.yield_day,
+            yield_month=self.yield_month,
+            yield_year=self.yield_year,
+            yield_total=self.yield_total,
+        )
+        readings = {}
+        for name, value in values.items():
+            reading = as_reading(value)
+            if reading is not None:
+                readings[name] = reading
+        return readings
+
+
+@dataclass
+class MeasurementDelta:
+    """Measurements that changed since the previous poll.
+
+    Values that disappeared from the payload are reported as None.
+    """
+    timestamp: float
+    changes: dict
+
+
+# Snapshot field -> (path, parser method)
+# name -> (path, parser, parse key shared with the get_* method)
+_SNAPSHOT_ENDPOINTS = {
+    "system_info": (PATH_SYSTEM_INFO, SolarFrontierWebInfoParser.parse_system_info, PATH_SYSTEM_INFO),
+    "measurements": (
+        PATH_MEASUREMENTS, SolarFrontierWebInfoParser.parse_measurements, (PATH_MEASUREMENTS, False)),
+    "yield_day": (PATH_YIELD_DAY, SolarFrontierWebInfoParser.parse_yield, PATH_YIELD_DAY),
+    "yield_month": (PATH_YIELD_MONTH, SolarFrontierWebInfoParser.parse_yield, PATH_YIELD_MONTH),
+    "yield_year": (PATH_YIELD_YEAR, SolarFrontierWebInfoParser.parse_yield, PATH_YIELD_YEAR),
+    "yield_total": (PATH_YIELD_TOTAL, SolarFrontierWebInfoParser.parse_yield, PATH_YIELD_TOTAL),
+}
+
+
 class SolarFrontierAPI:
-    def __init__(self, host: str) -> None:
-        """Initialize the API object."""
+    def __init__(
+        self,
+        host: str,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        session: Optional[aiohttp.ClientSession] = None,
+        connection: Optional[ConnectionOptions] = None,
+        cache: Optional[ResponseCache] = None,
+        metrics: Optional[MetricsHook] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        guard: Optional[HostGuard] = None,
+        recorder=None,
+        transport: Optional[Transport] = None,
+    ) -> None:
+        """Initialize the API object.
+
+        Pass `session` to share one connection pool between several inverters;
+        a shared session is left open by `close()`. Otherwise the session is
+        created with the keep-alive and DNS settings of `connection`.
+        A `cache` may be shared by several API objects polling the same
+        inverter. `metrics` receives request, parse and failure timings.
+        Requests time out after `timeout` seconds unless a `guard` adapts
+        the timeout, retries failures and stops contacting a dead host.
+        A `recorder`, e.g. an `archive.PayloadRecorder`, is given every raw
+        payload the inverter sent. Requests go through the `session` unless
+        another `transport` is given, which is left open by `close()`.
+        """
         self.host = host
         if not self.host.startswith(('http://', 'https://')):
             self.host = f"http://{self.host}"
-        self._session = None
+        self.max_concurrency = max_concurrency
+        self.connection = connection or ConnectionOptions()
+        self.cache = cache
+        self.metrics = metrics
+        self.timeout = timeout
+        self.guard = guard
+        self.recorder = recorder
+        self._session = session
+        self._owns_session = session is None
+        self.transport = transport or AiohttpTransport(lambda: self.session)
+        # path -> (ETag, Last-Modified, payload) of the last 200 response
+        self._validators = {}
+        # parse key -> (payload, parsed result)
+        self._parsed = {}
+        # path -> last payload handed to a parser, for last_changed
+        self._last_payloads: Dict[str, str] = {}
+        # path -> whether the last fetched payload differed from the one before
+        self.last_changed: Dict[str, bool] = {}
 
     @property
     def session(self):
         """Lazy initialization of the aiohttp.ClientSession."""
-        if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession()
+        if self._owns_session and (self._session is None or self._session.closed):
+            trace_configs = [create_trace_config()] if self.metrics else None
+            self._session = aiohttp.ClientSession(
+                connector=self.connection.create_connector(), trace_configs=trace_configs)
         return self._session
-    
+
+    async def _request(self, path: str) -> str:
+        """Get the raw payload of path, from the cache if one is set."""
+        if self.cache is None:
+            return await self._fetch(path)
+        return await self.cache.fetch(f"{self.host}{path}", path, lambda: self._fetch(path))
+
+    async def _fetch(self, path: str) -> str:
+        """Fetch the raw payload of path, through the guard if one is set."""
+        guard = self.guard
+        if guard is None:
+            return await self._fetch_once(path, self.timeout)
+
+        attempt = 1
+        while True:
+            guard.before_request()
+            timeout = guard.timeout
+            started = time.perf_counter()
+            try:
+                payload = await self._fetch_once(path, timeout)
+            except asyncio.CancelledError:
+                guard.release()
+                raise
+            except Exception as err:
+                if not is_transient(err):
+                    # The host answered, it is alive
+                    guard.record_success(time.perf_counter() - started)
+                    raise
+                guard.record_failure()
+                if attempt >= guard.attempts or guard.is_open:
+                    raise
+                _LOGGER.debug("Retrying %s%s after %r", self.host, path, err)
+                await asyncio.sleep(guard.backoff(attempt))
+                attempt += 1
+                continue
+            guard.record_success(time.perf_counter() - started)
+            return payload
+
+    async def _fetch_once(self, path: str, timeout: float) -> str:
+        """Fetch the raw payload of path from the inverter.
+
+        Validators of the previous response are sent along, so a device that
+        supports conditional requests can answer 304 instead of the payload.
+        """
+        headers = {}
+        previous = self._validators.get(path)
+        if previous is not None:
+            etag, last_modified, _ = previous
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        trace = {} if self.metrics else None
+        started = time.perf_counter()
+        try:
+            response = await self.transport.request(f"{self.host}{path}", headers, timeout, trace)
+            if response.status == 304 and previous is not None:
+                payload = previous[2]
+            elif response.status != 200:
+                raise SolarFrontierResponseError(path, response.status)
+            else:
+                payload = response.text
+                self._validators[path] = (
+                    response.headers.get("etag"),
+                    response.headers.get("last-modified"),
+                    payload,
+                )
+        except Exception as err:
+            if self.metrics:
+                self.metrics.on_error(self.host, path, err, time.perf_counter() - started)
+            raise
+        if self.recorder is not None:
+            self.recorder.record(self.host, path, payload)
+        if self.metrics:
+            finished = time.perf_counter()
+            self.metrics.on_request(self.host, path, RequestTiming(
+                status=response.status,
+                ttfb=response.ttfb,
+                body=finished - started - response.ttfb,
+                total=finished - started,
+                dns=trace.get("dns"),
+                connect=trace.get("connect"),
+            ))
+        return payload
+
+    def _parse(self, path: str, payload: str, parse: Callable, key: Hashable = None):
+        """Parse payload, reusing the previous result if it did not change.
+
+        `key` tells apart several parsers of the same path and defaults to it.
+        """
+        key = path if key is None else key
+        # Whether the payload changed does not depend on which parser runs
+        self.last_changed[path] = self._last_payloads.get(path) != payload
+        self._last_payloads[path] = payload
+        previous = self._parsed.get(key)
+        if previous is None or previous[0] != payload:
+            started = time.perf_counter()
+            try:
+                result = parse(payload)
+            except Exception as err:
+                if self.metrics:
+                    self.metrics.on_parse_error(self.host, path, err, time.perf_counter() - started)
+                raise
+            if self.metrics:
+                self.metrics.on_parse(self.host, path, time.perf_counter() - started)
+            self._parsed[key] = (payload, result)
+        else:
+            result = previous[1]
+        # Callers may modify the dicts they get
+        return dict(result) if isinstance(result, dict) else result
+
     async def test_connection(self) -> bool:
         """Test if we can connect with the host."""
         try:
             system_info = await self.get_system_info()
             return system_info.get('model_name') is not None
-        except aiohttp.ClientError:
+        except (aiohttp.ClientError, asyncio.TimeoutError):
             return False
 
     async def get_system_info(self) -> dict:
         """Get system information from the inverter."""
         try:
-            async with self.session.get(f"{self.host}{PATH_SYSTEM_INFO}", timeout=5) as response:
-                if response.status == 200:
-                    parser = SolarFrontierWebInfoParser()
-                    return parser.parse_system_info(await response.text())
-        except aiohttp.ClientError:
+            payload = await self._request(PATH_SYSTEM_INFO)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
             return {}
+        except SolarFrontierResponseError:
+            return None
+        return self._parse(PATH_SYSTEM_INFO, payload, SolarFrontierWebInfoParser.parse_system_info)
+
+    async def get_measurements(self, typed: bool = False) -> dict:
+        """Get measurement data from the inverter.
 
-    async def get_measurements(self) -> dict:
-        """Get measurement data from the inverter."""
+        With `typed` set the values are `Reading` records in base units
+        instead of strings like "230.0V".
+        """
         try:
-            async with self.session.get(f"{self.host}{PATH_MEASUREMENTS}", timeout=5) as response:
-                if response.status == 200:
-                    parser = SolarFrontierWebInfoParser()
-                    return parser.parse_measurements(await response.text())
-        except aiohttp.ClientError:
+            payload = await self._request(PATH_MEASUREMENTS)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
             return {}
+        except SolarFrontierResponseError:
+            return None
+        return self._parse(
+            PATH_MEASUREMENTS, payload,
+            lambda payload: SolarFrontierWebInfoParser.parse_measurements(payload, typed),
+            key=(PATH_MEASUREMENTS, typed),
+        )
 
     async def get_yield_day(self) -> float:
         """Get the yield of the current day."""
         try:
-            async with self.session.get(f"{self.host}{PATH_YIELD_DAY}", timeout=5) as response:
-                if response.status == 200:
-                    parser = SolarFrontierWebInfoParser()
-                    return parser.parse_yield(await response.text())
-        except aiohttp.ClientError:
+            payload = await self._request(PATH_YIELD_DAY)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
             return 0.0
+        except SolarFrontierResponseError:
+            return None
+        return self._parse(PATH_YIELD_DAY, payload, SolarFrontierWebInfoParser.parse_yield)
 
     async def get_yield_month(self) -> float:
         """Get the yield of the current month."""
         try:
-            async with self.session.get(f"{self.host}{PATH_YIELD_MONTH}", timeout=5) as response:
-                if response.status == 200:
-                    parser = SolarFrontierWebInfoParser()
-                    return parser.parse_yield(await response.text())
+            payload = await self._request(PATH_YIELD_MONTH)
+        except SolarFrontierResponseError:
+            return None
         except Exception:
             return 0.0
+        return self._parse(PATH_YIELD_MONTH, payload, SolarFrontierWebInfoParser.parse_yield)
 
     async def get_yield_year(self) -> float:
         """Get the yield of the current year."""
         try:
-            async with self.session.get(f"{self.host}{PATH_YIELD_YEAR}", timeout=5) as response:
-                if response.status == 200:
-                    parser = SolarFrontierWebInfoParser()
-                    return parser.parse_yield(await response.text())
-        except aiohttp.ClientError:
+            payload = await self._request(PATH_YIELD_YEAR)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
             return 0.0
+        except SolarFrontierResponseError:
+            return None
+        return self._parse(PATH_YIELD_YEAR, payload, SolarFrontierWebInfoParser.parse_yield)
 
     async def get_yield_total(self) -> float:
         """Get the total yield."""
         try:
-            async with self.session.get(f"{self.host}{PATH_YIELD_TOTAL}", timeout=5) as response:
-                if response.status == 200:
-                    parser = SolarFrontierWebInfoParser()
-                    return parser.parse_yield(await response.text())
-        except aiohttp.ClientError:
+            payload = await self._request(PATH_YIELD_TOTAL)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
             return 0.0
+        except SolarFrontierResponseError:
+            return None
+        return self._parse(PATH_YIELD_TOTAL, payload, SolarFrontierWebInfoParser.parse_yield)
+
+    async def _get_yield_series(self, path: str) -> Optional[YieldSeries]:
+        try:
+            payload = await self._request(path)
+        except (aiohttp.ClientError, asyncio.TimeoutError, SolarFrontierResponseError):
+            return None
+        return self._parse(
+            path, payload, SolarFrontierWebInfoParser.parse_yield_series, key=(path, "series"))
+
+    async def get_yield_day_series(self) -> Optional[YieldSeries]:
+        """Get the hourly yields of the current day."""
+        return await self._get_yield_series(PATH_YIELD_DAY)
+
+    async def get_yield_month_series(self) -> Optional[YieldSeries]:
+        """Get the daily yields of the current month."""
+        return await self._get_yield_series(PATH_YIELD_MONTH)
+
+    async def get_yield_year_series(self) -> Optional[YieldSeries]:
+        """Get the monthly yields of the current year."""
+        return await self._get_yield_series(PATH_YIELD_YEAR)
+
+    async def get_snapshot(
+        self, max_concurrency: Optional[int] = None, fields: Optional[Iterable[str]] = None,
+    ) -> SolarFrontierSnapshot:
+        """Fetch all endpoints, or only those of `fields`, concurrently.
+
+        At most `max_concurrency` requests (default: the value given to the
+        constructor) are in flight at once so the embedded web server is not
+        overwhelmed.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+        snapshot = SolarFrontierSnapshot()
+
+        async def fetch(name, path, parse, key):
+            async with semaphore:
+                try:
+                    payload = await self._request(path)
+                except (aiohttp.ClientError, asyncio.TimeoutError, SolarFrontierResponseError) as err:
+                    _LOGGER.debug("Fetching %s%s failed: %r", self.host, path, err)
+                    snapshot.errors[name] = err
+                    return
+            setattr(snapshot, name, self._parse(path, payload, parse, key))
+            if self.last_changed[path]:
+                snapshot.changed.add(name)
+
+        await asyncio.gather(*(
+            fetch(name, *_SNAPSHOT_ENDPOINTS[name]) for name in (_SNAPSHOT_ENDPOINTS if fields is None else fields)
+        ))
+        return snapshot
+
+    async def subscribe_measurements(
+        self,
+        typed: bool = False,
+        min_interval: float = DEFAULT_SUBSCRIBE_MIN_INTERVAL,
+        max_interval: float = DEFAULT_SUBSCRIBE_MAX_INTERVAL,
+        idle_interval: float = DEFAULT_SUBSCRIBE_IDLE_INTERVAL,
+        threshold: float = DEFAULT_POWER_CHANGE_THRESHOLD,
+    ) -> AsyncIterator[MeasurementDelta]:
+        """Poll the measurements and yield what changed.
+
+        Polls every `min_interval` seconds while the DC power changes by more
+        than `threshold` (relative), backs off up to `max_interval` while it
+        is steady and waits `idle_interval` while it is zero, e.g. at night.
+        The next poll starts only once the consumer asks for the next delta,
+        so a slow consumer slows down polling instead of queueing data.
+        """
+        loop = asyncio.get_running_loop()
+        previous = {}
+        previous_power = None
+        interval = min_interval
+        while True:
+            started = loop.time()
+            measurements = await self.get_measurements(typed)
+
+            if not measurements:
+                interval = max_interval
+            else:
+                changes = {
+                    key: value for key, value in measurements.items()
+                    if key not in previous or previous[key] != value
+                }
+                changes.update((key, None) for key in previous if key not in measurements)
+                previous = measurements
+
+                power = as_reading(measurements.get("dc_power"))
+                power = power.value if power is not None else None
+                if not power:
+                    interval = idle_interval
+                elif previous_power is None or abs(power - previous_power) > threshold * max(abs(previous_power), 1.0):
+                    interval = min_interval
+                else:
+                    interval = min(interval * 2, max_interval)
+                previous_power = power
+
+                if changes:
+                    yield MeasurementDelta(time.time(), changes)
+
+            await asyncio.sleep(max(0.0, started + interval - loop.time()))
 
     async def close(self):
         """Close the session."""
-        if self._session:
+        if self._session and self._owns_session:
             await self._session.close()
@@ -0,0 +1,172 @@
+"""Capture raw payloads into an archive and replay them without a network.
+
+An archive is a gzip file of records, each holding the time a payload was
+received, the host, the path and the payload itself:
+
+    recorder = PayloadRecorder("capture.sfa")
+    api = SolarFrontierAPI("192.168.0.101", recorder=recorder)
+    ...
+    recorder.close()
+
+    replay = PayloadReplay("capture.sfa", speed=60)
+    async for record in replay:
+        measurements = await replay.api(record.host).get_measurements()
+
+Files written across several runs are appended as further gzip members.
+Every record is flushed when written, so an archive whose process died
+can still be read up to its last record.
+"""
+
+import asyncio
+import gzip
+import os
+import struct
+import time
+from typing import AsyncIterator, Dict, Iterator, NamedTuple, Optional
+
+from .api import SolarFrontierAPI
+from .transport import Transport, TransportResponse
+
+ARCHIVE_MAGIC = b"SFPA1\n"
+# time, length of host, path and payload
+_HEADER = struct.Struct("<dHHI")
+
+
+class PayloadRecord(NamedTuple):
+    """One payload received from an inverter."""
+    time: float
+    host: str
+    path: str
+    payload: str
+
+
+class PayloadRecorder:
+    """Append payloads to an archive, passed to `SolarFrontierAPI(recorder=...)`."""
+
+    def __init__(self, path: str, compresslevel: int = 6) -> None:
+        """Open the archive at path, appending if it exists."""
+        self.path = path
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = gzip.open(path, "ab", compresslevel=compresslevel)
+        if new_file:
+            self._file.write(ARCHIVE_MAGIC)
+        self.records = 0
+
+    def record(self, host: str, path: str, payload: str, timestamp: Optional[float] = None) -> None:
+        """Append one payload, received now unless timestamp is given."""
+        host_data, path_data, payload_data = host.encode(), path.encode(), payload.encode()
+        self._file.write(_HEADER.pack(
+            time.time() if timestamp is None else timestamp,
+            len(host_data), len(path_data), len(payload_data),
+        ))
+        self._file.write(host_data + path_data + payload_data)
+        # Sync flush, readable even if the member is never finished
+        self._file.flush()
+        self.records += 1
+
+    def close(self) -> None:
+        """Finish the gzip member and close the file."""
+        self._file.close()
+
+    def __enter__(self) -> "PayloadRecorder":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def read_archive(path: str) -> Iterator[PayloadRecord]:
+    """Read the records of an archive in the order they were recorded.
+
+    An archive whose recorder was not closed ends in an unfinished gzip
+    member; it is read up to the last flushed record.
+    """
+    with gzip.open(path, "rb") as handle:
+        try:
+            yield from _read_records(path, handle)
+        except EOFError:
+            # The last member has no end marker, its writer did not close it
+            return
+
+
+def _read_records(path: str, handle) -> Iterator[PayloadRecord]:
+    if handle.read(len(ARCHIVE_MAGIC)) != ARCHIVE_MAGIC:
+        raise ValueError(f"{path} is not a payload archive")
+    while True:
+        header = handle.read(_HEADER.size)
+        if not header:
+            return
+        if len(header) < _HEADER.size:
+            raise ValueError(f"{path} ends with a truncated record")
+        timestamp, host_size, path_size, payload_size = _HEADER.unpack(header)
+        data = handle.read(host_size + path_size + payload_size)
+        if len(data) < host_size + path_size + payload_size:
+            raise ValueError(f"{path} ends with a truncated record")
+        yield PayloadRecord(
+            timestamp,
+            data[:host_size].decode(),
+            data[host_size:host_size + path_size].decode(),
+            data[host_size + path_size:].decode(),
+        )
+
+
+class ReplayTransport(Transport):
+    """Transport answering from the payloads a `PayloadReplay` has reached.
+
+    Paths not replayed yet answer 404.
+    """
+
+    def __init__(self, payloads: Dict[str, str]) -> None:
+        self._payloads = payloads
+
+    async def request(self, url, headers, timeout, trace=None) -> TransportResponse:
+        payload = self._payloads.get(url)
+        if payload is None:
+            return TransportResponse(404, {}, "")
+        return TransportResponse(200, {}, payload)
+
+
+class ReplayAPI(SolarFrontierAPI):
+    """API answering from the payloads a `PayloadReplay` has reached."""
+
+    def __init__(self, host: str, payloads: Dict[str, str], **kwargs) -> None:
+        super().__init__(host, transport=ReplayTransport(payloads), **kwargs)
+
+
+class PayloadReplay:
+    """Replay an archive in recorded order, optionally keeping its pace.
+
+    Iterating yields the records; between two records it waits the recorded
+    gap divided by `speed`, or not at all when `speed` is None. After each
+    record, `api(record.host)` answers with the payloads replayed so far,
+    parsed by the same code as live responses.
+    """
+
+    def __init__(self, path: str, speed: Optional[float] = None) -> None:
+        """Initialize the replay of the archive at path."""
+        self.path = path
+        self.speed = speed
+        # URL -> latest replayed payload
+        self._payloads: Dict[str, str] = {}
+        self._apis: Dict[str, ReplayAPI] = {}
+
+    def api(self, host: str, **kwargs) -> ReplayAPI:
+        """API object of host; keyword arguments apply on first use."""
+        api = self._apis.get(host)
+        if api is None:
+            api = self._apis[host] = ReplayAPI(host, self._payloads, **kwargs)
+        return api
+
+    async def __aiter__(self) -> AsyncIterator[PayloadRecord]:
+        loop = asyncio.get_running_loop()
+        started = first = None
+        for record in read_archive(self.path):
+            if self.speed:
+                if first is None:
+                    started, first = loop.time(), record.time
+                delay = started + (record.time - first) / self.speed - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            host = self.api(record.host).host
+            self._payloads[f"{host}{record.path}"] = record.payload
+            yield record
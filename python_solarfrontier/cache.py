@@ -0,0 +1,89 @@
+"""Response cache shared between API objects."""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional
+
+from .const import DEFAULT_CACHE_SIZE, DEFAULT_CACHE_TTLS
+
+
+class ResponseCache:
+    """Cache inverter payloads with a freshness time per endpoint.
+
+    Entries are keyed by URL and the least recently used entry is evicted
+    once `max_entries` is reached. Concurrent requests for the same URL are
+    coalesced into a single fetch. Failed fetches are not cached.
+    """
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        max_entries: int = DEFAULT_CACHE_SIZE,
+        default_ttl: float = 0.0,
+    ) -> None:
+        """Initialize the cache.
+
+        `ttls` maps endpoint paths to seconds and is merged over
+        `DEFAULT_CACHE_TTLS`. Paths without a TTL use `default_ttl`; a TTL
+        of 0 only coalesces concurrent requests.
+        """
+        self.ttls = {**DEFAULT_CACHE_TTLS, **(ttls or {})}
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()
+        self._inflight = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Drop all cached payloads."""
+        self._entries.clear()
+
+    def invalidate(self, url: str) -> None:
+        """Drop the cached payload of url."""
+        self._entries.pop(url, None)
+
+    def get(self, url: str) -> Optional[str]:
+        """Get the fresh payload of url, if cached."""
+        entry = self._entries.get(url)
+        if entry is None:
+            return None
+        expires, payload = entry
+        if expires < time.monotonic():
+            del self._entries[url]
+            return None
+        self._entries.move_to_end(url)
+        return payload
+
+    def put(self, url: str, path: str, payload: str) -> None:
+        """Store the payload of url for the TTL of path."""
+        ttl = self.ttls.get(path, self.default_ttl)
+        if ttl <= 0:
+            return
+        self._entries[url] = (time.monotonic() + ttl, payload)
+        self._entries.move_to_end(url)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def fetch(self, url: str, path: str, fetch: Callable[[], Awaitable[str]]) -> str:
+        """Get the payload of url from the cache or by awaiting fetch()."""
+        payload = self.get(url)
+        if payload is not None:
+            return payload
+
+        task = self._inflight.get(url)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._inflight[url] = task
+            task.add_done_callback(lambda done: self._done(url, path, done))
+        # A cancelled caller must not cancel the fetch other callers wait for
+        return await asyncio.shield(task)
+
+    def _done(self, url: str, path: str, task: asyncio.Future) -> None:
+        if self._inflight.get(url) is task:
+            del self._inflight[url]
+        if task.cancelled() or task.exception() is not None:
+            return
+        self.put(url, path, task.result())
@@ -0,0 +1,338 @@
+"""Collector daemon polling inverters and writing samples in batches.
+
+Run as `solarfrontier-collect config.json`. The config is a JSON object:
+
+    {
+        "inverters": ["192.168.0.101", "192.168.0.102"],
+        "interval": 30,
+        "batch_size": 500,
+        "flush_interval": 10,
+        "queue_size": 10000,
+        "sinks": [
+            {"type": "csv", "path": "samples.csv"},
+            {"type": "sqlite", "path": "samples.db"},
+            {"type": "line_protocol", "host": "localhost", "port": 8094},
+            {"type": "parquet", "path": "samples/"}
+        ]
+    }
+
+Only "inverters" and "sinks" are required. The parquet sink needs pyarrow.
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+import signal
+import socket
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from typing import List, NamedTuple, Optional, Sequence
+
+from .const import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_FLUSH_INTERVAL,
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_QUEUE_SIZE
+)
+from .fleet import SolarFrontierFleet
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Sample(NamedTuple):
+    """One value of one inverter in SI base units."""
+    time: float
+    host: str
+    metric: str
+    value: float
+
+
+class Sink(ABC):
+    """Destination of sample batches. Writes run in a worker thread."""
+
+    @abstractmethod
+    def write(self, samples: List[Sample]) -> None:
+        """Write a batch of samples."""
+
+    def close(self) -> None:
+        """Release the resources of the sink."""
+
+
+class CsvSink(Sink):
+    """Append samples to a CSV file with a header line."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def write(self, samples: List[Sample]) -> None:
+        new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        with open(self.path, "a", newline="") as handle:
+            writer = csv.writer(handle)
+            if new_file:
+                writer.writerow(Sample._fields)
+            writer.writerows(samples)
+
+
+class SqliteSink(Sink):
+    """Insert samples into a `samples` table of a SQLite database."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._connection = None
+
+    def write(self, samples: List[Sample]) -> None:
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS samples (time REAL, host TEXT, metric TEXT, value REAL)")
+        with self._connection:
+            self._connection.executemany("INSERT INTO samples VALUES (?, ?, ?, ?)", samples)
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+def _escape_tag(value: str) -> str:
+    return value.replace("\\", "\\\\").replace(",", "\\,").replace(" ", "\\ ").replace("=", "\\=")
+
+
+class LineProtocolSink(Sink):
+    """Send samples as InfluxDB line protocol over a TCP socket.
+
+    Each sample becomes `<measurement>,host=<host> <metric>=<value> <ns>`.
+    """
+
+    def __init__(self, host: str, port: int, measurement: str = "solarfrontier", timeout: float = 5.0) -> None:
+        self.host = host
+        self.port = port
+        self.measurement = _escape_tag(measurement)
+        self.timeout = timeout
+        self._socket = None
+
+    def format(self, samples: List[Sample]) -> bytes:
+        """Format samples as line protocol."""
+        return "".join(
+            f"{self.measurement},host={_escape_tag(sample.host)} "
+            f"{_escape_tag(sample.metric)}={sample.value} {int(sample.time * 1e9)}\n"
+            for sample in samples
+        ).encode()
+
+    def write(self, samples: List[Sample]) -> None:
+        data = self.format(samples)
+        if self._socket is None:
+            self._socket = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        try:
+            self._socket.sendall(data)
+        except OSError:
+            # Reconnect on the next batch
+            self.close()
+            raise
+
+    def close(self) -> None:
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+
+class ParquetSink(Sink):
+    """Write every batch as a Parquet file into a directory. Requires pyarrow."""
+
+    def __init__(self, path: str) -> None:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as err:
+            raise ImportError("The parquet sink requires pyarrow: pip install pyarrow") from err
+        self.path = path
+        self._files = 0
+        os.makedirs(path, exist_ok=True)
+
+    def write(self, samples: List[Sample]) -> None:
+        import pyarrow
+        import pyarrow.parquet
+
+        table = pyarrow.table({
+            field: [getattr(sample, field) for sample in samples] for field in Sample._fields
+        })
+        self._files += 1
+        name = f"samples-{int(time.time() * 1000)}-{self._files}.parquet"
+        pyarrow.parquet.write_table(table, os.path.join(self.path, name))
+
+
+SINKS = {
+    "csv": CsvSink,
+    "sqlite": SqliteSink,
+    "line_protocol": LineProtocolSink,
+    "parquet": ParquetSink,
+}
+
+
+def create_sink(spec: dict) -> Sink:
+    """Create a sink from its config, e.g. {"type": "csv", "path": "a.csv"}."""
+    options = dict(spec)
+    sink_type = options.pop("type", None)
+    if sink_type not in SINKS:
+        raise ValueError(f"Unknown sink type {sink_type!r}, expected one of {sorted(SINKS)}")
+    return SINKS[sink_type](**options)
+
+
+class Collector:
+    """Poll inverters and write their samples to sinks in batches.
+
+    Samples wait in a queue of at most `queue_size` entries; when the sinks
+    fall behind, polling waits for room instead of growing memory. A batch
+    is written once it holds `batch_size` samples or `flush_interval`
+    seconds after its first sample.
+    """
+
+    def __init__(
+        self,
+        hosts: Sequence[str],
+        sinks: Sequence[Sink],
+        interval: float = DEFAULT_POLL_INTERVAL,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        fleet: Optional[SolarFrontierFleet] = None,
+    ) -> None:
+        """Initialize the collector."""
+        self.sinks = list(sinks)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue_size = queue_size
+        # Batch the writer is collecting, kept to flush it on shutdown
+        self._batch: List[Sample] = []
+        # Batch being written in the executor, which cancelling cannot stop
+        self._writing: Optional[asyncio.Future] = None
+        self.fleet = fleet or SolarFrontierFleet(hosts, interval=interval)
+
+    @classmethod
+    def from_config(cls, config: dict) -> "Collector":
+        """Create a collector from a parsed config file."""
+        return cls(
+            hosts=config["inverters"],
+            sinks=[create_sink(spec) for spec in config["sinks"]],
+            interval=config.get("interval", DEFAULT_POLL_INTERVAL),
+            batch_size=config.get("batch_size", DEFAULT_BATCH_SIZE),
+            flush_interval=config.get("flush_interval", DEFAULT_FLUSH_INTERVAL),
+            queue_size=config.get("queue_size", DEFAULT_QUEUE_SIZE),
+        )
+
+    def _write(self, samples: List[Sample]) -> None:
+        for sink in self.sinks:
+            try:
+                sink.write(samples)
+            except Exception:
+                _LOGGER.exception("Writing %d samples to %s failed", len(samples), type(sink).__name__)
+
+    async def _writer(self, queue: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        finished = False
+        while not finished:
+            sample = await queue.get()
+            if sample is None:
+                break
+            batch = self._batch = [sample]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    sample = await asyncio.wait_for(queue.get(), max(0.0, deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    break
+                if sample is None:
+                    finished = True
+                    break
+                batch.append(sample)
+            self._batch = []
+            self._writing = loop.run_in_executor(None, self._write, batch)
+            await asyncio.shield(self._writing)
+
+    async def run(self, rounds: Optional[int] = None) -> None:
+        """Poll forever or for `rounds` rounds, then flush and close the sinks."""
+        queue = asyncio.Queue(self.queue_size)
+        writer = asyncio.ensure_future(self._writer(queue))
+        try:
+            async for result in self.fleet.poll(rounds):
+                if result.error is not None:
+                    _LOGGER.warning("Polling %s failed: %s", result.host, result.error)
+                    continue
+                snapshot = result.result
+                if snapshot.errors:
+                    _LOGGER.warning("Polling %s failed for %s", result.host, ", ".join(sorted(snapshot.errors)))
+                for metric, reading in snapshot.readings().items():
+                    await queue.put(Sample(result.timestamp, result.host, metric, reading.value))
+            await queue.put(None)
+            await writer
+        finally:
+            if not writer.done():
+                writer.cancel()
+                # The sinks are not thread-safe, let the running write finish first
+                if self._writing is not None:
+                    await asyncio.shield(self._writing)
+                # Write what is still pending before shutting down
+                remaining = self._batch
+                while not queue.empty():
+                    sample = queue.get_nowait()
+                    if sample is not None:
+                        remaining.append(sample)
+                if remaining:
+                    self._write(remaining)
+            await self.fleet.close()
+            for sink in self.sinks:
+                sink.close()
+
+
+async def run_until_stopped(collector: Collector, rounds: Optional[int] = None) -> None:
+    """Run the collector until it finishes or SIGTERM or SIGINT arrives.
+
+    A signal cancels the run, which still writes the pending samples and
+    closes the sinks.
+    """
+    loop = asyncio.get_running_loop()
+    task = asyncio.ensure_future(collector.run(rounds))
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(signum, task.cancel)
+        except (NotImplementedError, RuntimeError):
+            # No signal handlers on Windows or outside the main thread
+            pass
+    try:
+        await task
+    except asyncio.CancelledError:
+        _LOGGER.info("Stopped, pending samples were written")
+    finally:
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.remove_signal_handler(signum)
+            except (NotImplementedError, RuntimeError):
+                pass
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Entry point of the solarfrontier-collect console script."""
+    parser = argparse.ArgumentParser(
+        prog="solarfrontier-collect", description="Poll Solar Frontier inverters and store their readings.")
+    parser.add_argument("config", help="path of the JSON config file")
+    parser.add_argument("--once", action="store_true", help="poll every inverter once and exit")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log debug messages")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    with open(args.config) as handle:
+        collector = Collector.from_config(json.load(handle))
+    try:
+        asyncio.run(run_until_stopped(collector, rounds=1 if args.once else None))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Connection pool settings for the inverter HTTP client."""
+
+import socket
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import aiohttp
+from aiohttp.abc import AbstractResolver
+
+from .const import (
+    DEFAULT_DNS_CACHE_TTL,
+    DEFAULT_KEEPALIVE_TIMEOUT,
+    DEFAULT_LIMIT_PER_HOST
+)
+
+
+class _PinnedResolver(AbstractResolver):
+    """Resolver answering pinned host names without a DNS lookup."""
+
+    def __init__(self, pinned: Dict[str, str]) -> None:
+        self._pinned = pinned
+        self._fallback = aiohttp.DefaultResolver()
+
+    async def resolve(self, host: str, port: int = 0, family: int = socket.AF_INET):
+        ip = self._pinned.get(host)
+        if ip is None:
+            return await self._fallback.resolve(host, port, family)
+        return [{
+            "hostname": host,
+            "host": ip,
+            "port": port,
+            "family": socket.AF_INET6 if ":" in ip else socket.AF_INET,
+            "proto": 0,
+            "flags": socket.AI_NUMERICHOST,
+        }]
+
+    async def close(self) -> None:
+        await self._fallback.close()
+
+
+@dataclass
+class ConnectionOptions:
+    """Keep-alive and DNS settings of the connection pool.
+
+    The inverter's web server is slow to accept connections, so idle
+    connections are kept around long enough to be reused by the next poll.
+    Set `keepalive_timeout` a little above the poll interval. `pinned_ips`
+    maps host names to addresses that are used instead of resolving them.
+    """
+    keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT
+    limit_per_host: int = DEFAULT_LIMIT_PER_HOST
+    limit: int = 100
+    ttl_dns_cache: Optional[int] = DEFAULT_DNS_CACHE_TTL
+    pinned_ips: Optional[Dict[str, str]] = None
+    force_close: bool = False
+
+    def create_connector(self) -> aiohttp.TCPConnector:
+        """Create a connector with these settings. Needs a running event loop."""
+        kwargs = {}
+        if self.pinned_ips:
+            kwargs["resolver"] = _PinnedResolver(dict(self.pinned_ips))
+        if not self.force_close:
+            # aiohttp refuses a keep-alive timeout together with force_close
+            kwargs["keepalive_timeout"] = self.keepalive_timeout
+        return aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.ttl_dns_cache,
+            use_dns_cache=self.ttl_dns_cache is not None,
+            force_close=self.force_close,
+            **kwargs,
+        )
@@ -6,3 +6,67 @@ PATH_YIELD_DAY = '/gen.yield.day.chart.js'
 PATH_YIELD_MONTH = '/gen.yield.month.chart.js'
 PATH_YIELD_YEAR = '/gen.yield.year.chart.js'
 PATH_YIELD_TOTAL = '/gen.yield.total.chart.js'
+
+# The embedded web server handles only a few connections at a time
+DEFAULT_MAX_CONCURRENCY = 3
+
+# Fleet polling defaults
+DEFAULT_FLEET_CONCURRENCY = 50
+DEFAULT_POLL_INTERVAL = 30.0
+
+# Connection pool defaults, keep-alive outlives the default poll interval
+DEFAULT_LIMIT_PER_HOST = 2
+DEFAULT_KEEPALIVE_TIMEOUT = 60.0
+DEFAULT_DNS_CACHE_TTL = 300
+
+# Seconds a cached payload stays fresh, by how fast the endpoint changes
+DEFAULT_CACHE_TTLS = {
+    PATH_SYSTEM_INFO: 3600.0,
+    PATH_MEASUREMENTS: 5.0,
+    PATH_YIELD_DAY: 60.0,
+    PATH_YIELD_MONTH: 300.0,
+    PATH_YIELD_YEAR: 900.0,
+    PATH_YIELD_TOTAL: 900.0,
+}
+DEFAULT_CACHE_SIZE = 1024
+
+# Adaptive measurement subscription, in seconds
+DEFAULT_SUBSCRIBE_MIN_INTERVAL = 5.0
+DEFAULT_SUBSCRIBE_MAX_INTERVAL = 60.0
+DEFAULT_SUBSCRIBE_IDLE_INTERVAL = 300.0
+# Relative DC power change that counts as a ramp
+DEFAULT_POWER_CHANGE_THRESHOLD = 0.05
+
+# Derived metrics: power statistics window and longest gap integrated, seconds
+DEFAULT_POWER_WINDOW = 900.0
+DEFAULT_MAX_INTEGRATION_GAP = 300.0
+
+# Anomaly detection: readings kept per metric, low output share of the
+# nominal power, slack on the yield a nominal power can produce and the
+# local hours in which low output is suspicious
+DEFAULT_ANOMALY_HISTORY = 10
+DEFAULT_LOW_OUTPUT_RATIO = 0.05
+DEFAULT_YIELD_JUMP_TOLERANCE = 1.5
+DEFAULT_DAYLIGHT_HOURS = (10, 15)
+
+# Network discovery: cheap connect probes, then few system info requests
+DEFAULT_DISCOVERY_CONCURRENCY = 1024
+DEFAULT_CONNECT_TIMEOUT = 0.5
+DEFAULT_CONFIRM_CONCURRENCY = 32
+DEFAULT_CONFIRM_TIMEOUT = 2.0
+
+# Request timeouts in seconds, adaptive timeouts stay within these bounds
+DEFAULT_TIMEOUT = 5.0
+DEFAULT_MIN_TIMEOUT = 0.5
+
+# Retries and circuit breaker
+DEFAULT_RETRY_ATTEMPTS = 2
+DEFAULT_RETRY_BASE_DELAY = 0.1
+DEFAULT_RETRY_MAX_DELAY = 2.0
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_RESET_TIMEOUT = 30.0
+
+# Collector batching
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL = 10.0
+DEFAULT_QUEUE_SIZE = 10000
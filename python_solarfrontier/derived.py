@@ -0,0 +1,206 @@
+"""Quantities derived incrementally from the measurement stream.
+
+Each update costs O(1) (amortized for the rolling minimum and maximum), so
+an engine per inverter can run live on every poll of a fleet:
+
+    engine = DerivedMetricsEngine()
+    measurements = {}
+    async for delta in api.subscribe_measurements():
+        measurements.update(delta.changes)
+        derived = engine.update(measurements, delta.timestamp)
+
+A delta only holds what changed, so the latest values are merged from it
+instead of polling the measurements a second time.
+"""
+
+import math
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import NamedTuple, Optional, Sequence
+
+from .const import DEFAULT_MAX_INTEGRATION_GAP, DEFAULT_POWER_WINDOW
+from .utils import as_reading
+
+_PHASES = (1, 2, 3)
+
+
+def _value(measurements: dict, name: str) -> Optional[float]:
+    reading = as_reading(measurements.get(name))
+    return None if reading is None else reading.value
+
+
+def imbalance(values: Sequence[Optional[float]]) -> Optional[float]:
+    """Largest deviation of the phases from their mean, relative to the mean.
+
+    None if a phase is missing or the mean is zero.
+    """
+    if len(values) == 0 or any(value is None for value in values):
+        return None
+    mean = sum(values) / len(values)
+    if mean == 0:
+        return None
+    return max(abs(value - mean) for value in values) / abs(mean)
+
+
+class RollingStats:
+    """Mean, standard deviation, minimum and maximum over a time window."""
+
+    def __init__(self, window: float) -> None:
+        """Initialize the statistics over the last `window` seconds."""
+        self.window = window
+        self._samples = deque()
+        self._sum = 0.0
+        self._sum_squares = 0.0
+        # Candidates for the minimum and maximum, monotonic in value
+        self._min = deque()
+        self._max = deque()
+
+    def add(self, timestamp: float, value: float) -> None:
+        """Add a sample, dropping those that left the window."""
+        self._samples.append((timestamp, value))
+        self._sum += value
+        self._sum_squares += value * value
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((timestamp, value))
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((timestamp, value))
+
+        start = timestamp - self.window
+        while self._samples[0][0] < start:
+            _, old = self._samples.popleft()
+            self._sum -= old
+            self._sum_squares -= old * old
+        while self._min[0][0] < start:
+            self._min.popleft()
+        while self._max[0][0] < start:
+            self._max.popleft()
+
+    @property
+    def count(self) -> int:
+        return len(self._samples)
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self._sum / len(self._samples) if self._samples else None
+
+    @property
+    def std(self) -> Optional[float]:
+        if not self._samples:
+            return None
+        mean = self._sum / len(self._samples)
+        # Rounding may leave a tiny negative variance
+        return math.sqrt(max(0.0, self._sum_squares / len(self._samples) - mean * mean))
+
+    @property
+    def min(self) -> Optional[float]:
+        return self._min[0][1] if self._min else None
+
+    @property
+    def max(self) -> Optional[float]:
+        return self._max[0][1] if self._max else None
+
+
+@dataclass
+class DerivedMetrics:
+    """Quantities derived from one measurement sample, powers in W.
+
+    `efficiency` is the AC power divided by the DC power, None while there is
+    no DC power. Imbalances are relative, see `imbalance()`. The power
+    statistics cover the AC power of the engine's window and `energy` is
+    the integrated AC energy in Wh since the engine started.
+    """
+    timestamp: float
+    dc_power: Optional[float]
+    ac_power: Optional[float]
+    efficiency: Optional[float]
+    current_imbalance: Optional[float]
+    voltage_imbalance: Optional[float]
+    power_mean: Optional[float]
+    power_std: Optional[float]
+    power_min: Optional[float]
+    power_max: Optional[float]
+    energy: float
+
+
+class YieldCheck(NamedTuple):
+    """Integrated energy against the day yield counter, both in Wh."""
+    integrated: float
+    reported: float
+
+    @property
+    def error(self) -> Optional[float]:
+        """Relative difference, None until the counter moved."""
+        return (self.integrated - self.reported) / self.reported if self.reported else None
+
+
+class DerivedMetricsEngine:
+    """Derive efficiency, phase imbalance, power statistics and energy.
+
+    Feed one engine per inverter with its measurements in time order. The
+    AC power is integrated with the trapezoidal rule; gaps longer than
+    `max_gap` seconds, e.g. while the inverter was unreachable, are not
+    integrated and counted in `gaps`.
+    """
+
+    def __init__(self, window: float = DEFAULT_POWER_WINDOW, max_gap: float = DEFAULT_MAX_INTEGRATION_GAP) -> None:
+        """Initialize the engine with statistics over `window` seconds."""
+        self.max_gap = max_gap
+        self.power = RollingStats(window)
+        self.energy = 0.0
+        self.gaps = 0
+        self._last: Optional[tuple] = None
+        # (day yield, integrated energy) when the day yield was first seen
+        self._yield_base: Optional[tuple] = None
+
+    def update(self, measurements: dict, timestamp: Optional[float] = None) -> DerivedMetrics:
+        """Add a sample as returned by `get_measurements()`, typed or not."""
+        timestamp = time.time() if timestamp is None else timestamp
+        dc_power = _value(measurements, "dc_power")
+        ac_power = _value(measurements, "ac_power")
+        if ac_power is None:
+            phases = [_value(measurements, f"ac_power_phase_{phase}") for phase in _PHASES]
+            if None not in phases:
+                ac_power = sum(phases)
+
+        if ac_power is not None:
+            if self._last is not None:
+                last_time, last_power = self._last
+                if timestamp < last_time:
+                    raise ValueError(f"Sample at {timestamp} is older than the last one at {last_time}")
+                if timestamp - last_time <= self.max_gap:
+                    self.energy += (last_power + ac_power) / 2 * (timestamp - last_time) / 3600
+                else:
+                    self.gaps += 1
+            self._last = (timestamp, ac_power)
+            self.power.add(timestamp, ac_power)
+
+        return DerivedMetrics(
+            timestamp=timestamp,
+            dc_power=dc_power,
+            ac_power=ac_power,
+            efficiency=ac_power / dc_power if dc_power and ac_power is not None else None,
+            current_imbalance=imbalance([_value(measurements, f"ac_current_phase_{phase}") for phase in _PHASES]),
+            voltage_imbalance=imbalance([_value(measurements, f"ac_voltage_phase_{phase}") for phase in _PHASES]),
+            power_mean=self.power.mean,
+            power_std=self.power.std,
+            power_min=self.power.min,
+            power_max=self.power.max,
+            energy=self.energy,
+        )
+
+    def check_yield_day(self, yield_day) -> Optional[YieldCheck]:
+        """Compare the energy integrated since the counter was first seen with its increase.
+
+        `yield_day` is the value of `get_yield_day()`. The comparison starts
+        over when the counter drops at midnight. None if it cannot be parsed.
+        """
+        reading = as_reading(yield_day)
+        if reading is None:
+            return None
+        if self._yield_base is None or reading.value < self._yield_base[0]:
+            self._yield_base = (reading.value, self.energy)
+        base_yield, base_energy = self._yield_base
+        return YieldCheck(self.energy - base_energy, reading.value - base_yield)
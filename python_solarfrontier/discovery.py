@@ -0,0 +1,170 @@
+"""Find inverters on the local network.
+
+Every address of the scanned networks first gets a plain TCP connect with a
+short timeout. Only addresses that accept the connection are asked for
+their system info, and only those whose answer parses as such count as
+inverters. Run as `solarfrontier-discover 192.168.0.0/22`.
+"""
+
+import argparse
+import asyncio
+import ipaddress
+import json
+import logging
+from dataclasses import asdict, dataclass
+from typing import AsyncIterator, Iterable, Iterator, List, Optional, Sequence, Union
+
+import aiohttp
+
+from .api import SolarFrontierAPI
+from .connection import ConnectionOptions
+from .const import (
+    DEFAULT_CONFIRM_CONCURRENCY,
+    DEFAULT_CONFIRM_TIMEOUT,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_DISCOVERY_CONCURRENCY
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class DiscoveredInverter:
+    """An inverter that answered with its system info."""
+    host: str
+    model_name: str
+    nominal_power: Optional[str] = None
+
+
+def _addresses(networks: Union[str, Iterable[str]]) -> Iterator[str]:
+    if isinstance(networks, str):
+        networks = [networks]
+    for network in networks:
+        for address in ipaddress.ip_network(network, strict=False).hosts():
+            yield str(address)
+
+
+def _concurrency_limit(concurrency: int) -> int:
+    """Keep the number of probes below the open file limit."""
+    try:
+        import resource
+    except ImportError:
+        return concurrency
+    soft_limit, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft_limit == resource.RLIM_INFINITY:
+        return concurrency
+    return max(1, min(concurrency, soft_limit - 64))
+
+
+async def is_port_open(host: str, port: int = 80, timeout: float = DEFAULT_CONNECT_TIMEOUT) -> bool:
+    """Check whether host accepts TCP connections on port."""
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    return True
+
+
+async def discover(
+    networks: Union[str, Iterable[str]],
+    port: int = 80,
+    concurrency: int = DEFAULT_DISCOVERY_CONCURRENCY,
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+    confirm_concurrency: int = DEFAULT_CONFIRM_CONCURRENCY,
+    confirm_timeout: float = DEFAULT_CONFIRM_TIMEOUT,
+) -> AsyncIterator[DiscoveredInverter]:
+    """Scan networks in CIDR notation and yield inverters as they are found.
+
+    Up to `concurrency` connect probes run at once, capped by the open file
+    limit of the process. Addresses are generated lazily, so large ranges
+    need no more memory than small ones.
+    """
+    addresses = _addresses(networks)
+    results = asyncio.Queue()
+    confirming = asyncio.Semaphore(confirm_concurrency)
+    options = ConnectionOptions(limit=confirm_concurrency, force_close=True, ttl_dns_cache=None)
+    session = aiohttp.ClientSession(connector=options.create_connector())
+
+    async def confirm(address: str) -> Optional[DiscoveredInverter]:
+        host = address if port == 80 else f"{address}:{port}"
+        api = SolarFrontierAPI(host, session=session, timeout=confirm_timeout)
+        async with confirming:
+            system_info = await api.get_system_info()
+        if not system_info or system_info.get("model_name") is None:
+            _LOGGER.debug("%s is not an inverter", host)
+            return None
+        return DiscoveredInverter(host, system_info["model_name"], system_info.get("nominal_power"))
+
+    async def worker() -> None:
+        for address in addresses:
+            if not await is_port_open(address, port, connect_timeout):
+                continue
+            try:
+                inverter = await confirm(address)
+            except Exception as err:
+                # One odd device must not end the scan of the whole range
+                _LOGGER.debug("Could not query %s: %r", address, err)
+                continue
+            if inverter is not None:
+                await results.put(inverter)
+
+    async def run() -> None:
+        workers = [asyncio.ensure_future(worker()) for _ in range(_concurrency_limit(concurrency))]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            await results.put(None)
+
+    scan = asyncio.ensure_future(run())
+    try:
+        while True:
+            inverter = await results.get()
+            if inverter is None:
+                break
+            yield inverter
+        await scan
+    finally:
+        scan.cancel()
+        await session.close()
+
+
+async def scan(networks: Union[str, Iterable[str]], **kwargs) -> List[DiscoveredInverter]:
+    """Scan networks and return all inverters found, sorted by address."""
+    found = [inverter async for inverter in discover(networks, **kwargs)]
+    return sorted(found, key=lambda inverter: ipaddress.ip_address(inverter.host.split(":")[0]))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Entry point of the solarfrontier-discover console script."""
+    parser = argparse.ArgumentParser(
+        prog="solarfrontier-discover", description="Find Solar Frontier inverters on the network.")
+    parser.add_argument("networks", nargs="+", help="networks to scan, e.g. 192.168.0.0/24")
+    parser.add_argument("--port", type=int, default=80, help="HTTP port of the inverters")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_DISCOVERY_CONCURRENCY,
+                        help="concurrent connect probes")
+    parser.add_argument("--connect-timeout", type=float, default=DEFAULT_CONNECT_TIMEOUT,
+                        help="seconds to wait for a connection")
+    parser.add_argument("--json", action="store_true", help="print one JSON object per inverter")
+    args = parser.parse_args(argv)
+
+    async def run() -> None:
+        async for inverter in discover(
+            args.networks, port=args.port, concurrency=args.concurrency, connect_timeout=args.connect_timeout,
+        ):
+            if args.json:
+                print(json.dumps(asdict(inverter)), flush=True)
+            else:
+                print(f"{inverter.host}\t{inverter.model_name}\t{inverter.nominal_power or ''}", flush=True)
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""Local fake inverter web server for tests and benchmarks."""
+
+import asyncio
+import random
+import weakref
+from typing import Dict, Optional
+
+from aiohttp import web
+
+from .const import (
+    PATH_SYSTEM_INFO,
+    PATH_MEASUREMENTS,
+    PATH_YIELD_DAY,
+    PATH_YIELD_MONTH,
+    PATH_YIELD_YEAR,
+    PATH_YIELD_TOTAL
+)
+
+# Typical daytime readings of a three phase 5.5 kW inverter
+SAMPLE_MEASUREMENTS = {
+    "P DC": ("4012.5", "W"),
+    "U DC": ("612.3", "V"),
+    "I DC": ("6.55", "A"),
+    "U AC1": ("231.2", "V"),
+    "U AC2": ("230.8", "V"),
+    "U AC3": ("232.0", "V"),
+    "I AC1": ("5.61", "A"),
+    "I AC2": ("5.58", "A"),
+    "I AC3": ("5.63", "A"),
+    "F AC": ("50.01", "Hz"),
+    "F AC1": ("50.01", "Hz"),
+    "F AC2": ("50.01", "Hz"),
+    "F AC3": ("50.01", "Hz"),
+    "P AC": ("3890.2", "W"),
+    "P AC1": ("1297.0", "W"),
+    "P AC2": ("1287.4", "W"),
+    "P AC3": ("1305.8", "W"),
+}
+
+# Yields in kWh per hour of a sunny day, per day and per month
+SAMPLE_DAY_SERIES = {
+    f"{hour}:00": value for hour, value in zip(range(6, 21), (
+        0.0, 0.1, 0.4, 0.9, 1.5, 2.0, 2.3, 2.4, 2.3, 2.0, 1.6, 1.1, 0.6, 0.2, 0.0))
+}
+SAMPLE_MONTH_SERIES = {str(day): round(8 + (day * 7) % 11 * 1.1, 1) for day in range(1, 18)}
+SAMPLE_YEAR_SERIES = {
+    month: value for month, value in zip(
+        ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul"),
+        (120.4, 210.8, 480.1, 690.3, 850.2, 910.7, 412.7))
+}
+
+
+def system_info_payload(model_name: str = "SF-WR-5503x", nominal_power: str = "5.5 kW") -> str:
+    """Build a gen.info.table.sys.js payload."""
+    return (
+        "document.write(\"<table class='info'>"
+        f"<tr><td>Name</td><td>{model_name}</td></tr>"
+        "<tr><td>Serial Number</td><td>750123456789</td></tr>"
+        "<tr><td>Software Version</td><td>2.4.1</td></tr>"
+        f"<tr><td>Nominal Power</td><td>{nominal_power}</td></tr>"
+        "</table>\");\n"
+    )
+
+
+def measurements_payload(measurements: Optional[Dict[str, tuple]] = None) -> str:
+    """Build a gen.measurements.table.js payload from name -> (value, unit)."""
+    rows = "".join(
+        f"<tr><td>{name}</td><td align='right'>{value}</td><td>{unit}</td></tr>"
+        for name, (value, unit) in (measurements or SAMPLE_MEASUREMENTS).items()
+    )
+    return f"document.write(\"<table class='measurements'>{rows}</table>\");\n"
+
+
+def yield_payload(label: str, series: Optional[Dict[str, float]] = None, unit: str = "kWh") -> str:
+    """Build a gen.yield.*.chart.js payload showing label, e.g. "12.3kWh".
+
+    `series` maps chart labels to the yield of each interval in `unit`.
+    """
+    series = series or {}
+    labels = ", ".join(f"\"{name}\"" for name in series)
+    data = ", ".join(str(value) for value in series.values())
+    return (
+        "var chart = new Chart();\n"
+        f"chart.labels = [{labels}];\n"
+        f"chart.data = [{data}];\n"
+        f"chart.unit = \"{unit}\";\n"
+        f"document.getElementById(\"labelValueId\").innerHTML = \"{label}\";\n"
+    )
+
+
+def default_payloads() -> Dict[str, str]:
+    """Payloads for all inverter paths."""
+    return {
+        PATH_SYSTEM_INFO: system_info_payload(),
+        PATH_MEASUREMENTS: measurements_payload(),
+        PATH_YIELD_DAY: yield_payload("18.4kWh", SAMPLE_DAY_SERIES),
+        PATH_YIELD_MONTH: yield_payload("412.7kWh", SAMPLE_MONTH_SERIES),
+        PATH_YIELD_YEAR: yield_payload("5.21MWh", SAMPLE_YEAR_SERIES),
+        PATH_YIELD_TOTAL: yield_payload("48.93MWh"),
+    }
+
+
+class FakeInverter:
+    """Serve inverter payloads on localhost.
+
+    Every response is delayed by `latency` plus up to `jitter` seconds. The
+    first request on a new connection waits another `handshake_latency`
+    seconds, like the slow embedded server does. A share of `error_rate`
+    requests fails with HTTP 500. Payloads can be changed while running.
+
+        async with FakeInverter(latency=0.01) as inverter:
+            api = SolarFrontierAPI(inverter.url)
+    """
+
+    def __init__(
+        self,
+        payloads: Optional[Dict[str, str]] = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        handshake_latency: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: Optional[int] = None,
+    ) -> None:
+        """Initialize the server, port 0 picks a free port."""
+        self.payloads = payloads if payloads is not None else default_payloads()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.handshake_latency = handshake_latency
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self.connections = 0
+        self._random = random.Random(seed)
+        self._seen_transports = weakref.WeakSet()
+        self._runner = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the running server."""
+        return f"http://{self.host}:{self.port}"
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        transport = request.transport
+        delay = self.latency + self._random.uniform(0, self.jitter)
+        if transport not in self._seen_transports:
+            self._seen_transports.add(transport)
+            self.connections += 1
+            delay += self.handshake_latency
+        if delay:
+            await asyncio.sleep(delay)
+        if self.error_rate and self._random.random() < self.error_rate:
+            return web.Response(status=500, text="Internal Server Error")
+        payload = self.payloads.get(request.path)
+        if payload is None:
+            return web.Response(status=404, text="Not Found")
+        return web.Response(text=payload, content_type="application/javascript")
+
+    async def start(self) -> None:
+        """Start serving."""
+        app = web.Application()
+        app.router.add_get("/{path:.*}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "FakeInverter":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
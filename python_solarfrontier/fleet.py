@@ -0,0 +1,150 @@
+"""Poll many inverters over one shared connection pool."""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, replace
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Optional
+
+import aiohttp
+
+from .api import SolarFrontierAPI
+from .cache import ResponseCache
+from .connection import ConnectionOptions
+from .const import DEFAULT_FLEET_CONCURRENCY, DEFAULT_POLL_INTERVAL
+from .metrics import MetricsHook, create_trace_config
+from .resilience import HostGuard
+from .transport import Transport
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class FleetResult:
+    """Result of polling one inverter."""
+    host: str
+    timestamp: float
+    result: Any = None
+    error: Optional[Exception] = None
+
+
+async def _fetch_snapshot(api: SolarFrontierAPI):
+    return await api.get_snapshot()
+
+
+class SolarFrontierFleet:
+    """Poll a fleet of inverters with a global concurrency limit.
+
+    All inverters share one aiohttp session whose connector caps the number
+    of sockets per host, so the process needs a few connections per device
+    instead of a whole pool each.
+    """
+
+    def __init__(
+        self,
+        hosts: Iterable[str],
+        interval: float = DEFAULT_POLL_INTERVAL,
+        max_concurrency: int = DEFAULT_FLEET_CONCURRENCY,
+        connection: Optional[ConnectionOptions] = None,
+        fetch: Callable[[SolarFrontierAPI], Awaitable[Any]] = _fetch_snapshot,
+        metrics: Optional[MetricsHook] = None,
+        guard_factory: Optional[Callable[[], HostGuard]] = None,
+        cache: Optional[ResponseCache] = None,
+        transport: Optional[Transport] = None,
+    ) -> None:
+        """Initialize the fleet.
+
+        `fetch` is awaited for every inverter on each poll and defaults to
+        `SolarFrontierAPI.get_snapshot`. `connection.limit_per_host` caps both
+        the sockets and the concurrent requests per inverter. `metrics` is
+        shared by all inverters. `guard_factory`, e.g. `HostGuard`, creates
+        the guard of every inverter so dead ones fail fast. A `cache` and a
+        `transport`, e.g. `StreamTransport()`, are shared by all inverters.
+        """
+        self.hosts = list(dict.fromkeys(hosts))
+        self.interval = interval
+        self.max_concurrency = max_concurrency
+        self.connection = connection or ConnectionOptions()
+        self.fetch = fetch
+        self.metrics = metrics
+        self.guard_factory = guard_factory
+        self.cache = cache
+        self.transport = transport
+        self._guards = {}
+        self._session = None
+        self._apis = {}
+
+    @property
+    def session(self):
+        """Lazy initialization of the shared aiohttp.ClientSession."""
+        if self._session is None or self._session.closed:
+            options = replace(
+                self.connection,
+                limit=self.max_concurrency * self.connection.limit_per_host,
+            )
+            connector = options.create_connector()
+            trace_configs = [create_trace_config()] if self.metrics else None
+            self._session = aiohttp.ClientSession(connector=connector, trace_configs=trace_configs)
+            self._apis = {}
+        return self._session
+
+    def api(self, host: str) -> SolarFrontierAPI:
+        """Get the API object of host, bound to the shared session."""
+        session = self.session
+        if host not in self._apis:
+            # Guards outlive sessions, the host state is still valid
+            if self.guard_factory is not None and host not in self._guards:
+                self._guards[host] = self.guard_factory()
+            self._apis[host] = SolarFrontierAPI(
+                host,
+                max_concurrency=self.connection.limit_per_host,
+                session=session,
+                metrics=self.metrics,
+                guard=self._guards.get(host),
+                cache=self.cache,
+                transport=self.transport,
+            )
+        return self._apis[host]
+
+    async def poll_once(self) -> AsyncIterator[FleetResult]:
+        """Poll every inverter once, yielding results as they complete."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def poll(host):
+            async with semaphore:
+                try:
+                    result = await self.fetch(self.api(host))
+                except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                    _LOGGER.debug("Polling %s failed: %r", host, err)
+                    return FleetResult(host, time.time(), error=err)
+                return FleetResult(host, time.time(), result)
+
+        tasks = [asyncio.ensure_future(poll(host)) for host in self.hosts]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def poll(self, rounds: Optional[int] = None) -> AsyncIterator[FleetResult]:
+        """Poll the fleet every `interval` seconds, forever or for `rounds` rounds.
+
+        A round that takes longer than the interval is followed immediately
+        by the next one. Results are produced as soon as they arrive, so a
+        slow consumer delays the remaining results of the round.
+        """
+        loop = asyncio.get_running_loop()
+        done = 0
+        while rounds is None or done < rounds:
+            started = loop.time()
+            async for result in self.poll_once():
+                yield result
+            done += 1
+            if rounds is None or done < rounds:
+                await asyncio.sleep(max(0.0, started + self.interval - loop.time()))
+
+    async def close(self):
+        """Close the shared session."""
+        if self._session:
+            await self._session.close()
@@ -0,0 +1,184 @@
+"""Bulk parsing of archived payloads across a process pool.
+
+Files are named after the endpoint they were saved from, e.g.
+`2021-06-01T12-00-00.gen.measurements.table.js`. `parse_files()` reads them
+in chunks, parses the chunks in worker processes and yields columnar
+batches in input order:
+
+    for batch in parse_files(find_payloads("/srv/archive"), typed=True):
+        table = pyarrow.table({"path": batch.paths, **batch.columns})
+"""
+
+import itertools
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from .const import (
+    PATH_MEASUREMENTS,
+    PATH_SYSTEM_INFO,
+    PATH_YIELD_DAY,
+    PATH_YIELD_MONTH,
+    PATH_YIELD_TOTAL,
+    PATH_YIELD_YEAR
+)
+from .utils import MEASUREMENT_NAMES, SolarFrontierWebInfoParser, as_reading
+
+KIND_SYSTEM_INFO = "system_info"
+KIND_MEASUREMENTS = "measurements"
+KIND_YIELD = "yield"
+
+# File name suffix -> kind of payload
+_KINDS = {
+    PATH_SYSTEM_INFO.lstrip("/"): KIND_SYSTEM_INFO,
+    PATH_MEASUREMENTS.lstrip("/"): KIND_MEASUREMENTS,
+    PATH_YIELD_DAY.lstrip("/"): KIND_YIELD,
+    PATH_YIELD_MONTH.lstrip("/"): KIND_YIELD,
+    PATH_YIELD_YEAR.lstrip("/"): KIND_YIELD,
+    PATH_YIELD_TOTAL.lstrip("/"): KIND_YIELD,
+}
+# Columns in the order they are returned, further ones are appended
+_COLUMNS = {
+    KIND_SYSTEM_INFO: ["model_name", "nominal_power"],
+    KIND_MEASUREMENTS: list(MEASUREMENT_NAMES.values()),
+    KIND_YIELD: ["yield"],
+}
+_NAN = float("nan")
+
+
+class ParsedBatch(NamedTuple):
+    """Parsed payloads of one kind, one list entry per file in each column.
+
+    Values missing from a payload are None, or NaN for typed columns. Files
+    that could not be read are left out and listed in `errors`.
+    """
+    kind: str
+    paths: List[str]
+    columns: Dict[str, list]
+    errors: Dict[str, str]
+
+
+def payload_kind(path: str) -> Optional[str]:
+    """Kind of payload stored in path according to its name, None if unknown."""
+    name = os.path.basename(path)
+    for suffix, kind in _KINDS.items():
+        if name.endswith(suffix):
+            return kind
+    return None
+
+
+def find_payloads(root: str) -> Iterator[str]:
+    """Walk root lazily and yield the paths of all payload files."""
+    for directory, subdirectories, names in os.walk(root):
+        subdirectories.sort()
+        for name in sorted(names):
+            if payload_kind(name) is not None:
+                yield os.path.join(directory, name)
+
+
+def _typed(value) -> float:
+    reading = as_reading(value)
+    return _NAN if reading is None else reading.value
+
+
+def _parse(kind: str, payload: str, typed: bool) -> dict:
+    if kind == KIND_MEASUREMENTS:
+        measurements = SolarFrontierWebInfoParser.parse_measurements(payload, typed)
+        if typed:
+            return {name: reading.value for name, reading in measurements.items() if reading is not None}
+        return measurements
+    if kind == KIND_YIELD:
+        values = {"yield": SolarFrontierWebInfoParser.parse_yield(payload)}
+    else:
+        values = SolarFrontierWebInfoParser.parse_system_info(payload)
+    if typed:
+        values = {name: value if name == "model_name" else _typed(value) for name, value in values.items()}
+    return values
+
+
+def _parse_chunk(chunk: List[tuple], typed: bool) -> List[ParsedBatch]:
+    """Parse (path, kind) pairs into one batch per kind. Runs in a worker."""
+    rows: Dict[str, List[tuple]] = {}
+    errors: Dict[str, Dict[str, str]] = {}
+    for path, kind in chunk:
+        try:
+            with open(path, encoding="utf-8", errors="replace") as handle:
+                payload = handle.read()
+        except OSError as err:
+            errors.setdefault(kind, {})[path] = str(err)
+            continue
+        rows.setdefault(kind, []).append((path, _parse(kind, payload, typed)))
+
+    batches = []
+    for kind in sorted(set(rows) | set(errors)):
+        kind_rows = rows.get(kind, [])
+        names = list(_COLUMNS[kind])
+        for _, values in kind_rows:
+            names.extend(name for name in values if name not in names)
+        columns = {}
+        for name in names:
+            missing = _NAN if typed and name != "model_name" else None
+            columns[name] = [values.get(name, missing) for _, values in kind_rows]
+        batches.append(ParsedBatch(kind, [path for path, _ in kind_rows], columns, errors.get(kind, {})))
+    return batches
+
+
+def _chunks(paths: Iterable[str], kind: Optional[str], chunk_size: int) -> Iterator[List[tuple]]:
+    pairs = ((path, kind or payload_kind(path)) for path in paths)
+    pairs = (pair for pair in pairs if pair[1] is not None)
+    while True:
+        chunk = list(itertools.islice(pairs, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def parse_files(
+    paths: Iterable[str],
+    kind: Optional[str] = None,
+    typed: bool = False,
+    chunk_size: int = 256,
+    processes: Optional[int] = None,
+    max_pending: Optional[int] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> Iterator[ParsedBatch]:
+    """Parse payload files across processes and yield columnar batches.
+
+    `kind` is detected from each file name unless given; files of unknown
+    kind are skipped. With `typed` the values are floats in base units as
+    in `UnitConverter`. `paths` is consumed lazily and at most `max_pending`
+    chunks (twice the number of processes by default) are in flight, so
+    memory stays bounded however many files there are. `processes=0`
+    parses in the calling process. `progress(files, errors)` is called
+    after each chunk with the running totals.
+    """
+    if kind is not None and kind not in _COLUMNS:
+        raise ValueError(f"Unknown payload kind {kind!r}, expected one of {sorted(_COLUMNS)}")
+    chunks = _chunks(paths, kind, chunk_size)
+    files = failed = 0
+
+    def report(batches: List[ParsedBatch]) -> List[ParsedBatch]:
+        nonlocal files, failed
+        for batch in batches:
+            files += len(batch.paths) + len(batch.errors)
+            failed += len(batch.errors)
+        if progress is not None:
+            progress(files, failed)
+        return batches
+
+    if processes == 0:
+        for chunk in chunks:
+            yield from report(_parse_chunk(chunk, typed))
+        return
+
+    processes = processes or os.cpu_count() or 1
+    max_pending = max_pending or 2 * processes
+    with ProcessPoolExecutor(processes) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_parse_chunk, chunk, typed))
+            if len(pending) >= max_pending:
+                yield from report(pending.popleft().result())
+        while pending:
+            yield from report(pending.popleft().result())
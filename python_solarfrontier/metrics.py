@@ -0,0 +1,144 @@
+"""Timing and failure hooks for the API."""
+
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Dict, Optional
+
+import aiohttp
+
+# Consecutive failures after which a host is reported unhealthy
+UNHEALTHY_AFTER_FAILURES = 3
+
+
+@dataclass
+class RequestTiming:
+    """Phases of one successful request, in seconds.
+
+    `dns` and `connect` are None when a pooled connection was reused or the
+    session was created without `create_trace_config()`. `ttfb` runs from
+    sending the request until the response headers arrived.
+    """
+    status: int
+    ttfb: float
+    body: float
+    total: float
+    dns: Optional[float] = None
+    connect: Optional[float] = None
+
+
+class MetricsHook:
+    """Receives timings and failures from `SolarFrontierAPI`.
+
+    All methods do nothing by default; override the ones you need, e.g. to
+    feed Prometheus histograms or OpenTelemetry spans. Hooks are called on
+    the request path, so they should not block.
+    """
+
+    def on_request(self, host: str, path: str, timing: RequestTiming) -> None:
+        """Called after a payload was received."""
+
+    def on_parse(self, host: str, path: str, seconds: float) -> None:
+        """Called after a payload was parsed."""
+
+    def on_error(self, host: str, path: str, error: BaseException, seconds: float) -> None:
+        """Called when fetching failed."""
+
+    def on_parse_error(self, host: str, path: str, error: BaseException, seconds: float) -> None:
+        """Called when a received payload could not be parsed."""
+
+
+@dataclass
+class HostStats:
+    """Counters of one host kept by `MetricsCollector`."""
+    requests: int = 0
+    failures: Counter = field(default_factory=Counter)
+    # Payloads that arrived but could not be parsed, by error type
+    parse_failures: Counter = field(default_factory=Counter)
+    consecutive_failures: int = 0
+    last_success: Optional[float] = None
+    # Exponentially weighted moving average of the request time
+    latency: Optional[float] = None
+    parse_time: float = 0.0
+
+    @property
+    def healthy(self) -> bool:
+        """False after several failed requests in a row."""
+        return self.consecutive_failures < UNHEALTHY_AFTER_FAILURES
+
+
+class MetricsCollector(MetricsHook):
+    """Keep per host request counts, failures by type and latency."""
+
+    def __init__(self, smoothing: float = 0.2) -> None:
+        """Initialize the collector, `smoothing` weighs the newest latency."""
+        self.smoothing = smoothing
+        self.hosts: Dict[str, HostStats] = {}
+
+    def _stats(self, host: str) -> HostStats:
+        stats = self.hosts.get(host)
+        if stats is None:
+            stats = self.hosts[host] = HostStats()
+        return stats
+
+    def on_request(self, host: str, path: str, timing: RequestTiming) -> None:
+        stats = self._stats(host)
+        stats.requests += 1
+        stats.consecutive_failures = 0
+        stats.last_success = time.time()
+        if stats.latency is None:
+            stats.latency = timing.total
+        else:
+            stats.latency += self.smoothing * (timing.total - stats.latency)
+
+    def on_parse(self, host: str, path: str, seconds: float) -> None:
+        self._stats(host).parse_time += seconds
+
+    def on_error(self, host: str, path: str, error: BaseException, seconds: float) -> None:
+        stats = self._stats(host)
+        stats.requests += 1
+        stats.consecutive_failures += 1
+        stats.failures[type(error).__name__] += 1
+
+    def on_parse_error(self, host: str, path: str, error: BaseException, seconds: float) -> None:
+        # The host answered, so this says nothing about its health
+        self._stats(host).parse_failures[type(error).__name__] += 1
+
+
+def _request_ctx(params_ctx) -> Optional[dict]:
+    return params_ctx.trace_request_ctx if isinstance(params_ctx.trace_request_ctx, dict) else None
+
+
+async def _on_dns_start(session, params_ctx, params) -> None:
+    ctx = _request_ctx(params_ctx)
+    if ctx is not None:
+        ctx["dns_started"] = perf_counter()
+
+
+async def _on_dns_end(session, params_ctx, params) -> None:
+    ctx = _request_ctx(params_ctx)
+    if ctx is not None and "dns_started" in ctx:
+        ctx["dns"] = perf_counter() - ctx.pop("dns_started")
+
+
+async def _on_connect_start(session, params_ctx, params) -> None:
+    ctx = _request_ctx(params_ctx)
+    if ctx is not None:
+        ctx["connect_started"] = perf_counter()
+
+
+async def _on_connect_end(session, params_ctx, params) -> None:
+    ctx = _request_ctx(params_ctx)
+    if ctx is not None and "connect_started" in ctx:
+        ctx["connect"] = perf_counter() - ctx.pop("connect_started")
+
+
+def create_trace_config() -> aiohttp.TraceConfig:
+    """Create a trace config recording DNS and connect times of requests."""
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_dns_resolvehost_start.append(_on_dns_start)
+    trace_config.on_dns_resolvehost_end.append(_on_dns_end)
+    trace_config.on_connection_create_start.append(_on_connect_start)
+    trace_config.on_connection_create_end.append(_on_connect_end)
+    return trace_config
@@ -0,0 +1,140 @@
+"""Yields of many inverters summed up per site or group."""
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Mapping, NamedTuple, Optional, Tuple
+
+from .api import SolarFrontierAPI
+from .cache import ResponseCache
+from .connection import ConnectionOptions
+from .const import DEFAULT_CACHE_SIZE, DEFAULT_FLEET_CONCURRENCY
+from .fleet import SolarFrontierFleet
+from .utils import as_reading
+
+_PERIODS = ("day", "month", "year", "total")
+_FIELDS = tuple(f"yield_{period}" for period in _PERIODS)
+
+
+class HostYields(NamedTuple):
+    """Yields of one inverter in Wh, None where it could not be fetched."""
+    day: Optional[float] = None
+    month: Optional[float] = None
+    year: Optional[float] = None
+    total: Optional[float] = None
+
+    @property
+    def complete(self) -> bool:
+        return None not in self
+
+
+class YieldTotals(NamedTuple):
+    """Summed yields in Wh of `hosts` inverters.
+
+    `missing` counts the inverters that lack at least one of the figures;
+    their other figures are still included.
+    """
+    day: float = 0.0
+    month: float = 0.0
+    year: float = 0.0
+    total: float = 0.0
+    hosts: int = 0
+    missing: int = 0
+
+
+def rollup(yields: Iterable[HostYields]) -> YieldTotals:
+    """Sum the yields of several inverters."""
+    sums = dict.fromkeys(_PERIODS, 0.0)
+    hosts = missing = 0
+    for host_yields in yields:
+        hosts += 1
+        missing += not host_yields.complete
+        for period, value in zip(_PERIODS, host_yields):
+            if value is not None:
+                sums[period] += value
+    return YieldTotals(hosts=hosts, missing=missing, **sums)
+
+
+@dataclass
+class PortfolioYields:
+    """Yields of every inverter, of every tag and of the whole portfolio.
+
+    `errors` maps a host to the periods that could not be fetched and why.
+    """
+    timestamp: float
+    hosts: Dict[str, HostYields] = field(default_factory=dict)
+    groups: Dict[str, YieldTotals] = field(default_factory=dict)
+    total: YieldTotals = YieldTotals()
+    errors: Dict[str, Dict[str, Exception]] = field(default_factory=dict)
+
+
+def _wh(value) -> Optional[float]:
+    reading = as_reading(value)
+    return reading.value if reading is not None else None
+
+
+async def fetch_yields(api: SolarFrontierAPI) -> Tuple[HostYields, Dict[str, Exception]]:
+    """Fetch the four yields of an inverter concurrently, in Wh.
+
+    Returns the yields and the errors of the periods that failed.
+    """
+    snapshot = await api.get_snapshot(fields=_FIELDS)
+    yields = HostYields(*(_wh(getattr(snapshot, name)) for name in _FIELDS))
+    errors = {
+        period: snapshot.errors[name] for period, name in zip(_PERIODS, _FIELDS) if name in snapshot.errors
+    }
+    return yields, errors
+
+
+class Portfolio:
+    """Fetch the yields of many inverters and sum them up by tag.
+
+    `tags` maps every host to the sites or groups it belongs to, e.g.
+    {"192.168.0.101": ["site:berlin", "region:eu"]}. Payloads are cached
+    with `DEFAULT_CACHE_TTLS` unless a `cache` is given, so the year and
+    total figures are only fetched every 15 minutes.
+
+        portfolio = Portfolio(tags)
+        yields = await portfolio.refresh()
+        print(yields.groups["site:berlin"].day, yields.total.total)
+    """
+
+    def __init__(
+        self,
+        tags: Mapping[str, Iterable[str]],
+        cache: Optional[ResponseCache] = None,
+        max_concurrency: int = DEFAULT_FLEET_CONCURRENCY,
+        connection: Optional[ConnectionOptions] = None,
+    ) -> None:
+        """Initialize the portfolio."""
+        self.tags = {host: list(host_tags) for host, host_tags in tags.items()}
+        if cache is None:
+            cache = ResponseCache(max_entries=max(DEFAULT_CACHE_SIZE, len(_PERIODS) * len(self.tags)))
+        self.cache = cache
+        self.fleet = SolarFrontierFleet(
+            self.tags, max_concurrency=max_concurrency, connection=connection,
+            fetch=fetch_yields, cache=cache,
+        )
+
+    async def refresh(self) -> PortfolioYields:
+        """Fetch the yields of all inverters and roll them up."""
+        result = PortfolioYields(time.time())
+        async for polled in self.fleet.poll_once():
+            if polled.error is not None:
+                result.hosts[polled.host] = HostYields()
+                result.errors[polled.host] = dict.fromkeys(_PERIODS, polled.error)
+            else:
+                result.hosts[polled.host], errors = polled.result
+                if errors:
+                    result.errors[polled.host] = errors
+
+        members: Dict[str, list] = {}
+        for host, host_yields in result.hosts.items():
+            for tag in self.tags[host]:
+                members.setdefault(tag, []).append(host_yields)
+        result.groups = {tag: rollup(yields) for tag, yields in sorted(members.items())}
+        result.total = rollup(result.hosts.values())
+        return result
+
+    async def close(self) -> None:
+        """Close the connections."""
+        await self.fleet.close()
@@ -0,0 +1,121 @@
+"""Adaptive timeouts, retries and a circuit breaker for one inverter."""
+
+import asyncio
+import random
+import time
+from typing import Optional
+
+import aiohttp
+
+from .const import (
+    DEFAULT_FAILURE_THRESHOLD,
+    DEFAULT_MIN_TIMEOUT,
+    DEFAULT_RESET_TIMEOUT,
+    DEFAULT_RETRY_ATTEMPTS,
+    DEFAULT_RETRY_BASE_DELAY,
+    DEFAULT_RETRY_MAX_DELAY,
+    DEFAULT_TIMEOUT
+)
+
+# The timeout doubles per failure up to this many times, far beyond max_timeout
+_MAX_TIMEOUT_DOUBLINGS = 10
+
+
+class CircuitOpenError(aiohttp.ClientError):
+    """Raised instead of contacting a host that is known to be down."""
+
+
+def is_transient(error: BaseException) -> bool:
+    """Whether a request that failed with error is worth retrying."""
+    status = getattr(error, "status", None)
+    if isinstance(status, int):
+        return status >= 500
+    return isinstance(error, (aiohttp.ClientConnectionError, asyncio.TimeoutError))
+
+
+class HostGuard:
+    """Guard the requests to one inverter.
+
+    The timeout follows the observed latency like TCP's retransmission
+    timeout (smoothed latency plus four deviations), bounded by
+    `min_timeout` and `max_timeout`. Transient failures are retried up to
+    `attempts` times in total with jittered exponential backoff. After
+    `failure_threshold` failed requests in a row the circuit opens and
+    requests fail immediately with `CircuitOpenError`; once `reset_timeout`
+    seconds passed a single probe request is let through, which closes the
+    circuit on success.
+    """
+
+    def __init__(
+        self,
+        min_timeout: float = DEFAULT_MIN_TIMEOUT,
+        max_timeout: float = DEFAULT_TIMEOUT,
+        attempts: int = DEFAULT_RETRY_ATTEMPTS,
+        base_delay: float = DEFAULT_RETRY_BASE_DELAY,
+        max_delay: float = DEFAULT_RETRY_MAX_DELAY,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+    ) -> None:
+        """Initialize the guard."""
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self._latency: Optional[float] = None
+        self._deviation = 0.0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def timeout(self) -> float:
+        """Timeout for the next request."""
+        if self._latency is None:
+            return self.max_timeout
+        # Back off after failures, a timeout may have been too tight
+        backoff = 2 ** min(self.consecutive_failures, _MAX_TIMEOUT_DOUBLINGS)
+        timeout = (self._latency + 4 * self._deviation) * backoff
+        return min(self.max_timeout, max(self.min_timeout, timeout))
+
+    @property
+    def is_open(self) -> bool:
+        """Whether requests are currently refused."""
+        return self._opened_at is not None
+
+    def backoff(self, attempt: int) -> float:
+        """Seconds to wait before retry number attempt (1 based), full jitter."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def before_request(self) -> None:
+        """Raise CircuitOpenError unless a request may be sent now."""
+        if self._opened_at is None:
+            return
+        if self._probing or time.monotonic() - self._opened_at < self.reset_timeout:
+            raise CircuitOpenError("Circuit open, host is considered down")
+        self._probing = True
+
+    def record_success(self, latency: float) -> None:
+        """Record a successful request that took latency seconds."""
+        if self._latency is None:
+            self._latency = latency
+            self._deviation = latency / 2
+        else:
+            self._deviation += 0.25 * (abs(latency - self._latency) - self._deviation)
+            self._latency += 0.125 * (latency - self._latency)
+        self.consecutive_failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def release(self) -> None:
+        """Forget a request that was cancelled before it finished."""
+        self._probing = False
+
+    def record_failure(self) -> None:
+        """Record a failed request."""
+        self.consecutive_failures += 1
+        if self._probing or self.consecutive_failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+        self._probing = False
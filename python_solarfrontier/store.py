@@ -0,0 +1,216 @@
+"""Embedded time-series store for polled inverter data. Requires numpy.
+
+Every host and metric gets an append-only file of raw samples and one file
+per rollup resolution:
+
+    <root>/<host>/<metric>.raw     time, value (both float64)
+    <root>/<host>/<metric>.60      time, count, sum, min, max of each minute
+    <root>/<host>/<metric>.900     ... of each 15 minutes
+    <root>/<host>/<metric>.3600    ... of each hour
+
+Files are read through memory maps, so range queries only touch the pages
+they need. Values are stored in SI base units, as float64 so that yield
+counters in Wh keep their resolution. Samples are buffered per series
+and files are only opened while the buffers are written, so the number
+of series is not bounded by the limit of open files.
+"""
+
+import io
+import os
+import re
+import struct
+import time
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from .utils import as_reading
+
+# Rollup resolutions in seconds
+ROLLUP_RESOLUTIONS = (60, 900, 3600)
+
+RAW_DTYPE = np.dtype([("time", "<f8"), ("value", "<f8")])
+ROLLUP_DTYPE = np.dtype([
+    ("time", "<f8"), ("count", "<u4"), ("sum", "<f8"), ("min", "<f8"), ("max", "<f8"),
+])
+_RAW_RECORD = struct.Struct("<dd")
+_ROLLUP_RECORD = struct.Struct("<dIddd")
+
+
+def _safe_name(name: str) -> str:
+    name = re.sub(r"^https?://", "", name)
+    return re.sub(r"[^A-Za-z0-9._-]", "_", name)
+
+
+def _read(path: str, dtype: np.dtype) -> np.ndarray:
+    """Memory map the records of path, an empty array if there are none."""
+    try:
+        size = os.path.getsize(path)
+    except FileNotFoundError:
+        size = 0
+    if size < dtype.itemsize:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(size // dtype.itemsize,))
+
+
+class _Series:
+    """Buffered records and the unfinished rollup buckets of one host and metric."""
+
+    def __init__(self, directory: str, metric: str) -> None:
+        self.base = os.path.join(directory, metric)
+        # file suffix -> records not written yet
+        self.pending: Dict[str, bytearray] = {}
+        self.buffered = 0
+        raw = _read(f"{self.base}.raw", RAW_DTYPE)
+        self.last_time = float(raw["time"][-1]) if len(raw) else float("-inf")
+        # resolution -> [start, count, sum, min, max] of the current bucket
+        self.buckets: Dict[int, list] = {}
+        for resolution in ROLLUP_RESOLUTIONS:
+            # Rebuild the bucket that was unfinished when the store was closed
+            done = _read(f"{self.base}.{resolution}", ROLLUP_DTYPE)
+            since = float(done["time"][-1]) + resolution if len(done) else float("-inf")
+            pending = raw[np.searchsorted(raw["time"], since):]
+            for timestamp, value in zip(pending["time"].tolist(), pending["value"].tolist()):
+                self._roll(resolution, timestamp, value)
+
+    def _write(self, suffix: str, record: bytes) -> None:
+        buffer = self.pending.get(suffix)
+        if buffer is None:
+            buffer = self.pending[suffix] = bytearray()
+        buffer += record
+        self.buffered += len(record)
+
+    def _roll(self, resolution: int, timestamp: float, value: float) -> None:
+        start = timestamp - timestamp % resolution
+        bucket = self.buckets.get(resolution)
+        if bucket is not None and bucket[0] != start:
+            self._write(str(resolution), _ROLLUP_RECORD.pack(*bucket))
+            bucket = None
+        if bucket is None:
+            self.buckets[resolution] = [start, 1, value, value, value]
+        else:
+            bucket[1] += 1
+            bucket[2] += value
+            bucket[3] = min(bucket[3], value)
+            bucket[4] = max(bucket[4], value)
+
+    def append(self, timestamp: float, value: float) -> None:
+        if timestamp < self.last_time:
+            raise ValueError(f"Sample at {timestamp} is older than the last one at {self.last_time}")
+        self.last_time = timestamp
+        self._write("raw", _RAW_RECORD.pack(timestamp, value))
+        for resolution in ROLLUP_RESOLUTIONS:
+            self._roll(resolution, timestamp, value)
+        if self.buffered >= io.DEFAULT_BUFFER_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        for suffix, buffer in self.pending.items():
+            with open(f"{self.base}.{suffix}", "ab") as handle:
+                handle.write(buffer)
+        self.pending.clear()
+        self.buffered = 0
+
+
+class TimeSeriesStore:
+    """Append samples per host and metric and query time ranges.
+
+    Samples of a series must be appended in time order.
+
+        store = TimeSeriesStore("/var/lib/solarfrontier")
+        await store.record(api)
+        samples = store.query("192.168.0.101", "dc_power", start, end)
+        hourly = store.query("192.168.0.101", "dc_power", start, end, resolution=3600)
+    """
+
+    def __init__(self, root: str) -> None:
+        """Initialize the store in directory root, created if missing."""
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._series: Dict[tuple, _Series] = {}
+
+    def _get_series(self, host: str, metric: str) -> _Series:
+        key = (_safe_name(host), _safe_name(metric))
+        series = self._series.get(key)
+        if series is None:
+            directory = os.path.join(self.root, key[0])
+            os.makedirs(directory, exist_ok=True)
+            series = self._series[key] = _Series(directory, key[1])
+            # Make the metric visible before the first flush
+            open(f"{series.base}.raw", "ab").close()
+        return series
+
+    def append(self, host: str, metric: str, timestamp: float, value: float) -> None:
+        """Append one sample in base units."""
+        self._get_series(host, metric).append(timestamp, value)
+
+    def append_readings(self, host: str, readings: dict, timestamp: Optional[float] = None) -> None:
+        """Append measurements or yields as returned by the API.
+
+        Values may be `Reading` records or strings like "1.5kW"; strings are
+        converted to base units. Missing or unparsable values are skipped.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        for metric, value in readings.items():
+            reading = as_reading(value)
+            if reading is not None:
+                self.append(host, metric, timestamp, reading.value)
+
+    async def record(self, api, timestamp: Optional[float] = None) -> None:
+        """Fetch a snapshot from `api` and store its measurements and yields."""
+        snapshot = await api.get_snapshot()
+        self.append_readings(api.host, snapshot.readings(), timestamp)
+
+    def metrics(self, host: str) -> Iterable[str]:
+        """Names of the metrics stored for host."""
+        directory = os.path.join(self.root, _safe_name(host))
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name[:-4] for name in os.listdir(directory) if name.endswith(".raw"))
+
+    def query(
+        self,
+        host: str,
+        metric: str,
+        start: float = float("-inf"),
+        end: float = float("inf"),
+        resolution: Optional[int] = None,
+    ) -> np.ndarray:
+        """Get the samples of a metric with start <= time < end.
+
+        Without `resolution` the raw samples are returned as a `RAW_DTYPE`
+        array. With one of `ROLLUP_RESOLUTIONS` the buckets starting in the
+        range are returned as a `ROLLUP_DTYPE` array, the last one possibly
+        unfinished.
+        """
+        key = (_safe_name(host), _safe_name(metric))
+        base = os.path.join(self.root, *key)
+        series = self._series.get(key)
+        if series is None and os.path.exists(f"{base}.raw"):
+            # Rebuild the unfinished rollup buckets of a series stored before
+            series = self._get_series(host, metric)
+        if series is not None:
+            series.flush()
+
+        if resolution is None:
+            records = _read(f"{base}.raw", RAW_DTYPE)
+        elif resolution in ROLLUP_RESOLUTIONS:
+            records = _read(f"{base}.{resolution}", ROLLUP_DTYPE)
+            bucket = series.buckets.get(resolution) if series is not None else None
+            if bucket is not None:
+                records = np.concatenate([records, np.array([tuple(bucket)], dtype=ROLLUP_DTYPE)])
+        else:
+            raise ValueError(f"Resolution must be one of {ROLLUP_RESOLUTIONS}")
+
+        times = records["time"]
+        return np.array(records[np.searchsorted(times, start):np.searchsorted(times, end)])
+
+    def flush(self) -> None:
+        """Write buffered samples to disk."""
+        for series in self._series.values():
+            series.flush()
+
+    def close(self) -> None:
+        """Write buffered samples. Unfinished rollup buckets are rebuilt on reopen."""
+        self.flush()
+        self._series.clear()
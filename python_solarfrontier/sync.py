@@ -0,0 +1,165 @@
+"""Synchronous API backed by a background event loop."""
+
+import asyncio
+import atexit
+import concurrent.futures
+import threading
+import weakref
+from typing import Optional
+
+from .api import SolarFrontierAPI, SolarFrontierSnapshot
+from .const import DEFAULT_TIMEOUT
+from .utils import YieldSeries
+
+
+async def _close_all(apis) -> None:
+    await asyncio.gather(*(api.close() for api in apis), return_exceptions=True)
+
+
+class BackgroundLoop:
+    """An event loop running in a daemon thread.
+
+    APIs passed to `register()` are closed when the loop stops.
+    """
+
+    def __init__(self) -> None:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._apis = weakref.WeakSet()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The running loop, started on first use."""
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="solarfrontier-loop", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """Run coro on the loop and wait for its result."""
+        loop = self.loop
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("Cannot block the background loop from its own thread")
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            # Do not leave the request running on the loop
+            future.cancel()
+            raise
+
+    def register(self, api: SolarFrontierAPI) -> None:
+        """Close the session of api when the loop stops."""
+        self._apis.add(api)
+
+    def stop(self) -> None:
+        """Close the registered APIs, stop the loop and wait for its thread."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        apis = list(self._apis)
+        if apis and loop.is_running() and threading.current_thread() is not thread:
+            closing = asyncio.run_coroutine_threadsafe(_close_all(apis), loop)
+            try:
+                closing.result(DEFAULT_TIMEOUT)
+            except concurrent.futures.TimeoutError:
+                closing.cancel()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+_shared_loop = BackgroundLoop()
+atexit.register(_shared_loop.stop)
+
+
+class SolarFrontierSyncAPI:
+    """Blocking wrapper around `SolarFrontierAPI`, safe to use from threads.
+
+    All instances share one background event loop by default, and each
+    keeps its session (and so its connections) open between calls. Keyword
+    arguments are passed on to `SolarFrontierAPI`.
+
+        with SolarFrontierSyncAPI('192.168.0.101') as api:
+            print(api.get_measurements())
+    """
+
+    def __init__(
+        self, host: str, loop: Optional[BackgroundLoop] = None, call_timeout: Optional[float] = None, **kwargs,
+    ) -> None:
+        """Initialize the API, `call_timeout` bounds how long a call may block.
+
+        `timeout` and the other keyword arguments go to `SolarFrontierAPI`.
+        """
+        self._background = loop or _shared_loop
+        self.call_timeout = call_timeout
+        self.api = SolarFrontierAPI(host, **kwargs)
+        self._background.register(self.api)
+
+    @property
+    def host(self) -> str:
+        return self.api.host
+
+    def _run(self, coro):
+        return self._background.run(coro, self.call_timeout)
+
+    def test_connection(self) -> bool:
+        """Test if we can connect with the host."""
+        return self._run(self.api.test_connection())
+
+    def get_system_info(self) -> dict:
+        """Get system information from the inverter."""
+        return self._run(self.api.get_system_info())
+
+    def get_measurements(self, typed: bool = False) -> dict:
+        """Get measurement data from the inverter."""
+        return self._run(self.api.get_measurements(typed))
+
+    def get_yield_day(self) -> float:
+        """Get the yield of the current day."""
+        return self._run(self.api.get_yield_day())
+
+    def get_yield_month(self) -> float:
+        """Get the yield of the current month."""
+        return self._run(self.api.get_yield_month())
+
+    def get_yield_year(self) -> float:
+        """Get the yield of the current year."""
+        return self._run(self.api.get_yield_year())
+
+    def get_yield_total(self) -> float:
+        """Get the total yield."""
+        return self._run(self.api.get_yield_total())
+
+    def get_yield_day_series(self) -> Optional[YieldSeries]:
+        """Get the hourly yields of the current day."""
+        return self._run(self.api.get_yield_day_series())
+
+    def get_yield_month_series(self) -> Optional[YieldSeries]:
+        """Get the daily yields of the current month."""
+        return self._run(self.api.get_yield_month_series())
+
+    def get_yield_year_series(self) -> Optional[YieldSeries]:
+        """Get the monthly yields of the current year."""
+        return self._run(self.api.get_yield_year_series())
+
+    def get_snapshot(self, max_concurrency: Optional[int] = None) -> SolarFrontierSnapshot:
+        """Fetch all endpoints concurrently."""
+        return self._run(self.api.get_snapshot(max_concurrency))
+
+    def close(self) -> None:
+        """Close the session."""
+        self._run(self.api.close())
+
+    def __enter__(self) -> "SolarFrontierSyncAPI":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,325 @@
+"""Ways of sending HTTP requests to the inverter.
+
+`SolarFrontierAPI` sends its requests through a transport:
+
+- `AiohttpTransport`, the default, uses an aiohttp session.
+- `StreamTransport` is a small HTTP/1.1 client on asyncio streams. It keeps
+  one connection per inverter and pipelines concurrent requests over it,
+  which costs far less CPU per request when polling many inverters.
+- `MemoryTransport` answers from a dict of payloads, for tests.
+"""
+
+import asyncio
+import re
+from abc import ABC, abstractmethod
+from collections import deque
+from time import perf_counter
+from typing import Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional, Set, Tuple, Union
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from .const import DEFAULT_TIMEOUT
+
+# Requests sent again when the connection drops before their response
+_RESEND_ATTEMPTS = 2
+_CHARSET_RE = re.compile(r"charset=([\w-]+)", re.IGNORECASE)
+
+
+class TransportResponse(NamedTuple):
+    """Response to a request. Header names are lower case.
+
+    `ttfb` is the time in seconds from sending the request until the
+    headers arrived. `text` is empty unless the status is 200.
+    """
+    status: int
+    headers: Mapping[str, str]
+    text: str
+    ttfb: float = 0.0
+
+
+class Transport(ABC):
+    """Sends GET requests and returns their responses."""
+
+    @abstractmethod
+    async def request(
+        self, url: str, headers: Mapping[str, str], timeout: float, trace: Optional[dict] = None,
+    ) -> TransportResponse:
+        """Send a GET request.
+
+        Raises `aiohttp.ClientError` subclasses when the inverter cannot be
+        reached and `asyncio.TimeoutError` after `timeout` seconds. `trace`
+        may collect timings as in `metrics.create_trace_config()`.
+        """
+
+    async def request_many(self, urls: Iterable[str], timeout: float) -> List[Union[TransportResponse, Exception]]:
+        """Send several requests at once, returning responses or errors in order."""
+        return await asyncio.gather(*(self.request(url, {}, timeout) for url in urls), return_exceptions=True)
+
+    async def close(self) -> None:
+        """Close the connections of the transport."""
+
+
+class AiohttpTransport(Transport):
+    """Send requests through an aiohttp session.
+
+    `session` is a `ClientSession` or a function returning one, which lets
+    the API create its session lazily.
+    """
+
+    def __init__(self, session: Union[aiohttp.ClientSession, Callable[[], aiohttp.ClientSession]]) -> None:
+        self._session = session
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        return self._session() if callable(self._session) else self._session
+
+    async def request(
+        self, url: str, headers: Mapping[str, str], timeout: float, trace: Optional[dict] = None,
+    ) -> TransportResponse:
+        started = perf_counter()
+        async with self.session.get(url, timeout=timeout, headers=headers, trace_request_ctx=trace) as response:
+            ttfb = perf_counter() - started
+            text = await response.text() if response.status == 200 else ""
+            headers = {name.lower(): response.headers[name] for name in response.headers}
+            return TransportResponse(response.status, headers, text, ttfb)
+
+
+async def read_response(reader: asyncio.StreamReader) -> Tuple[TransportResponse, bool, float]:
+    """Read one HTTP/1.1 response.
+
+    Returns the response, whether the server closes the connection after
+    it and the `perf_counter()` time at which its headers were read.
+    """
+    try:
+        status_line = await reader.readuntil(b"\r\n")
+        parts = status_line.decode("latin-1").split(None, 2)
+        if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+            raise aiohttp.ClientPayloadError(f"Invalid status line {status_line!r}")
+        status = int(parts[1])
+        headers = {}
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        headers_read = perf_counter()
+        closing = headers.get("connection", "").lower() == "close" or parts[0] == "HTTP/1.0"
+
+        if status in (204, 304) or 100 <= status < 200:
+            body = b""
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                if size == 0:
+                    # Trailers end with an empty line
+                    while await reader.readuntil(b"\r\n") != b"\r\n":
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            body = b"".join(chunks)
+        elif "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await reader.read()
+            closing = True
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError) as err:
+        raise aiohttp.ClientPayloadError(f"Invalid response: {err}") from err
+
+    text = ""
+    if status == 200:
+        charset = _CHARSET_RE.search(headers.get("content-type", ""))
+        try:
+            text = body.decode(charset.group(1) if charset else "utf-8", errors="replace")
+        except LookupError:
+            # Unknown charset
+            text = body.decode("utf-8", errors="replace")
+    return TransportResponse(status, headers, text), closing, headers_read
+
+
+class _Pending:
+    """A request written to a connection and waiting for its response."""
+    __slots__ = ("data", "future", "attempts", "sent")
+
+    def __init__(self, data: bytes, future: asyncio.Future) -> None:
+        self.data = data
+        self.future = future
+        self.attempts = 0
+        self.sent = 0.0
+
+
+class _PipelinedConnection:
+    """One connection writing requests as they come and reading responses in order."""
+
+    def __init__(self, transport: "StreamTransport", key: tuple, reader, writer) -> None:
+        self.transport = transport
+        self.key = key
+        self.reader = reader
+        self.writer = writer
+        self.pending = deque()
+        self.closed = False
+        # Whether requests without a response are sent again after closing
+        self.resend = True
+        self._reading = asyncio.ensure_future(self._read_responses())
+
+    def send(self, request: _Pending) -> None:
+        request.attempts += 1
+        request.sent = perf_counter()
+        self.pending.append(request)
+        self.writer.write(request.data)
+
+    async def _read_responses(self) -> None:
+        error = None
+        try:
+            while True:
+                response, closing, headers_read = await read_response(self.reader)
+                request = self.pending.popleft()
+                if not request.future.done():
+                    request.future.set_result(response._replace(ttfb=headers_read - request.sent))
+                if closing:
+                    break
+        except asyncio.CancelledError:
+            error = aiohttp.ServerDisconnectedError()
+        except Exception as err:
+            error = err
+        finally:
+            self.close()
+            # Send requests without a response again on a new connection
+            for request in self.pending:
+                if request.future.done():
+                    continue
+                if self.resend and request.attempts < _RESEND_ATTEMPTS:
+                    self.transport._send(self.key, request)
+                else:
+                    request.future.set_exception(aiohttp.ServerDisconnectedError(str(error) if error else None))
+            self.pending.clear()
+
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            self.writer.close()
+            if self._reading is not asyncio.current_task():
+                self._reading.cancel()
+
+
+class StreamTransport(Transport):
+    """Minimal HTTP/1.1 client pipelining requests over one connection per host.
+
+    Requests for the same host are written to its connection right away,
+    without waiting for earlier responses, and the responses are matched in
+    order. When the server closes the connection, requests that got no
+    response are sent again on a new one. Only GET requests of plain or TLS
+    URLs are supported, without proxies or redirects.
+    """
+
+    def __init__(self, connect_timeout: Optional[float] = None) -> None:
+        """Initialize the transport, `connect_timeout` defaults to the request timeout."""
+        self.connect_timeout = connect_timeout
+        self._connections: Dict[tuple, _PipelinedConnection] = {}
+        self._connecting: Dict[tuple, asyncio.Future] = {}
+        self._sending: Set[asyncio.Future] = set()
+
+    async def _connection(self, key: tuple, timeout: float) -> _PipelinedConnection:
+        connection = self._connections.get(key)
+        if connection is not None and not connection.closed:
+            return connection
+        # Requests arriving while connecting wait for the same connection
+        connecting = self._connecting.get(key)
+        if connecting is None:
+            scheme, hostname, port = key
+            connecting = self._connecting[key] = asyncio.ensure_future(asyncio.wait_for(
+                asyncio.open_connection(hostname, port, ssl=scheme == "https"),
+                self.connect_timeout or timeout,
+            ))
+            connecting.add_done_callback(lambda _: self._connecting.pop(key, None))
+        try:
+            reader, writer = await asyncio.shield(connecting)
+        except OSError as err:
+            raise aiohttp.ClientConnectionError(f"Cannot connect to {key[1]}:{key[2]}: {err}") from err
+        connection = self._connections.get(key)
+        if connection is None or connection.closed or connection.reader is not reader:
+            connection = self._connections[key] = _PipelinedConnection(self, key, reader, writer)
+        return connection
+
+    def _send(self, key: tuple, request: _Pending) -> None:
+        async def send():
+            try:
+                connection = await self._connection(key, self.connect_timeout or DEFAULT_TIMEOUT)
+            except Exception as err:
+                if not request.future.done():
+                    request.future.set_exception(err)
+                return
+            connection.send(request)
+
+        # The loop only keeps weak references to tasks
+        sending = asyncio.ensure_future(send())
+        self._sending.add(sending)
+        sending.add_done_callback(self._sending.discard)
+
+    async def request(
+        self, url: str, headers: Mapping[str, str], timeout: float, trace: Optional[dict] = None,
+    ) -> TransportResponse:
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        key = (parts.scheme, parts.hostname, port)
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+        lines = [f"GET {target} HTTP/1.1", f"Host: {parts.netloc}", "Accept-Encoding: identity"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        request = _Pending(
+            ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"), asyncio.get_running_loop().create_future())
+
+        async def send_and_wait() -> TransportResponse:
+            connection = await self._connection(key, timeout)
+            connection.send(request)
+            return await request.future
+
+        try:
+            return await asyncio.wait_for(send_and_wait(), timeout)
+        except asyncio.TimeoutError:
+            # A response may still be owed, later ones would wait behind it
+            connection = self._connections.get(key)
+            if connection is not None and request in connection.pending:
+                request.attempts = _RESEND_ATTEMPTS
+                connection.close()
+            raise
+
+    async def close(self) -> None:
+        connections = list(self._connections.values())
+        self._connections.clear()
+        for connection in connections:
+            connection.resend = False
+            connection.close()
+        for connection in connections:
+            try:
+                await connection.writer.wait_closed()
+            except OSError:
+                pass
+
+
+class MemoryTransport(Transport):
+    """Answer requests from payloads by path, without any network.
+
+    Paths missing from `payloads` answer 404. Every requested URL is
+    appended to `requests`.
+    """
+
+    def __init__(self, payloads: Mapping[str, str], latency: float = 0.0) -> None:
+        self.payloads = payloads
+        self.latency = latency
+        self.requests: List[str] = []
+
+    async def request(
+        self, url: str, headers: Mapping[str, str], timeout: float, trace: Optional[dict] = None,
+    ) -> TransportResponse:
+        self.requests.append(url)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        payload = self.payloads.get(urlsplit(url).path)
+        if payload is None:
+            return TransportResponse(404, {}, "")
+        return TransportResponse(200, {"content-type": "text/javascript"}, payload)
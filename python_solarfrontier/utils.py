@@ -1,6 +1,110 @@
 """Utility classes to work with device data."""
-from typing import Tuple
+from typing import List, NamedTuple, Optional, Tuple
 import re
+import string
+
+
+# Row names of the measurements table -> result keys
+MEASUREMENT_NAMES = {
+    "P DC": "dc_power",
+    "U DC": "dc_voltage",
+    "I DC": "dc_current",
+    "U AC1": "ac_voltage_phase_1",
+    "U AC2": "ac_voltage_phase_2",
+    "U AC3": "ac_voltage_phase_3",
+    "I AC1": "ac_current_phase_1",
+    "I AC2": "ac_current_phase_2",
+    "I AC3": "ac_current_phase_3",
+    "F AC": "ac_frequency",
+    "F AC1": "ac_frequency_phase_1",
+    "F AC2": "ac_frequency_phase_2",
+    "F AC3": "ac_frequency_phase_3",
+    "P AC": "ac_power",
+    "P AC1": "ac_power_phase_1",
+    "P AC2": "ac_power_phase_2",
+    "P AC3": "ac_power_phase_3"
+}
+
+# Multipliers of the unit prefixes used by the inverter
+UNIT_PREFIXES = {"": 1.0, "m": 1e-3, "k": 1e3, "M": 1e6}
+BASE_UNITS = ("W", "V", "A", "Hz", "Wh")
+_BASE_UNIT_CODES = {unit: code for code, unit in enumerate(BASE_UNITS)}
+# Prefixed unit -> (multiplier, base unit)
+_UNIT_SCALES = {
+    prefix + unit: (factor, unit)
+    for prefix, factor in UNIT_PREFIXES.items()
+    for unit in BASE_UNITS
+}
+
+
+class Reading(NamedTuple):
+    """A measured value in SI base units (W, V, A, Hz, Wh)."""
+    value: float
+    unit: str
+
+
+def as_reading(value) -> Optional[Reading]:
+    """Get a Reading from a Reading or a string like "1.5kW", None if invalid."""
+    if isinstance(value, Reading):
+        return value
+    if isinstance(value, str):
+        value_match = _MEASUREMENT_RE.search(value.strip())
+        if value_match:
+            return to_base_unit(float(value_match.group(1)), value_match.group(3))
+    return None
+
+
+class YieldSeries(NamedTuple):
+    """Per-interval yields of a chart: hours of a day, days of a month, etc.
+
+    `unit` is None if the chart does not state it. The chart script format
+    (`labels`, `data` and `unit` arrays) is inferred from the web UI and
+    has not been verified against a real device.
+    """
+    labels: List[str]
+    values: List[Optional[float]]
+    unit: Optional[str]
+
+    def values_wh(self) -> List[Optional[float]]:
+        """The values converted to Wh.
+
+        Raises ValueError if the unit is unknown rather than guessing it.
+        """
+        scale = _UNIT_SCALES.get(self.unit)
+        if scale is None or scale[1] != "Wh":
+            raise ValueError(f"Unknown unit of the yield series: {self.unit!r}")
+        return [None if value is None else value * scale[0] for value in self.values]
+
+
+def _split_js_array(body: str) -> List[str]:
+    """Split the body of a flat JS array literal into unquoted items."""
+    if not body.strip():
+        return []
+    return [item.strip() for item in body.split(",")]
+
+
+def to_base_unit(value: float, unit: str) -> Reading:
+    """Convert a value with a prefixed unit (e.g. kW) to its base unit."""
+    factor, base_unit = _UNIT_SCALES.get(unit, (1.0, unit))
+    return Reading(value * factor, base_unit)
+
+
+# Both system info fields are found in a single scan of the payload
+_SYSTEM_INFO_RE = re.compile(
+    r"<td>Name</td><td>(?P<model_name>.*?)</td>"
+    # Nominal power with various unit formats (e.g., W, kW)
+    r"|<td>Nominal Power</td><td>(?P<nominal_power>[\d.]+\s?[kM]?W)</td>"
+)
+_MEASUREMENT_ROW_RE = re.compile(r"<tr><td>([^<]*)</td><td align='right'>([^<]*)</td><td>([^<]*)</td></tr>")
+# Chart series embedded in the yield scripts, as `data = [...]` or `data: [...]`
+_SERIES_DATA_RE = re.compile(r"\bdata\s*[:=]\s*\[([^\[\]]*)\]")
+_SERIES_LABELS_RE = re.compile(r"\blabels\s*[:=]\s*\[([^\[\]]*)\]")
+_SERIES_UNIT_RE = re.compile(r"\bunit\s*[:=]\s*[\"']([kM]?Wh)[\"']")
+
+# value is number or float, rest is unit
+_MEASUREMENT_RE = re.compile(r"^(\d+(\.\d+)?)\s*([a-zA-Z]+)$")
+_NUMBER_CHARS = "0123456789." + string.whitespace
+_YIELD_RE = re.compile(r"document\.getElementById\(\"labelValueId\"\)\.innerHTML\s*=\s*\"[^\"]*?(\d+(\.\d+)?[kM]?Wh)")
 
 
 class SolarFrontierWebInfoParser:
@@ -10,69 +114,79 @@ class SolarFrontierWebInfoParser:
     def parse_system_info(html_content: str) -> dict:
         """Parse the system information from the inverter's output."""
         info = {}
-
-        # Extract model name
-        model_match = re.search(r"<td>Name</td><td>(.*?)</td>", html_content)
-        if model_match:
-            info["model_name"] = model_match.group(1)
-
-        # Extract nominal power with various unit formats (e.g., W, kW)
-        power_match = re.search(r"<td>Nominal Power</td><td>([\d.]+\s?[kM]?W)</td>", html_content)
-        if power_match:
-            info["nominal_power"] = power_match.group(1)
-
+        for match in _SYSTEM_INFO_RE.finditer(html_content):
+            key = match.lastgroup
+            if key not in info:
+                info[key] = match.group(key)
+                if len(info) == 2:
+                    break
         return info
 
     @staticmethod
-    def parse_measurements(html_content: str) -> dict:
-        """Parse the measurements from the inverter's output."""
-        name_mapping = {
-            "P DC": "dc_power",
-            "U DC": "dc_voltage",
-            "I DC": "dc_current",
-            "U AC1": "ac_voltage_phase_1",
-            "U AC2": "ac_voltage_phase_2",
-            "U AC3": "ac_voltage_phase_3",
-            "I AC1": "ac_current_phase_1",
-            "I AC2": "ac_current_phase_2",
-            "I AC3": "ac_current_phase_3",
-            "F AC": "ac_frequency",
-            "F AC1": "ac_frequency_phase_1",
-            "F AC2": "ac_frequency_phase_2",
-            "F AC3": "ac_frequency_phase_3",
-            "P AC": "ac_power",
-            "P AC1": "ac_power_phase_1",
-            "P AC2": "ac_power_phase_2",
-            "P AC3": "ac_power_phase_3"
-        }
+    def parse_measurements(html_content: str, typed: bool = False) -> dict:
+        """Parse the measurements from the inverter's output.
+
+        Values are strings like "230.0V", or `Reading` records in base units
+        if `typed` is set. Unparsable values are None.
+        """
         units_data = {}
-        table_rows = re.findall(r"<tr><td>(.*?)</td><td align='right'>(.*?)</td><td>(.*?)</td></tr>", html_content)
-        for name, value, unit in table_rows:
-            key = name_mapping.get(name.strip(), name.strip().replace(" ", "_").lower())
+        names = MEASUREMENT_NAMES
+        for name, value, unit in _MEASUREMENT_ROW_RE.findall(html_content):
+            name = name.strip()
+            key = names.get(name)
+            if key is None:
+                key = name.replace(" ", "_").lower()
             try:
-                numeric_value = float(value.strip())
+                numeric_value = float(value)
             except ValueError:
-                numeric_value = None
-            units_data[key] = f"{numeric_value}{unit.strip()}" if numeric_value is not None else None
+                units_data[key] = None
+                continue
+            unit = unit.strip()
+            if typed:
+                factor, base_unit = _UNIT_SCALES.get(unit, (1.0, unit))
+                units_data[key] = Reading(numeric_value * factor, base_unit)
+            else:
+                units_data[key] = f"{numeric_value}{unit}"
 
         return units_data
 
     @staticmethod
     def parse_yield(html_content: str) -> str or None:
         """Parse the day yield from the inverter's output."""
-        yield_match = re.search(r"document\.getElementById\(\"labelValueId\"\)\.innerHTML\s*=\s*\"[^\"]*?(\d+(\.\d+)?[kM]?Wh)", html_content)
+        yield_match = _YIELD_RE.search(html_content)
         if yield_match:
             return yield_match.group(1)
         return None
 
+    @staticmethod
+    def parse_yield_series(html_content: str) -> Optional[YieldSeries]:
+        """Parse the chart data series from a yield chart script."""
+        data_match = _SERIES_DATA_RE.search(html_content)
+        if not data_match:
+            return None
+        values = []
+        for item in _split_js_array(data_match.group(1)):
+            try:
+                values.append(float(item.strip("\"'")))
+            except ValueError:
+                values.append(None)
+
+        labels_match = _SERIES_LABELS_RE.search(html_content)
+        if labels_match:
+            labels = [item.strip("\"'") for item in _split_js_array(labels_match.group(1))]
+        else:
+            labels = [str(index) for index in range(len(values))]
+
+        unit_match = _SERIES_UNIT_RE.search(html_content)
+        return YieldSeries(labels, values, unit_match.group(1) if unit_match else None)
+
 
 class UnitConverter:
     """Convert measurement units like kW, MWh to base units."""
 
     def parse_measurement(self, measurement) -> Tuple[int, str]:
         """Parse the measurement into value and unit."""
-        # value is number or float, rest is unbit
-        value_match = re.search(r"^(\d+(\.\d+)?)\s*([a-zA-Z]+)$", measurement.strip())
+        value_match = _MEASUREMENT_RE.search(measurement.strip())
         if value_match:
             value = float(value_match.group(1))
             unit = value_match.group(3)
@@ -88,3 +202,43 @@ class UnitConverter:
         """Get the unit of the measurement."""
         _, unit = self.parse_measurement(measurement.strip())
         return unit
+
+    def parse_many(self, measurements):
+        """Parse many measurements at once into NumPy arrays.
+
+        Returns the values converted to base units and the units as int8
+        codes indexing `BASE_UNITS`. Values with an unknown unit are kept
+        as is with code -1, unparsable entries are NaN with code -1. The
+        distinct strings are split and checked with NumPy string operations
+        instead of the regex; only the table of known units is looped over.
+        Requires numpy.
+        """
+        try:
+            import numpy as np
+        except ImportError as err:
+            raise ImportError("parse_many requires numpy: pip install python-solarfrontier[numpy]") from err
+
+        strings = np.asarray(measurements, dtype=str)
+        if strings.size == 0:
+            return np.empty(strings.shape), np.empty(strings.shape, dtype=np.int8)
+        unique, inverse = np.unique(strings, return_inverse=True)
+        unique = np.char.strip(unique)
+        # Same format as _MEASUREMENT_RE: digits, optional decimals, ASCII unit
+        numbers = np.char.rstrip(np.char.rstrip(unique, string.ascii_letters))
+        units = np.char.lstrip(unique, _NUMBER_CHARS)
+        valid = (
+            np.char.isdecimal(np.char.replace(numbers, ".", "", 1))
+            & ~np.char.startswith(numbers, ".")
+            & ~np.char.endswith(numbers, ".")
+            & (np.char.str_len(units) > 0)
+            & (np.char.str_len(np.char.strip(units, string.ascii_letters)) == 0)
+        )
+        values = np.full(len(unique), np.nan)
+        values[valid] = numbers[valid].astype(float)
+        codes = np.full(len(unique), -1, dtype=np.int8)
+        for unit, (factor, base_unit) in _UNIT_SCALES.items():
+            known = valid & (units == unit)
+            values[known] *= factor
+            codes[known] = _BASE_UNIT_CODES[base_unit]
+        inverse = inverse.reshape(strings.shape)
+        return values[inverse], codes[inverse]
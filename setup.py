@@ -18,4 +18,18 @@ setuptools.setup(
         "Operating System :: OS Independent",
     ],
     python_requires='>=3.8',
+    entry_points={
+        "console_scripts": [
+            "solarfrontier-collect=python_solarfrontier.collector:main",
+            "solarfrontier-discover=python_solarfrontier.discovery:main",
+        ],
+    },
+    # The parsers need no dependencies, the HTTP client needs aiohttp
+    install_requires=[],
+    extras_require={
+        "client": ["aiohttp>=3.7.4"],
+        "numpy": ["numpy"],
+        "parquet": ["pyarrow"],
+        "all": ["aiohttp>=3.7.4", "numpy", "pyarrow"],
+    },
 )
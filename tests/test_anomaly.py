@@ -0,0 +1,75 @@
+from python_solarfrontier.anomaly import FROZEN, LOW_OUTPUT, MISSING, YIELD_JUMP, AnomalyDetector, _resolution
+from python_solarfrontier.api import SolarFrontierSnapshot
+from python_solarfrontier.utils import Reading
+import unittest
+
+
+def _always(timestamp):
+    return True
+
+
+class TestAnomalyDetector(unittest.TestCase):
+
+    def setUp(self):
+        self.detector = AnomalyDetector(history=3, daylight=_always)
+        self.detector.set_system_info('a', {'model_name': 'SF-WR-5503x', 'nominal_power': '5.5 kW'})
+
+    def kinds(self, anomalies):
+        return [(anomaly.metric, anomaly.kind) for anomaly in anomalies]
+
+    def test_frozen(self):
+        measurements = {'dc_power': '4012.5W', 'ac_frequency': '50.0Hz', 'ac_power': '3800.0W'}
+        results = [self.detector.check_measurements('a', measurements, timestamp) for timestamp in range(5)]
+        self.assertEqual(results[:2], [[], []])
+        self.assertEqual(self.kinds(results[2]), [('dc_power', FROZEN), ('ac_power', FROZEN)])
+        # Reported once per run
+        self.assertEqual(results[3:], [[], []])
+        self.assertEqual(self.detector.recent('a', 'dc_power'), [4012.5] * 3)
+
+    def test_zero_is_not_frozen(self):
+        for timestamp in range(5):
+            self.assertEqual(self.detector.check_measurements('b', {'dc_power': '0.0W'}, timestamp), [])
+
+    def test_missing(self):
+        self.assertEqual(self.kinds(self.detector.check_measurements('a', {}, 0)), [('measurements', MISSING)])
+        self.assertEqual(self.kinds(self.detector.check_yield_total('a', 0.0, 0)), [('yield_total', MISSING)])
+
+    def test_low_output(self):
+        results = [
+            self.detector.check_measurements('a', {'ac_power': f'{100 + timestamp}W'}, timestamp)
+            for timestamp in range(4)
+        ]
+        self.assertEqual([self.kinds(result) for result in results], [[], [], [('ac_power', LOW_OUTPUT)], []])
+        # Unknown nominal power or night
+        night = AnomalyDetector(history=1, frozen_metrics=(), daylight=lambda timestamp: False)
+        night.set_system_info('a', {'nominal_power': '5.5 kW'})
+        self.assertEqual(night.check_measurements('a', {'ac_power': '1W'}, 0), [])
+        self.assertEqual(AnomalyDetector(history=1, frozen_metrics=(), daylight=_always).check_measurements('a', {'ac_power': '1W'}, 0), [])
+
+    def test_yield_total(self):
+        self.assertEqual(self.detector.check_yield_total('a', '48.93MWh', 0), [])
+        # One display step is always possible
+        self.assertEqual(self.detector.check_yield_total('a', '48.94MWh', 60), [])
+        self.assertEqual(self.kinds(self.detector.check_yield_total('a', '48.96MWh', 120)), [('yield_total', YIELD_JUMP)])
+        self.assertEqual(self.kinds(self.detector.check_yield_total('a', '48.95MWh', 7200)), [('yield_total', YIELD_JUMP)])
+        # Within 1.5 x 5.5 kW over an hour
+        self.assertEqual(self.detector.check_yield_total('a', Reading(48958000.0, 'Wh'), 10800), [])
+
+    def test_resolution(self):
+        self.assertAlmostEqual(_resolution('48.93MWh'), 10000.0)
+        self.assertAlmostEqual(_resolution('18kWh'), 1000.0)
+        self.assertEqual(_resolution(Reading(1.0, 'Wh')), 0.0)
+
+    def test_snapshot_and_forget(self):
+        snapshot = SolarFrontierSnapshot(
+            system_info={'nominal_power': '1 kW'}, measurements=None, yield_total='1.0MWh',
+            errors={'measurements': TimeoutError()})
+        detector = AnomalyDetector(history=3)
+        self.assertEqual(self.kinds(detector.check_snapshot('c', snapshot, 0)), [('measurements', MISSING)])
+        self.assertEqual(detector.recent('c', 'yield_total'), [1000000.0])
+        detector.forget('c')
+        self.assertEqual(detector.recent('c', 'yield_total'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,5 @@
-from python_solarfrontier.api import SolarFrontierAPI
+from python_solarfrontier.api import SolarFrontierAPI, SolarFrontierResponseError
+from python_solarfrontier.utils import Reading
 import unittest
 from unittest.mock import patch, AsyncMock
 import asyncio
@@ -246,6 +247,189 @@ class TestSolarFrontierAPI(unittest.TestCase):
         result = asyncio.run(self.api.get_yield_total())
         self.assertEqual(result, None)
 
+    # Tests for get_snapshot()
+
+    @patch('aiohttp.ClientSession.get')
+    def test_get_snapshot_success(self, mock_get):
+        # Mock a payload every parser understands
+        mock_response_text = (
+            '<td>Name</td><td>test_model</td>'
+            "<tr><td>P DC</td><td align='right'>5.0</td><td>W</td></tr>"
+            'document.getElementById("labelValueId").innerHTML = "10.0kWh"'
+        )
+        mock_get.return_value.__aenter__.return_value.status = 200
+        mock_get.return_value.__aenter__.return_value.text = AsyncMock(return_value=mock_response_text)
+
+        result = asyncio.run(self.api.get_snapshot())
+        self.assertTrue(result.ok)
+        self.assertEqual(mock_get.call_count, 6)
+        self.assertEqual(result.system_info, {'model_name': 'test_model'})
+        self.assertEqual(result.measurements, {'dc_power': '5.0W'})
+        self.assertEqual(result.yield_day, '10.0kWh')
+        self.assertEqual(result.yield_total, '10.0kWh')
+
+    @patch('aiohttp.ClientSession.get')
+    def test_get_snapshot_partial_failure(self, mock_get):
+        # Only the measurements endpoint fails
+        def get(url, **kwargs):
+            if url.endswith('/gen.measurements.table.js'):
+                raise aiohttp.ClientError
+            return mock_get.return_value
+        mock_get.side_effect = get
+        mock_get.return_value.__aenter__.return_value.status = 200
+        mock_get.return_value.__aenter__.return_value.text = AsyncMock(
+            return_value='document.getElementById("labelValueId").innerHTML = "1.0Wh"')
+
+        result = asyncio.run(self.api.get_snapshot())
+        self.assertFalse(result.ok)
+        self.assertIsNone(result.measurements)
+        self.assertIsInstance(result.errors['measurements'], aiohttp.ClientError)
+        self.assertEqual(result.yield_month, '1.0Wh')
+
+    @patch('aiohttp.ClientSession.get')
+    def test_get_snapshot_bad_status(self, mock_get):
+        mock_get.return_value.__aenter__.return_value.status = 503
+
+        result = asyncio.run(self.api.get_snapshot())
+        self.assertEqual(len(result.errors), 6)
+        self.assertIsInstance(result.errors['yield_day'], SolarFrontierResponseError)
+        self.assertEqual(result.errors['yield_day'].status, 503)
+
+    @patch('aiohttp.ClientSession.get')
+    def test_get_snapshot_concurrency_limit(self, mock_get):
+        in_flight = 0
+        peak = 0
+
+        async def text():
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return ''
+        mock_get.return_value.__aenter__.return_value.status = 200
+        mock_get.return_value.__aenter__.return_value.text = text
+
+        asyncio.run(self.api.get_snapshot(max_concurrency=2))
+        self.assertEqual(peak, 2)
+
+    # Tests for change detection
+
+    @patch('aiohttp.ClientSession.get')
+    def test_unchanged_payload_is_not_parsed_again(self, mock_get):
+        mock_response_text = 'document.getElementById("labelValueId").innerHTML = "5.0Wh"'
+        mock_get.return_value.__aenter__.return_value.status = 200
+        mock_get.return_value.__aenter__.return_value.headers = {}
+        mock_get.return_value.__aenter__.return_value.text = AsyncMock(return_value=mock_response_text)
+
+        with patch('python_solarfrontier.utils.SolarFrontierWebInfoParser.parse_yield',
+                   return_value='5.0Wh') as mock_parse:
+            self.assertEqual(asyncio.run(self.api.get_yield_day()), '5.0Wh')
+            self.assertTrue(self.api.last_changed['/gen.yield.day.chart.js'])
+            self.assertEqual(asyncio.run(self.api.get_yield_day()), '5.0Wh')
+            self.assertFalse(self.api.last_changed['/gen.yield.day.chart.js'])
+        self.assertEqual(mock_parse.call_count, 1)
+
+    @patch('aiohttp.ClientSession.get')
+    def test_change_flag_is_shared_across_parsers(self, mock_get):
+        response = mock_get.return_value.__aenter__.return_value
+        response.status = 200
+        response.headers = {}
+        response.text = AsyncMock(return_value=(
+            "<tr><td>P DC</td><td align='right'>5.0</td><td>W</td></tr>"
+            'chart.data = [1.0, 2.0]; chart.unit = "kWh";'
+            'document.getElementById("labelValueId").innerHTML = "3.0kWh"'
+        ))
+        asyncio.run(self.api.get_snapshot())
+        with patch('python_solarfrontier.utils.SolarFrontierWebInfoParser.parse_measurements') as mock_parse:
+            self.assertEqual(asyncio.run(self.api.get_measurements()), {'dc_power': '5.0W'})
+        mock_parse.assert_not_called()
+        self.assertFalse(self.api.last_changed['/gen.measurements.table.js'])
+
+        self.assertEqual(asyncio.run(self.api.get_yield_day_series()).values, [1.0, 2.0])
+        self.assertFalse(self.api.last_changed['/gen.yield.day.chart.js'])
+        self.assertEqual(asyncio.run(self.api.get_yield_day()), '3.0kWh')
+        self.assertFalse(self.api.last_changed['/gen.yield.day.chart.js'])
+
+    @patch('aiohttp.ClientSession.get')
+    def test_conditional_request(self, mock_get):
+        response = mock_get.return_value.__aenter__.return_value
+        response.status = 200
+        response.headers = {'ETag': '"v1"', 'Last-Modified': 'Sat, 17 Oct 2026 10:00:00 GMT'}
+        response.text = AsyncMock(return_value="<tr><td>P DC</td><td align='right'>5.0</td><td>W</td></tr>")
+        self.assertEqual(asyncio.run(self.api.get_measurements()), {'dc_power': '5.0W'})
+        self.assertEqual(mock_get.call_args.kwargs['headers'], {})
+
+        response.status = 304
+        self.assertEqual(asyncio.run(self.api.get_measurements()), {'dc_power': '5.0W'})
+        self.assertEqual(mock_get.call_args.kwargs['headers'], {
+            'If-None-Match': '"v1"',
+            'If-Modified-Since': 'Sat, 17 Oct 2026 10:00:00 GMT',
+        })
+        self.assertFalse(self.api.last_changed['/gen.measurements.table.js'])
+
+    @patch('aiohttp.ClientSession.get')
+    def test_get_snapshot_changed(self, mock_get):
+        response = mock_get.return_value.__aenter__.return_value
+        response.status = 200
+        response.headers = {}
+        response.text = AsyncMock(return_value='<td>Name</td><td>test_model</td>')
+        self.assertEqual(len(asyncio.run(self.api.get_snapshot()).changed), 6)
+        self.assertEqual(asyncio.run(self.api.get_snapshot()).changed, set())
+
+    # Tests for subscribe_measurements()
+
+    def _subscribe(self, measurements, count, **kwargs):
+        async def run():
+            deltas = []
+            subscription = self.api.subscribe_measurements(min_interval=1, max_interval=8, idle_interval=100, **kwargs)
+            async for delta in subscription:
+                deltas.append(delta)
+                if len(deltas) == count:
+                    break
+            await subscription.aclose()
+            return deltas
+
+        with patch.object(self.api, 'get_measurements', AsyncMock(side_effect=measurements)), \
+                patch('asyncio.sleep', AsyncMock()) as mock_sleep:
+            deltas = asyncio.run(run())
+        return deltas, [call.args[0] for call in mock_sleep.call_args_list]
+
+    def test_subscribe_yields_changes_only(self):
+        deltas, _ = self._subscribe([
+            {'dc_power': '100.0W', 'dc_voltage': '300.0V'},
+            {'dc_power': '100.0W', 'dc_voltage': '300.0V'},
+            {'dc_power': '100.0W', 'dc_voltage': '301.0V'},
+            {'dc_power': '100.0W'},
+        ], 3)
+        self.assertEqual([delta.changes for delta in deltas], [
+            {'dc_power': '100.0W', 'dc_voltage': '300.0V'},
+            {'dc_voltage': '301.0V'},
+            {'dc_voltage': None},
+        ])
+
+    def test_subscribe_adapts_interval(self):
+        _, sleeps = self._subscribe([
+            {'dc_power': '1.0kW'},
+            {'dc_power': '1.0kW', 'x': '1.0V'},
+            {'dc_power': '1.0kW', 'x': '2.0V'},
+            {'dc_power': '2.0kW'},
+            {'dc_power': '0.0W'},
+            {'dc_power': '5.0W'},
+        ], 6)
+        # Ramp, steady (backing off), ramp, night; the last poll was not slept after
+        self.assertEqual(len(sleeps), 5)
+        for slept, expected in zip(sleeps, [1, 2, 4, 1, 100]):
+            self.assertAlmostEqual(slept, expected, places=1)
+
+    def test_subscribe_typed(self):
+        deltas, sleeps = self._subscribe([
+            {'dc_power': Reading(0.0, 'W')},
+            {'dc_power': Reading(10.0, 'W')},
+        ], 2, typed=True)
+        self.assertEqual(deltas[1].changes, {'dc_power': Reading(10.0, 'W')})
+        self.assertAlmostEqual(sleeps[0], 100, places=1)
+
     # Tests for close()
 
     @patch('aiohttp.ClientSession.close', new_callable=AsyncMock)
@@ -0,0 +1,101 @@
+from python_solarfrontier.api import SolarFrontierAPI
+from python_solarfrontier.archive import PayloadRecorder, PayloadReplay, read_archive
+from python_solarfrontier.const import PATH_MEASUREMENTS, PATH_YIELD_TOTAL
+from python_solarfrontier.fake_inverter import FakeInverter, measurements_payload, yield_payload
+import asyncio
+import gzip
+import os
+import tempfile
+import unittest
+
+
+class TestArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'capture.sfa')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_record_and_read(self):
+        with PayloadRecorder(self.path) as recorder:
+            recorder.record('http://a', '/x.js', 'first', timestamp=1.0)
+        # A second run appends another gzip member
+        with PayloadRecorder(self.path) as recorder:
+            recorder.record('http://b', '/y.js', 'zweite ä', timestamp=2.0)
+        records = list(read_archive(self.path))
+        self.assertEqual([tuple(record) for record in records], [
+            (1.0, 'http://a', '/x.js', 'first'),
+            (2.0, 'http://b', '/y.js', 'zweite ä'),
+        ])
+
+    def test_read_archive_of_crashed_recorder(self):
+        with PayloadRecorder(self.path) as recorder:
+            recorder.record('http://a', '/x.js', 'first', timestamp=1.0)
+        recorder = PayloadRecorder(self.path)
+        recorder.record('http://a', '/x.js', 'second', timestamp=2.0)
+        # Copy the file as a process dying now would leave it
+        crashed = os.path.join(self.directory.name, 'crashed.sfa')
+        with open(self.path, 'rb') as source, open(crashed, 'wb') as target:
+            target.write(source.read())
+        recorder.close()
+        records = list(read_archive(crashed))
+        self.assertEqual([record.payload for record in records], ['first', 'second'])
+
+    def test_invalid_archive(self):
+        with gzip.open(self.path, 'wb') as handle:
+            handle.write(b'something else')
+        with self.assertRaises(ValueError):
+            list(read_archive(self.path))
+
+    def test_capture_and_replay(self):
+        async def capture():
+            recorder = PayloadRecorder(self.path)
+            async with FakeInverter() as inverter:
+                api = SolarFrontierAPI(inverter.url, recorder=recorder)
+                live = [await api.get_snapshot()]
+                inverter.payloads[PATH_MEASUREMENTS] = measurements_payload({'P DC': ('0', 'W')})
+                live.append(await api.get_snapshot())
+                await api.close()
+            recorder.close()
+            return live, recorder.records
+
+        async def replay():
+            replay = PayloadReplay(self.path)
+            measurements = []
+            async for record in replay:
+                if record.path == PATH_MEASUREMENTS:
+                    measurements.append(await replay.api(record.host).get_measurements())
+            total = await replay.api(record.host).get_yield_total()
+            return measurements, total
+
+        live, records = asyncio.run(capture())
+        self.assertEqual(records, 12)
+        measurements, total = asyncio.run(replay())
+        self.assertEqual(measurements, [snapshot.measurements for snapshot in live])
+        self.assertEqual(total, '48.93MWh')
+
+    def test_replay_speed(self):
+        with PayloadRecorder(self.path) as recorder:
+            for index in range(3):
+                recorder.record('host', PATH_YIELD_TOTAL, yield_payload(f'{index}kWh'), 100.0 + index)
+
+        async def replay(speed):
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            replay = PayloadReplay(self.path, speed=speed)
+            self.assertIsNone(await replay.api('host').get_yield_total())
+            async for _ in replay:
+                pass
+            self.assertEqual(await replay.api('host').get_yield_total(), '2kWh')
+            return loop.time() - started
+
+        self.assertLess(asyncio.run(replay(None)), 0.05)
+        elapsed = asyncio.run(replay(20))
+        self.assertGreaterEqual(elapsed, 0.09)
+        self.assertLess(elapsed, 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+from python_solarfrontier.api import SolarFrontierAPI
+from python_solarfrontier.cache import ResponseCache
+from python_solarfrontier.const import PATH_MEASUREMENTS, PATH_SYSTEM_INFO
+import unittest
+from unittest.mock import patch, AsyncMock
+import asyncio
+import aiohttp
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def test_put_and_get(self):
+        cache = ResponseCache()
+        cache.put('http://a/info', PATH_SYSTEM_INFO, 'payload')
+        self.assertEqual(cache.get('http://a/info'), 'payload')
+        self.assertIsNone(cache.get('http://b/info'))
+
+    def test_expired_entry(self):
+        cache = ResponseCache(ttls={PATH_MEASUREMENTS: 0.01})
+        cache.put('http://a/m', PATH_MEASUREMENTS, 'payload')
+        asyncio.run(asyncio.sleep(0.02))
+        self.assertIsNone(cache.get('http://a/m'))
+        self.assertEqual(len(cache), 0)
+
+    def test_zero_ttl_is_not_stored(self):
+        cache = ResponseCache()
+        cache.put('http://a/other', '/other.js', 'payload')
+        self.assertEqual(len(cache), 0)
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(max_entries=2)
+        cache.put('http://a', PATH_SYSTEM_INFO, 'a')
+        cache.put('http://b', PATH_SYSTEM_INFO, 'b')
+        cache.get('http://a')
+        cache.put('http://c', PATH_SYSTEM_INFO, 'c')
+        self.assertEqual(cache.get('http://a'), 'a')
+        self.assertIsNone(cache.get('http://b'))
+        self.assertEqual(cache.get('http://c'), 'c')
+
+    def test_concurrent_fetches_are_coalesced(self):
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return 'payload'
+
+        async def run():
+            cache = ResponseCache(ttls={PATH_MEASUREMENTS: 0})
+            return await asyncio.gather(*(
+                cache.fetch('http://a/m', PATH_MEASUREMENTS, fetch) for _ in range(5)))
+
+        self.assertEqual(asyncio.run(run()), ['payload'] * 5)
+        self.assertEqual(calls, 1)
+
+    def test_errors_are_not_cached(self):
+        async def fail():
+            raise aiohttp.ClientError
+
+        async def run():
+            cache = ResponseCache()
+            with self.assertRaises(aiohttp.ClientError):
+                await cache.fetch('http://a/info', PATH_SYSTEM_INFO, fail)
+            return len(cache)
+
+        self.assertEqual(asyncio.run(run()), 0)
+
+    @patch('aiohttp.ClientSession.get')
+    def test_api_uses_cache(self, mock_get):
+        mock_get.return_value.__aenter__.return_value.status = 200
+        mock_get.return_value.__aenter__.return_value.text = AsyncMock(
+            return_value='<td>Name</td><td>test_model</td>')
+
+        async def run():
+            cache = ResponseCache()
+            first = SolarFrontierAPI('localhost', cache=cache)
+            second = SolarFrontierAPI('localhost', cache=cache)
+            results = [await first.get_system_info(), await second.get_system_info()]
+            await first.close()
+            await second.close()
+            return results
+
+        results = asyncio.run(run())
+        self.assertEqual(results, [{'model_name': 'test_model'}] * 2)
+        self.assertEqual(mock_get.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
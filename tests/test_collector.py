@@ -0,0 +1,194 @@
+from python_solarfrontier.collector import (
+    Collector,
+    CsvSink,
+    LineProtocolSink,
+    Sample,
+    Sink,
+    SqliteSink,
+    create_sink,
+    run_until_stopped
+)
+from python_solarfrontier.fake_inverter import FakeInverter
+from python_solarfrontier.fleet import SolarFrontierFleet
+import unittest
+import asyncio
+import csv
+import os
+import signal
+import socket
+import sqlite3
+import tempfile
+import threading
+
+SAMPLES = [
+    Sample(1700000000.0, '10.0.0.1', 'dc_power', 1500.0),
+    Sample(1700000000.0, '10.0.0.1', 'yield_total', 2.5e6),
+]
+
+
+class MemorySink(Sink):
+
+    def __init__(self):
+        self.batches = []
+        self.closed = False
+
+    def write(self, samples):
+        self.batches.append(list(samples))
+
+    def close(self):
+        self.closed = True
+
+
+class TestSinks(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_csv_sink(self):
+        path = os.path.join(self.directory.name, 'samples.csv')
+        sink = CsvSink(path)
+        sink.write(SAMPLES)
+        sink.write(SAMPLES[:1])
+        with open(path) as handle:
+            rows = list(csv.reader(handle))
+        self.assertEqual(rows[0], ['time', 'host', 'metric', 'value'])
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[1], ['1700000000.0', '10.0.0.1', 'dc_power', '1500.0'])
+
+    def test_sqlite_sink(self):
+        path = os.path.join(self.directory.name, 'samples.db')
+        sink = SqliteSink(path)
+        sink.write(SAMPLES)
+        sink.close()
+        with sqlite3.connect(path) as connection:
+            rows = connection.execute('SELECT metric, value FROM samples ORDER BY metric').fetchall()
+        self.assertEqual(rows, [('dc_power', 1500.0), ('yield_total', 2.5e6)])
+
+    def test_line_protocol_sink(self):
+        server = socket.create_server(('127.0.0.1', 0))
+        received = []
+
+        def accept():
+            connection, _ = server.accept()
+            with connection:
+                while True:
+                    data = connection.recv(65536)
+                    if not data:
+                        break
+                    received.append(data)
+
+        thread = threading.Thread(target=accept)
+        thread.start()
+        sink = LineProtocolSink('127.0.0.1', server.getsockname()[1], measurement='pv plant')
+        sink.write([Sample(1.5, 'http://10.0.0.1', 'dc_power', 1500.0)])
+        sink.close()
+        thread.join(5)
+        server.close()
+        self.assertEqual(b''.join(received), b'pv\\ plant,host=http://10.0.0.1 dc_power=1500.0 1500000000\n')
+
+    def test_create_sink(self):
+        sink = create_sink({'type': 'csv', 'path': 'x.csv'})
+        self.assertIsInstance(sink, CsvSink)
+        self.assertEqual(sink.path, 'x.csv')
+        with self.assertRaises(ValueError):
+            create_sink({'type': 'unknown'})
+
+
+class TestCollector(unittest.TestCase):
+
+    def test_from_config(self):
+        collector = Collector.from_config({
+            'inverters': ['10.0.0.1'],
+            'sinks': [{'type': 'sqlite', 'path': ':memory:'}],
+            'batch_size': 10,
+        })
+        self.assertEqual(collector.batch_size, 10)
+        self.assertEqual(collector.fleet.hosts, ['10.0.0.1'])
+        self.assertIsInstance(collector.sinks[0], SqliteSink)
+
+    def test_run_batches_samples(self):
+        sink = MemorySink()
+
+        async def run():
+            async with FakeInverter() as first, FakeInverter() as second:
+                fleet = SolarFrontierFleet([first.url, second.url], interval=0)
+                collector = Collector([], [sink], batch_size=30, fleet=fleet)
+                await collector.run(rounds=2)
+
+        asyncio.run(run())
+        samples = [sample for batch in sink.batches for sample in batch]
+        # 17 measurements and 4 yields per inverter and round
+        self.assertEqual(len(samples), 2 * 2 * 21)
+        self.assertTrue(all(len(batch) <= 30 for batch in sink.batches))
+        self.assertIn(('dc_power', 4012.5), {(s.metric, s.value) for s in samples})
+        self.assertIn(('yield_total', 48930000.0), {(s.metric, s.value) for s in samples})
+        self.assertTrue(sink.closed)
+
+    def test_failed_hosts_are_skipped(self):
+        sink = MemorySink()
+
+        async def run():
+            async with FakeInverter(error_rate=1.0) as inverter:
+                fleet = SolarFrontierFleet([inverter.url])
+                await Collector([], [sink], fleet=fleet).run(rounds=1)
+
+        asyncio.run(run())
+        self.assertEqual(sink.batches, [])
+
+    def test_cancel_waits_for_running_write(self):
+        events = []
+        writing = threading.Event()
+
+        class SlowSink(MemorySink):
+
+            def write(self, samples):
+                events.append('write started')
+                writing.set()
+                threading.Event().wait(0.2)
+                super().write(samples)
+                events.append('write finished')
+
+            def close(self):
+                events.append('close')
+                super().close()
+
+        sink = SlowSink()
+
+        async def run():
+            async with FakeInverter() as inverter:
+                fleet = SolarFrontierFleet([inverter.url], interval=0)
+                collector = Collector([], [sink], batch_size=5, queue_size=1000, fleet=fleet)
+                task = asyncio.ensure_future(collector.run())
+                await asyncio.get_running_loop().run_in_executor(None, writing.wait)
+                task.cancel()
+                with self.assertRaises(asyncio.CancelledError):
+                    await task
+
+        asyncio.run(run())
+        # The pending samples are written only after the running batch, then the sink closes
+        self.assertEqual(events[:2], ['write started', 'write finished'])
+        self.assertEqual(events[-1], 'close')
+        self.assertEqual(events.count('write started'), events.count('write finished'))
+
+    @unittest.skipUnless(hasattr(signal, 'SIGTERM') and os.name == 'posix', "needs POSIX signals")
+    def test_sigterm_flushes_and_closes(self):
+        sink = MemorySink()
+
+        async def run():
+            async with FakeInverter() as inverter:
+                fleet = SolarFrontierFleet([inverter.url], interval=0.05)
+                collector = Collector([], [sink], flush_interval=60, fleet=fleet)
+                asyncio.get_running_loop().call_later(0.3, os.kill, os.getpid(), signal.SIGTERM)
+                await run_until_stopped(collector)
+
+        asyncio.run(run())
+        # The batch still being collected was written on shutdown
+        self.assertGreater(len(sink.batches), 0)
+        self.assertTrue(sink.closed)
+
+
+if __name__ == '__main__':
+    unittest.main()
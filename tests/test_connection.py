@@ -0,0 +1,55 @@
+from python_solarfrontier.api import SolarFrontierAPI
+from python_solarfrontier.connection import ConnectionOptions
+import unittest
+import asyncio
+import socket
+
+
+class TestConnectionOptions(unittest.TestCase):
+
+    def test_connector_settings(self):
+        async def run():
+            options = ConnectionOptions(keepalive_timeout=90, limit_per_host=1, ttl_dns_cache=60)
+            connector = options.create_connector()
+            try:
+                self.assertEqual(connector.limit_per_host, 1)
+                self.assertFalse(connector.force_close)
+                self.assertTrue(connector.use_dns_cache)
+            finally:
+                await connector.close()
+        asyncio.run(run())
+
+    def test_force_close(self):
+        async def run():
+            connector = ConnectionOptions(force_close=True).create_connector()
+            try:
+                self.assertTrue(connector.force_close)
+            finally:
+                await connector.close()
+        asyncio.run(run())
+
+    def test_pinned_ip(self):
+        async def run():
+            connector = ConnectionOptions(pinned_ips={'inverter.invalid': '10.1.2.3'}).create_connector()
+            try:
+                hosts = await connector._resolver.resolve('inverter.invalid', 80)
+            finally:
+                await connector.close()
+            return hosts
+        hosts = asyncio.run(run())
+        self.assertEqual(hosts[0]['host'], '10.1.2.3')
+        self.assertEqual(hosts[0]['port'], 80)
+        self.assertEqual(hosts[0]['family'], socket.AF_INET)
+
+    def test_api_uses_options(self):
+        async def run():
+            api = SolarFrontierAPI('localhost', connection=ConnectionOptions(limit_per_host=1))
+            try:
+                self.assertEqual(api.session.connector.limit_per_host, 1)
+            finally:
+                await api.close()
+        asyncio.run(run())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+from python_solarfrontier.derived import DerivedMetricsEngine, RollingStats, YieldCheck, imbalance
+from python_solarfrontier.fake_inverter import SAMPLE_MEASUREMENTS, measurements_payload
+from python_solarfrontier.utils import Reading, SolarFrontierWebInfoParser
+import random
+import statistics
+import unittest
+
+
+class TestRollingStats(unittest.TestCase):
+
+    def test_matches_full_recomputation(self):
+        random.seed(0)
+        stats = RollingStats(window=10)
+        samples = []
+        for second in range(200):
+            value = random.uniform(0, 5000)
+            samples.append((second, value))
+            stats.add(second, value)
+            window = [v for t, v in samples if t >= second - 10]
+            self.assertEqual(stats.count, len(window))
+            self.assertAlmostEqual(stats.mean, statistics.fmean(window), places=6)
+            self.assertAlmostEqual(stats.std, statistics.pstdev(window), places=4)
+            self.assertEqual(stats.min, min(window))
+            self.assertEqual(stats.max, max(window))
+
+    def test_empty(self):
+        stats = RollingStats(window=10)
+        self.assertIsNone(stats.mean)
+        self.assertIsNone(stats.std)
+        self.assertIsNone(stats.min)
+
+
+class TestDerivedMetricsEngine(unittest.TestCase):
+
+    def test_imbalance(self):
+        self.assertAlmostEqual(imbalance([10.0, 10.0, 13.0]), 2 / 11)
+        self.assertEqual(imbalance([5.0, 5.0, 5.0]), 0.0)
+        self.assertIsNone(imbalance([5.0, None, 5.0]))
+        self.assertIsNone(imbalance([0.0, 0.0, 0.0]))
+
+    def test_sample(self):
+        measurements = SolarFrontierWebInfoParser.parse_measurements(measurements_payload(SAMPLE_MEASUREMENTS))
+        derived = DerivedMetricsEngine().update(measurements, timestamp=0.0)
+        dc_power = float(SAMPLE_MEASUREMENTS['P DC'][0])
+        ac_power = float(SAMPLE_MEASUREMENTS['P AC'][0])
+        self.assertAlmostEqual(derived.efficiency, ac_power / dc_power)
+        self.assertIsNotNone(derived.current_imbalance)
+        self.assertEqual(derived.power_mean, ac_power)
+        self.assertEqual(derived.energy, 0.0)
+
+    def test_typed_and_phase_sum(self):
+        engine = DerivedMetricsEngine()
+        derived = engine.update({
+            'dc_power': Reading(1000.0, 'W'),
+            'ac_power_phase_1': '0.3kW', 'ac_power_phase_2': '300W', 'ac_power_phase_3': '300W',
+        }, timestamp=0.0)
+        self.assertAlmostEqual(derived.ac_power, 900.0)
+        self.assertAlmostEqual(derived.efficiency, 0.9)
+        self.assertIsNone(derived.voltage_imbalance)
+
+    def test_night(self):
+        derived = DerivedMetricsEngine().update({'dc_power': '0W', 'ac_power': '0W'}, timestamp=0.0)
+        self.assertIsNone(derived.efficiency)
+
+    def test_energy_and_yield_check(self):
+        engine = DerivedMetricsEngine(max_gap=120)
+        self.assertEqual(engine.check_yield_day('10.0kWh'), YieldCheck(0.0, 0.0))
+        # Ramp from 0 to 3600 W over an hour: 1800 Wh
+        for minute in range(61):
+            derived = engine.update({'ac_power': f'{minute * 60}W'}, timestamp=minute * 60.0)
+        self.assertAlmostEqual(derived.energy, 1800.0)
+        check = engine.check_yield_day('11.9kWh')
+        self.assertAlmostEqual(check.reported, 1900.0)
+        self.assertAlmostEqual(check.error, -100 / 1900)
+
+        # A gap is not integrated
+        engine.update({'ac_power': '3600W'}, timestamp=3600.0 + 600)
+        self.assertEqual(engine.gaps, 1)
+        self.assertAlmostEqual(engine.energy, 1800.0)
+
+        # The counter starts over at midnight
+        self.assertEqual(engine.check_yield_day('0.0kWh'), YieldCheck(0.0, 0.0))
+        self.assertIsNone(engine.check_yield_day(None))
+        self.assertIsNone(YieldCheck(5.0, 0.0).error)
+
+    def test_out_of_order(self):
+        engine = DerivedMetricsEngine()
+        engine.update({'ac_power': '1W'}, timestamp=10.0)
+        with self.assertRaises(ValueError):
+            engine.update({'ac_power': '1W'}, timestamp=5.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
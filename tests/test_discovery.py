@@ -0,0 +1,79 @@
+from python_solarfrontier.const import PATH_SYSTEM_INFO
+from python_solarfrontier.discovery import DiscoveredInverter, discover, is_port_open, main, scan
+from python_solarfrontier.fake_inverter import FakeInverter
+from python_solarfrontier.sync import BackgroundLoop
+from aiohttp import web
+from unittest.mock import patch
+import asyncio
+import io
+import json
+import unittest
+
+
+class TestDiscovery(unittest.TestCase):
+
+    def test_scan_finds_inverter(self):
+        async def run():
+            async with FakeInverter() as inverter:
+                # 127.0.0.2 refuses connections on the port
+                return inverter.port, await scan('127.0.0.0/30', port=inverter.port, concurrency=4)
+
+        port, found = asyncio.run(run())
+        self.assertEqual(found, [DiscoveredInverter(f'127.0.0.1:{port}', 'SF-WR-5503x', '5.5 kW')])
+
+    def test_other_web_server_is_ignored(self):
+        async def run():
+            runner = web.AppRunner(web.Application())
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = runner.addresses[0][1]
+            try:
+                self.assertTrue(await is_port_open('127.0.0.1', port))
+                return [inverter async for inverter in discover('127.0.0.1/32', port=port)]
+            finally:
+                await runner.cleanup()
+
+        self.assertEqual(asyncio.run(run()), [])
+
+    def test_undecodable_response_does_not_end_scan(self):
+        async def run():
+            async def system_info(request):
+                return web.Response(body=b'\xff\xfe<td>\xff</td>', content_type='text/html', charset='utf-8')
+
+            app = web.Application()
+            app.router.add_get(PATH_SYSTEM_INFO, system_info)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = runner.addresses[0][1]
+            try:
+                return await scan('127.0.0.0/30', port=port, concurrency=4)
+            finally:
+                await runner.cleanup()
+
+        self.assertEqual(asyncio.run(run()), [])
+
+    def test_closed_port(self):
+        self.assertFalse(asyncio.run(is_port_open('127.0.0.1', 1, timeout=0.5)))
+
+    def test_main_json(self):
+        # The inverter runs on another loop while main() runs its own
+        loop = BackgroundLoop()
+        inverter = FakeInverter()
+        loop.run(inverter.start())
+        output = io.StringIO()
+        try:
+            with patch('sys.stdout', output):
+                main(['127.0.0.1/32', '--port', str(inverter.port), '--json'])
+        finally:
+            loop.run(inverter.stop())
+            loop.stop()
+        self.assertEqual(json.loads(output.getvalue()), {
+            'host': f'127.0.0.1:{inverter.port}', 'model_name': 'SF-WR-5503x', 'nominal_power': '5.5 kW',
+        })
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+from python_solarfrontier.api import SolarFrontierAPI, SolarFrontierResponseError
+from python_solarfrontier.const import PATH_MEASUREMENTS
+from python_solarfrontier.fake_inverter import FakeInverter, measurements_payload
+import unittest
+import asyncio
+
+
+class TestFakeInverter(unittest.TestCase):
+
+    def test_snapshot_end_to_end(self):
+        async def run():
+            async with FakeInverter() as inverter:
+                api = SolarFrontierAPI(inverter.url)
+                snapshot = await api.get_snapshot()
+                await api.close()
+            return snapshot, inverter
+
+        snapshot, inverter = asyncio.run(run())
+        self.assertTrue(snapshot.ok)
+        self.assertEqual(snapshot.system_info, {'model_name': 'SF-WR-5503x', 'nominal_power': '5.5 kW'})
+        self.assertEqual(snapshot.measurements['dc_power'], '4012.5W')
+        self.assertEqual(len(snapshot.measurements), 17)
+        self.assertEqual(snapshot.yield_total, '48.93MWh')
+        self.assertEqual(inverter.requests, 6)
+
+    def test_yield_series_end_to_end(self):
+        async def run():
+            async with FakeInverter() as inverter:
+                api = SolarFrontierAPI(inverter.url)
+                series = await api.get_yield_day_series()
+                label = await api.get_yield_day()
+                await api.close()
+            return series, label
+
+        series, label = asyncio.run(run())
+        self.assertEqual(label, '18.4kWh')
+        self.assertEqual(series.labels[0], '6:00')
+        self.assertEqual(series.unit, 'kWh')
+        self.assertAlmostEqual(sum(series.values), 17.4)
+        self.assertAlmostEqual(series.values_wh()[7], 2400.0)
+
+    def test_payload_update(self):
+        async def run():
+            async with FakeInverter() as inverter:
+                api = SolarFrontierAPI(inverter.url)
+                first = await api.get_measurements()
+                inverter.payloads[PATH_MEASUREMENTS] = measurements_payload({'P DC': ('0', 'W')})
+                second = await api.get_measurements()
+                await api.close()
+            return first, second
+
+        first, second = asyncio.run(run())
+        self.assertEqual(first['dc_power'], '4012.5W')
+        self.assertEqual(second, {'dc_power': '0.0W'})
+
+    def test_errors_and_latency(self):
+        async def run():
+            async with FakeInverter(error_rate=1.0, latency=0.02) as inverter:
+                api = SolarFrontierAPI(inverter.url)
+                started = asyncio.get_running_loop().time()
+                snapshot = await api.get_snapshot(max_concurrency=6)
+                elapsed = asyncio.get_running_loop().time() - started
+                await api.close()
+            return snapshot, elapsed
+
+        snapshot, elapsed = asyncio.run(run())
+        self.assertEqual(len(snapshot.errors), 6)
+        self.assertIsInstance(snapshot.errors['measurements'], SolarFrontierResponseError)
+        self.assertEqual(snapshot.errors['measurements'].status, 500)
+        self.assertGreaterEqual(elapsed, 0.02)
+
+    def test_connections_are_counted(self):
+        async def run():
+            async with FakeInverter() as inverter:
+                api = SolarFrontierAPI(inverter.url)
+                for _ in range(3):
+                    await api.get_yield_day()
+                await api.close()
+            return inverter
+
+        inverter = asyncio.run(run())
+        self.assertEqual(inverter.requests, 3)
+        self.assertEqual(inverter.connections, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
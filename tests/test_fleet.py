@@ -0,0 +1,88 @@
+from python_solarfrontier.fleet import SolarFrontierFleet
+import unittest
+from unittest.mock import patch, AsyncMock
+import asyncio
+import aiohttp
+
+
+async def collect(iterator):
+    return [result async for result in iterator]
+
+
+class TestSolarFrontierFleet(unittest.TestCase):
+
+    def test_duplicate_hosts_are_dropped(self):
+        fleet = SolarFrontierFleet(['10.0.0.1', '10.0.0.2', '10.0.0.1'])
+        self.assertEqual(fleet.hosts, ['10.0.0.1', '10.0.0.2'])
+
+    def test_apis_share_session(self):
+        async def run():
+            fleet = SolarFrontierFleet(['10.0.0.1', '10.0.0.2'])
+            first, second = fleet.api('10.0.0.1'), fleet.api('10.0.0.2')
+            self.assertIs(first.session, second.session)
+            self.assertIs(first.session, fleet.session)
+            # Closing one inverter must not close the shared session
+            await first.close()
+            self.assertFalse(fleet.session.closed)
+            await fleet.close()
+            self.assertTrue(fleet._session.closed)
+        asyncio.run(run())
+
+    @patch('aiohttp.ClientSession.get')
+    def test_poll_once(self, mock_get):
+        mock_response_text = '<td>Name</td><td>test_model</td>'
+        mock_get.return_value.__aenter__.return_value.status = 200
+        mock_get.return_value.__aenter__.return_value.text = AsyncMock(return_value=mock_response_text)
+
+        async def run():
+            fleet = SolarFrontierFleet(['10.0.0.1', '10.0.0.2'])
+            results = await collect(fleet.poll_once())
+            await fleet.close()
+            return results
+
+        results = asyncio.run(run())
+        self.assertEqual(sorted(r.host for r in results), ['10.0.0.1', '10.0.0.2'])
+        for result in results:
+            self.assertIsNone(result.error)
+            self.assertEqual(result.result.system_info, {'model_name': 'test_model'})
+
+    def test_poll_records_errors(self):
+        async def fetch(api):
+            if api.host.endswith('.2'):
+                raise aiohttp.ClientError('offline')
+            return api.host
+
+        async def run():
+            fleet = SolarFrontierFleet(['10.0.0.1', '10.0.0.2'], interval=0, fetch=fetch)
+            results = await collect(fleet.poll(rounds=2))
+            await fleet.close()
+            return results
+
+        results = asyncio.run(run())
+        self.assertEqual(len(results), 4)
+        errors = [r for r in results if r.error is not None]
+        self.assertEqual({r.host for r in errors}, {'10.0.0.2'})
+
+    def test_global_concurrency_limit(self):
+        in_flight = 0
+        peak = 0
+
+        async def fetch(api):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+        async def run():
+            hosts = [f'10.0.0.{i}' for i in range(10)]
+            fleet = SolarFrontierFleet(hosts, max_concurrency=3, fetch=fetch)
+            await collect(fleet.poll_once())
+            await fleet.close()
+
+        asyncio.run(run())
+        self.assertEqual(peak, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+from python_solarfrontier.fake_inverter import measurements_payload, system_info_payload, yield_payload
+from python_solarfrontier.ingest import (
+    KIND_MEASUREMENTS,
+    KIND_SYSTEM_INFO,
+    KIND_YIELD,
+    find_payloads,
+    parse_files,
+    payload_kind
+)
+import math
+import os
+import tempfile
+import unittest
+
+
+class TestIngest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = self.directory.name
+        self.measurements = []
+        for index in range(10):
+            path = os.path.join(self.root, f'{index:02}.gen.measurements.table.js')
+            with open(path, 'w') as handle:
+                handle.write(measurements_payload({'P DC': (str(index * 100), 'W'), 'U DC': ('0.5', 'kV')}))
+            self.measurements.append(path)
+        os.makedirs(os.path.join(self.root, 'sub'))
+        with open(os.path.join(self.root, 'sub', '00.gen.yield.total.chart.js'), 'w') as handle:
+            handle.write(yield_payload('48.93MWh'))
+        with open(os.path.join(self.root, 'sub', '00.gen.info.table.sys.js'), 'w') as handle:
+            handle.write(system_info_payload())
+        with open(os.path.join(self.root, 'notes.txt'), 'w') as handle:
+            handle.write('not a payload')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_payload_kind(self):
+        self.assertEqual(payload_kind('/a/x.gen.measurements.table.js'), KIND_MEASUREMENTS)
+        self.assertEqual(payload_kind('gen.yield.day.chart.js'), KIND_YIELD)
+        self.assertEqual(payload_kind('gen.info.table.sys.js'), KIND_SYSTEM_INFO)
+        self.assertIsNone(payload_kind('notes.txt'))
+
+    def test_find_payloads(self):
+        paths = list(find_payloads(self.root))
+        self.assertEqual(len(paths), 12)
+        self.assertEqual(paths[:10], self.measurements)
+
+    def test_parse_in_process(self):
+        progress = []
+        batches = list(parse_files(
+            find_payloads(self.root), chunk_size=4, processes=0,
+            progress=lambda files, errors: progress.append((files, errors))))
+        by_kind = {}
+        for batch in batches:
+            by_kind.setdefault(batch.kind, []).append(batch)
+        measurements = by_kind[KIND_MEASUREMENTS]
+        self.assertEqual([len(batch.paths) for batch in measurements], [4, 4, 2])
+        self.assertEqual(measurements[0].columns['dc_power'], ['0.0W', '100.0W', '200.0W', '300.0W'])
+        self.assertEqual(measurements[0].columns['ac_power'], [None] * 4)
+        self.assertEqual(by_kind[KIND_YIELD][0].columns, {'yield': ['48.93MWh']})
+        self.assertEqual(by_kind[KIND_SYSTEM_INFO][0].columns['model_name'], ['SF-WR-5503x'])
+        self.assertEqual(progress, [(4, 0), (8, 0), (12, 0)])
+
+    def test_parse_typed_in_pool(self):
+        paths = self.measurements + [os.path.join(self.root, 'missing.gen.measurements.table.js')]
+        batches = list(parse_files(paths, typed=True, chunk_size=3, processes=2, max_pending=1))
+        self.assertEqual(len(batches), 4)
+        values = [value for batch in batches for value in batch.columns['dc_power']]
+        self.assertEqual(values, [index * 100.0 for index in range(10)])
+        self.assertEqual(batches[0].columns['dc_voltage'], [500.0] * 3)
+        self.assertTrue(math.isnan(batches[0].columns['ac_power'][0]))
+        self.assertEqual(list(batches[-1].errors), [paths[-1]])
+
+    def test_unknown_kind(self):
+        with self.assertRaises(ValueError):
+            list(parse_files([], kind='unknown'))
+
+
+if __name__ == '__main__':
+    unittest.main()
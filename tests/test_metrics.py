@@ -0,0 +1,119 @@
+from python_solarfrontier.api import SolarFrontierAPI
+from python_solarfrontier.const import PATH_MEASUREMENTS, PATH_YIELD_DAY
+from python_solarfrontier.fake_inverter import FakeInverter
+from python_solarfrontier.metrics import MetricsCollector, MetricsHook, RequestTiming
+import unittest
+from unittest.mock import patch
+import asyncio
+import aiohttp
+
+
+class RecordingHook(MetricsHook):
+
+    def __init__(self):
+        self.calls = []
+
+    def on_request(self, host, path, timing):
+        self.calls.append(('request', path, timing))
+
+    def on_parse(self, host, path, seconds):
+        self.calls.append(('parse', path, seconds))
+
+    def on_error(self, host, path, error, seconds):
+        self.calls.append(('error', path, error))
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_request_and_parse_timings(self):
+        hook = RecordingHook()
+
+        async def run():
+            async with FakeInverter(latency=0.01) as inverter:
+                api = SolarFrontierAPI(inverter.url, metrics=hook)
+                await api.get_measurements()
+                await api.get_measurements()
+                await api.close()
+
+        asyncio.run(run())
+        kinds = [(kind, path) for kind, path, _ in hook.calls]
+        # The unchanged second payload is not parsed again
+        self.assertEqual(kinds, [
+            ('request', PATH_MEASUREMENTS),
+            ('parse', PATH_MEASUREMENTS),
+            ('request', PATH_MEASUREMENTS),
+        ])
+        first, second = hook.calls[0][2], hook.calls[2][2]
+        self.assertEqual(first.status, 200)
+        self.assertGreaterEqual(first.ttfb, 0.01)
+        self.assertIsNotNone(first.connect)
+        # The second request reuses the connection
+        self.assertIsNone(second.connect)
+        self.assertAlmostEqual(first.total, first.ttfb + first.body)
+
+    def test_failures_are_reported(self):
+        hook = RecordingHook()
+
+        async def run():
+            async with FakeInverter(error_rate=1.0) as inverter:
+                api = SolarFrontierAPI(inverter.url, metrics=hook)
+                result = await api.get_yield_day()
+                await api.close()
+            return result
+
+        self.assertIsNone(asyncio.run(run()))
+        kind, path, error = hook.calls[0]
+        self.assertEqual((kind, path), ('error', PATH_YIELD_DAY))
+        self.assertEqual(error.status, 500)
+
+    def test_collector(self):
+        collector = MetricsCollector(smoothing=0.5)
+        collector.on_request('h', '/a', RequestTiming(status=200, ttfb=0.1, body=0.1, total=0.2))
+        collector.on_request('h', '/a', RequestTiming(status=200, ttfb=0.3, body=0.1, total=0.4))
+        stats = collector.hosts['h']
+        self.assertAlmostEqual(stats.latency, 0.3)
+        self.assertTrue(stats.healthy)
+        for _ in range(3):
+            collector.on_error('h', '/a', aiohttp.ClientError(), 0.0)
+        collector.on_error('h', '/a', asyncio.TimeoutError(), 5.0)
+        self.assertEqual(stats.requests, 6)
+        self.assertEqual(stats.failures, {'ClientError': 3, 'TimeoutError': 1})
+        self.assertFalse(stats.healthy)
+
+    def test_parse_errors_do_not_make_host_unhealthy(self):
+        collector = MetricsCollector()
+
+        async def run():
+            async with FakeInverter() as inverter:
+                api = SolarFrontierAPI(inverter.url, metrics=collector)
+                with patch('python_solarfrontier.utils.SolarFrontierWebInfoParser.parse_yield',
+                           side_effect=ValueError):
+                    for path in ('day', 'month', 'year'):
+                        with self.assertRaises(ValueError):
+                            await getattr(api, f'get_yield_{path}')()
+                await api.close()
+            return inverter.url
+
+        stats = collector.hosts[asyncio.run(run())]
+        self.assertEqual(stats.requests, 3)
+        self.assertEqual(stats.failures, {})
+        self.assertEqual(stats.parse_failures, {'ValueError': 3})
+        self.assertTrue(stats.healthy)
+
+    @patch('aiohttp.ClientSession.get')
+    def test_client_error_is_counted(self, mock_get):
+        mock_get.side_effect = aiohttp.ClientConnectionError
+        collector = MetricsCollector()
+
+        async def run():
+            api = SolarFrontierAPI('localhost', metrics=collector)
+            result = await api.get_measurements()
+            await api.close()
+            return result
+
+        self.assertEqual(asyncio.run(run()), {})
+        self.assertEqual(collector.hosts['http://localhost'].failures, {'ClientConnectionError': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import python_solarfrontier
+import subprocess
+import sys
+import unittest
+
+_CHECK_IMPORTS = """
+import sys
+from python_solarfrontier import SolarFrontierWebInfoParser, UnitConverter
+import python_solarfrontier.derived
+import python_solarfrontier.ingest
+print('aiohttp' in sys.modules)
+"""
+
+
+class TestPackage(unittest.TestCase):
+
+    def test_parsers_do_not_import_aiohttp(self):
+        output = subprocess.run(
+            [sys.executable, '-c', _CHECK_IMPORTS], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip(), 'False')
+
+    def test_lazy_exports(self):
+        from python_solarfrontier.api import SolarFrontierAPI
+        self.assertIs(python_solarfrontier.SolarFrontierAPI, SolarFrontierAPI)
+        self.assertIn('SolarFrontierFleet', dir(python_solarfrontier))
+        with self.assertRaises(AttributeError):
+            python_solarfrontier.missing
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+from python_solarfrontier.cache import ResponseCache
+from python_solarfrontier.api import SolarFrontierResponseError
+from python_solarfrontier.const import PATH_YIELD_DAY, PATH_YIELD_TOTAL, PATH_YIELD_YEAR
+from python_solarfrontier.fake_inverter import FakeInverter, default_payloads, yield_payload
+from python_solarfrontier.portfolio import HostYields, Portfolio, YieldTotals, rollup
+import aiohttp
+import asyncio
+import unittest
+
+
+class TestPortfolio(unittest.TestCase):
+
+    def test_rollup(self):
+        totals = rollup([HostYields(1.0, 2.0, 3.0, 4.0), HostYields(10.0, None, 30.0, 40.0)])
+        self.assertEqual(totals, YieldTotals(11.0, 2.0, 33.0, 44.0, hosts=2, missing=1))
+        self.assertEqual(rollup([]), YieldTotals())
+
+    def test_refresh(self):
+        async def run():
+            second_payloads = default_payloads()
+            second_payloads[PATH_YIELD_DAY] = yield_payload('1.6kWh')
+            second_payloads[PATH_YIELD_TOTAL] = yield_payload('900Wh')
+            async with FakeInverter() as first, FakeInverter(second_payloads) as second:
+                portfolio = Portfolio(
+                    {first.url: ['site:a', 'all'], second.url: ['site:b', 'all'], 'http://127.0.0.1:1': ['site:b']},
+                    cache=ResponseCache(ttls={PATH_YIELD_DAY: 0.0}),
+                )
+                yields = await portfolio.refresh()
+                requests = first.requests
+                again = await portfolio.refresh()
+                await portfolio.close()
+            return first, second, yields, requests, again
+
+        first, second, yields, requests, again = asyncio.run(run())
+        self.assertEqual(yields.hosts[first.url].day, 18400.0)
+        self.assertEqual(yields.hosts[first.url].total, 48930000.0)
+        self.assertEqual(yields.groups['site:a'].day, 18400.0)
+        self.assertEqual(yields.groups['all'].day, 20000.0)
+        self.assertEqual(yields.groups['all'].total, 48930900.0)
+        self.assertEqual(yields.groups['site:b'].hosts, 2)
+        self.assertEqual(yields.groups['site:b'].missing, 1)
+        self.assertEqual(yields.total.hosts, 3)
+        self.assertEqual(yields.total.day, 20000.0)
+        # Only the day yield is fetched again
+        self.assertEqual(requests, 4)
+        self.assertEqual(first.requests, 5)
+        self.assertEqual(again.groups, yields.groups)
+        self.assertEqual(list(yields.errors), ['http://127.0.0.1:1'])
+        self.assertEqual(set(yields.errors['http://127.0.0.1:1']), {'day', 'month', 'year', 'total'})
+        self.assertIsInstance(yields.errors['http://127.0.0.1:1']['day'], aiohttp.ClientError)
+
+    def test_refresh_partial_failure(self):
+        async def run():
+            payloads = default_payloads()
+            del payloads[PATH_YIELD_YEAR]
+            async with FakeInverter(payloads) as inverter:
+                portfolio = Portfolio({inverter.url: ['all']})
+                yields = await portfolio.refresh()
+                await portfolio.close()
+            return inverter, yields
+
+        inverter, yields = asyncio.run(run())
+        self.assertIsNone(yields.hosts[inverter.url].year)
+        self.assertEqual(yields.hosts[inverter.url].day, 18400.0)
+        self.assertEqual(yields.total.missing, 1)
+        self.assertEqual(list(yields.errors[inverter.url]), ['year'])
+        self.assertIsInstance(yields.errors[inverter.url]['year'], SolarFrontierResponseError)
+
+
+if __name__ == '__main__':
+    unittest.main()
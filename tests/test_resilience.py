@@ -0,0 +1,146 @@
+from python_solarfrontier.api import SolarFrontierAPI, SolarFrontierResponseError
+from python_solarfrontier.fake_inverter import FakeInverter
+from python_solarfrontier.resilience import CircuitOpenError, HostGuard, is_transient
+import unittest
+from unittest.mock import patch
+import asyncio
+import aiohttp
+
+
+class TestHostGuard(unittest.TestCase):
+
+    def test_timeout_follows_latency(self):
+        guard = HostGuard(min_timeout=0.1, max_timeout=5)
+        self.assertEqual(guard.timeout, 5)
+        for _ in range(50):
+            guard.record_success(0.2)
+        self.assertLess(guard.timeout, 0.3)
+        self.assertGreaterEqual(guard.timeout, 0.2)
+        guard.record_failure()
+        self.assertGreater(guard.timeout, 0.4)
+
+    def test_timeout_bounds(self):
+        guard = HostGuard(min_timeout=0.5, max_timeout=2)
+        guard.record_success(0.01)
+        self.assertEqual(guard.timeout, 0.5)
+        guard.record_success(10)
+        self.assertEqual(guard.timeout, 2)
+
+    def test_timeout_after_many_failures(self):
+        guard = HostGuard(min_timeout=0.1, max_timeout=5, failure_threshold=10 ** 6)
+        guard.record_success(0.2)
+        for _ in range(5000):
+            guard.record_failure()
+        self.assertEqual(guard.timeout, 5)
+
+    def test_backoff_is_jittered_and_capped(self):
+        guard = HostGuard(base_delay=1, max_delay=3)
+        for attempt in range(1, 6):
+            delay = guard.backoff(attempt)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, min(3, 2 ** (attempt - 1)))
+
+    def test_circuit_breaker(self):
+        guard = HostGuard(failure_threshold=2, reset_timeout=10)
+        with patch('time.monotonic', return_value=100):
+            guard.before_request()
+            guard.record_failure()
+            guard.before_request()
+            guard.record_failure()
+            self.assertTrue(guard.is_open)
+            with self.assertRaises(CircuitOpenError):
+                guard.before_request()
+        with patch('time.monotonic', return_value=111):
+            # One probe is let through, concurrent requests still fail
+            guard.before_request()
+            with self.assertRaises(CircuitOpenError):
+                guard.before_request()
+            guard.record_failure()
+            with self.assertRaises(CircuitOpenError):
+                guard.before_request()
+        with patch('time.monotonic', return_value=122):
+            guard.before_request()
+            guard.record_success(0.1)
+            self.assertFalse(guard.is_open)
+            guard.before_request()
+
+    def test_is_transient(self):
+        self.assertTrue(is_transient(asyncio.TimeoutError()))
+        self.assertTrue(is_transient(aiohttp.ClientConnectionError()))
+        self.assertTrue(is_transient(SolarFrontierResponseError('/', 503)))
+        self.assertFalse(is_transient(SolarFrontierResponseError('/', 404)))
+        self.assertFalse(is_transient(ValueError()))
+
+
+class TestGuardedAPI(unittest.TestCase):
+
+    def test_retries_then_opens_circuit(self):
+        async def run():
+            async with FakeInverter(error_rate=1.0) as inverter:
+                guard = HostGuard(attempts=3, base_delay=0.001, failure_threshold=5)
+                api = SolarFrontierAPI(inverter.url, guard=guard)
+                first = await api.get_yield_day()
+                requests_after_first = inverter.requests
+                second = await api.get_measurements()
+                third = await api.get_measurements()
+                await api.close()
+            return first, requests_after_first, second, third, inverter.requests, guard
+
+        first, requests_after_first, second, third, requests, guard = asyncio.run(run())
+        self.assertIsNone(first)
+        self.assertEqual(requests_after_first, 3)
+        # Two more failures open the circuit, no third attempt is made
+        self.assertIsNone(second)
+        self.assertTrue(guard.is_open)
+        # Fails fast like any client error
+        self.assertEqual(third, {})
+        self.assertEqual(requests, 5)
+
+    def test_not_found_is_not_retried(self):
+        async def run():
+            async with FakeInverter(payloads={}) as inverter:
+                guard = HostGuard(attempts=3)
+                api = SolarFrontierAPI(inverter.url, guard=guard)
+                result = await api.get_yield_day()
+                await api.close()
+            return result, inverter.requests, guard
+
+        result, requests, guard = asyncio.run(run())
+        self.assertIsNone(result)
+        self.assertEqual(requests, 1)
+        self.assertEqual(guard.consecutive_failures, 0)
+
+    def test_timeout_is_handled_like_client_error(self):
+        async def run():
+            async with FakeInverter(latency=0.5) as inverter:
+                guard = HostGuard(min_timeout=0.05, max_timeout=0.05, attempts=1, failure_threshold=10)
+                api = SolarFrontierAPI(inverter.url, guard=guard)
+                results = (
+                    await api.test_connection(),
+                    await api.get_measurements(),
+                    await api.get_yield_day(),
+                    await api.get_yield_day_series(),
+                )
+                await api.close()
+            return results, guard
+
+        results, guard = asyncio.run(run())
+        self.assertEqual(results, (False, {}, 0.0, None))
+        self.assertEqual(guard.consecutive_failures, 4)
+
+    def test_success_adapts_timeout(self):
+        async def run():
+            async with FakeInverter() as inverter:
+                guard = HostGuard(min_timeout=0.5)
+                api = SolarFrontierAPI(inverter.url, guard=guard)
+                snapshot = await api.get_snapshot()
+                await api.close()
+            return snapshot, guard
+
+        snapshot, guard = asyncio.run(run())
+        self.assertTrue(snapshot.ok)
+        self.assertEqual(guard.timeout, 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
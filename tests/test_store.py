@@ -0,0 +1,116 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+import asyncio
+import os
+import tempfile
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+if numpy is not None:
+    from python_solarfrontier.store import TimeSeriesStore
+from python_solarfrontier.api import SolarFrontierSnapshot
+from python_solarfrontier.utils import Reading
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestTimeSeriesStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = TimeSeriesStore(self.directory.name)
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def test_raw_range_query(self):
+        for second in range(0, 100, 5):
+            self.store.append('10.0.0.1', 'dc_power', 1000 + second, second)
+        samples = self.store.query('10.0.0.1', 'dc_power', 1010, 1030)
+        self.assertEqual(samples['time'].tolist(), [1010, 1015, 1020, 1025])
+        self.assertEqual(samples['value'].tolist(), [10, 15, 20, 25])
+        self.assertEqual(len(self.store.query('10.0.0.1', 'dc_power')), 20)
+        self.assertEqual(len(self.store.query('10.0.0.2', 'dc_power')), 0)
+
+    def test_rollups(self):
+        # Two and a half minutes of samples every 5 seconds
+        for second in range(0, 150, 5):
+            self.store.append('h', 'p', 6000 + second, second)
+        minutes = self.store.query('h', 'p', resolution=60)
+        self.assertEqual(minutes['time'].tolist(), [6000, 6060, 6120])
+        self.assertEqual(minutes['count'].tolist(), [12, 12, 6])
+        self.assertEqual(minutes['min'].tolist(), [0, 60, 120])
+        self.assertEqual(minutes['max'].tolist(), [55, 115, 145])
+        self.assertEqual(minutes['sum'][0], sum(range(0, 60, 5)))
+        hours = self.store.query('h', 'p', resolution=3600)
+        self.assertEqual(hours['count'].tolist(), [30])
+        with self.assertRaises(ValueError):
+            self.store.query('h', 'p', resolution=7)
+
+    def test_reopen_restores_unfinished_buckets(self):
+        for second in range(0, 90, 10):
+            self.store.append('h', 'p', 6000 + second, 1)
+        self.store.close()
+        store = TimeSeriesStore(self.directory.name)
+        for second in range(90, 130, 10):
+            store.append('h', 'p', 6000 + second, 1)
+        minutes = store.query('h', 'p', resolution=60)
+        store.close()
+        self.assertEqual(minutes['count'].tolist(), [6, 6, 1])
+
+    def test_yield_counter_keeps_wh(self):
+        self.store.append('h', 'yield_total', 10, 48930123.4)
+        self.store.append('h', 'yield_total', 20, 48930124.4)
+        values = self.store.query('h', 'yield_total')['value']
+        self.assertEqual(values.tolist(), [48930123.4, 48930124.4])
+
+    @unittest.skipUnless(os.path.isdir('/proc/self/fd'), "needs /proc/self/fd")
+    def test_many_series_keep_no_files_open(self):
+        open_files = len(os.listdir('/proc/self/fd'))
+        for host in range(50):
+            for metric in ('dc_power', 'ac_power', 'yield_total'):
+                self.store.append(f'10.0.0.{host}', metric, 100, 1)
+        self.assertLessEqual(len(os.listdir('/proc/self/fd')), open_files)
+        self.store.flush()
+        self.assertEqual(self.store.query('10.0.0.49', 'ac_power')['value'].tolist(), [1])
+
+    def test_rollup_query_after_reopen(self):
+        for second in range(0, 600, 5):
+            self.store.append('h', 'p', 7200 + second, 2)
+        self.store.close()
+        store = TimeSeriesStore(self.directory.name)
+        hours = store.query('h', 'p', resolution=3600)
+        raw = store.query('h', 'p')
+        store.close()
+        self.assertEqual(hours['count'].tolist(), [120])
+        self.assertEqual(hours['sum'].tolist(), [240])
+        self.assertEqual(len(raw), 120)
+
+    def test_out_of_order_sample(self):
+        self.store.append('h', 'p', 10, 1)
+        with self.assertRaises(ValueError):
+            self.store.append('h', 'p', 5, 1)
+
+    def test_append_readings(self):
+        self.store.append_readings('http://10.0.0.1', {
+            'dc_power': '1.5kW',
+            'dc_voltage': Reading(600.0, 'V'),
+            'broken': None,
+            'yield_total': '2.5MWh',
+        }, timestamp=100)
+        self.assertEqual(list(self.store.metrics('http://10.0.0.1')), ['dc_power', 'dc_voltage', 'yield_total'])
+        self.assertEqual(self.store.query('http://10.0.0.1', 'dc_power')['value'].tolist(), [1500.0])
+        self.assertEqual(self.store.query('http://10.0.0.1', 'yield_total')['value'].tolist(), [2500000.0])
+
+    def test_record(self):
+        api = MagicMock(host='http://10.0.0.1')
+        api.get_snapshot = AsyncMock(return_value=SolarFrontierSnapshot(
+            measurements={'dc_power': '100.0W'}, yield_day='1.0kWh'))
+        asyncio.run(self.store.record(api, timestamp=50))
+        self.assertEqual(list(self.store.metrics('http://10.0.0.1')), ['dc_power', 'yield_day'])
+
+
+if __name__ == '__main__':
+    unittest.main()
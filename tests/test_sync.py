@@ -0,0 +1,86 @@
+from python_solarfrontier.fake_inverter import FakeInverter
+from python_solarfrontier.sync import BackgroundLoop, SolarFrontierSyncAPI
+from concurrent.futures import ThreadPoolExecutor
+import concurrent.futures
+import unittest
+import asyncio
+
+
+class TestSolarFrontierSyncAPI(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = BackgroundLoop()
+        self.inverter = FakeInverter()
+        self.loop.run(self.inverter.start())
+
+    def tearDown(self):
+        self.loop.run(self.inverter.stop())
+        self.loop.stop()
+
+    def test_methods(self):
+        with SolarFrontierSyncAPI(self.inverter.url, loop=self.loop) as api:
+            self.assertTrue(api.test_connection())
+            self.assertEqual(api.get_system_info()['model_name'], 'SF-WR-5503x')
+            self.assertEqual(api.get_measurements()['dc_power'], '4012.5W')
+            self.assertEqual(api.get_yield_total(), '48.93MWh')
+            self.assertAlmostEqual(sum(api.get_yield_day_series().values), 17.4)
+            self.assertTrue(api.get_snapshot().ok)
+        self.assertTrue(api.api._session.closed)
+
+    def test_threads_share_session(self):
+        api = SolarFrontierSyncAPI(self.inverter.url, loop=self.loop)
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(lambda _: api.get_measurements(), range(40)))
+        api.close()
+        self.assertTrue(all(result['dc_power'] == '4012.5W' for result in results))
+        self.assertEqual(self.inverter.requests, 40)
+        # Connections are kept alive instead of opened per call
+        self.assertLessEqual(self.inverter.connections, 3)
+
+    def test_call_from_loop_thread(self):
+        api = SolarFrontierSyncAPI(self.inverter.url, loop=self.loop)
+
+        async def nested():
+            return api.get_measurements()
+
+        with self.assertRaises(RuntimeError):
+            self.loop.run(nested())
+        api.close()
+
+    def test_timeout_cancels_call(self):
+        self.inverter.latency = 1.0
+        api = SolarFrontierSyncAPI(self.inverter.url, loop=self.loop, call_timeout=0.1)
+        with self.assertRaises(concurrent.futures.TimeoutError):
+            api.get_measurements()
+
+        async def running():
+            await asyncio.sleep(0.05)
+            return [
+                task for task in asyncio.all_tasks()
+                if task.get_coro().__qualname__ == 'SolarFrontierAPI.get_measurements'
+            ]
+
+        self.assertEqual(self.loop.run(running()), [])
+        api.close()
+
+    def test_request_timeout_is_passed_on(self):
+        api = SolarFrontierSyncAPI(self.inverter.url, loop=self.loop, timeout=1.0, call_timeout=3.0)
+        self.assertEqual(api.api.timeout, 1.0)
+        self.assertEqual(api.call_timeout, 3.0)
+
+    def test_stop_closes_sessions(self):
+        loop = BackgroundLoop()
+        api = SolarFrontierSyncAPI(self.inverter.url, loop=loop)
+        self.assertTrue(api.test_connection())
+        loop.stop()
+        self.assertTrue(api.api._session.closed)
+
+    def test_shared_loop(self):
+        first = SolarFrontierSyncAPI('127.0.0.1')
+        second = SolarFrontierSyncAPI('127.0.0.2')
+        self.assertIs(first._background, second._background)
+        self.assertIsInstance(first._background.loop, asyncio.AbstractEventLoop)
+
+
+if __name__ == '__main__':
+    unittest.main()
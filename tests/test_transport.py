@@ -0,0 +1,216 @@
+from python_solarfrontier.api import SolarFrontierAPI
+from python_solarfrontier.const import PATH_MEASUREMENTS, PATH_SYSTEM_INFO
+from python_solarfrontier.fake_inverter import FakeInverter, default_payloads
+from python_solarfrontier.transport import AiohttpTransport, MemoryTransport, StreamTransport, Transport, read_response
+from unittest.mock import patch
+import aiohttp
+import asyncio
+import unittest
+
+
+async def _start_server(handle):
+    server = await asyncio.start_server(handle, '127.0.0.1', 0)
+    return server, f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+
+
+async def _read_request(reader):
+    head = await reader.readuntil(b'\r\n\r\n')
+    return head.split(b' ')[1].decode()
+
+
+def _response(body, extra=b''):
+    return b'HTTP/1.1 200 OK\r\nContent-Length: %d\r\n%s\r\n%s' % (len(body), extra, body)
+
+
+class TestTransport(unittest.TestCase):
+
+    def test_memory_transport(self):
+        async def run():
+            transport = MemoryTransport({PATH_SYSTEM_INFO: default_payloads()[PATH_SYSTEM_INFO]})
+            api = SolarFrontierAPI('inverter', transport=transport)
+            return transport, await api.get_system_info(), await api.get_measurements()
+
+        transport, system_info, measurements = asyncio.run(run())
+        self.assertEqual(system_info['model_name'], 'SF-WR-5503x')
+        self.assertIsNone(measurements)
+        self.assertEqual(transport.requests, [
+            'http://inverter' + PATH_SYSTEM_INFO, 'http://inverter' + PATH_MEASUREMENTS,
+        ])
+
+    def test_transport_is_abstract(self):
+        with self.assertRaises(TypeError):
+            Transport()
+
+    def test_aiohttp_transport_headers(self):
+        async def handle(reader, writer):
+            await _read_request(reader)
+            writer.write(_response(b'ok', b'ETag: "v1"\r\n'))
+            await writer.drain()
+            writer.close()
+
+        async def run():
+            server, url = await _start_server(handle)
+            async with aiohttp.ClientSession() as session:
+                response = await AiohttpTransport(session).request(url + '/', {}, 5)
+            server.close()
+            await server.wait_closed()
+            return response
+
+        response = asyncio.run(run())
+        self.assertEqual(response.text, 'ok')
+        self.assertEqual(response.headers['etag'], '"v1"')
+        self.assertEqual(response.headers['content-length'], '2')
+
+    def test_stream_transport_snapshot(self):
+        async def run():
+            async with FakeInverter() as inverter:
+                transport = StreamTransport()
+                api = SolarFrontierAPI(inverter.url, transport=transport)
+                stream_snapshot = await api.get_snapshot(max_concurrency=6)
+                await api.get_snapshot(max_concurrency=6)
+                await transport.close()
+                reference = SolarFrontierAPI(inverter.url)
+                snapshot = await reference.get_snapshot()
+                await reference.close()
+            return inverter, stream_snapshot, snapshot
+
+        inverter, stream_snapshot, snapshot = asyncio.run(run())
+        self.assertTrue(stream_snapshot.ok)
+        self.assertEqual(stream_snapshot.measurements, snapshot.measurements)
+        self.assertEqual(stream_snapshot.yield_total, snapshot.yield_total)
+        # Two snapshots over the stream transport, one over aiohttp
+        self.assertEqual(inverter.requests, 18)
+
+    def test_requests_are_pipelined(self):
+        async def handle(reader, writer):
+            # Answer only once all three requests arrived on this connection
+            paths = [await _read_request(reader) for _ in range(3)]
+            writer.write(b''.join(_response(path.encode()) for path in paths))
+            await writer.drain()
+            writer.close()
+
+        async def run():
+            server, url = await _start_server(handle)
+            transport = StreamTransport()
+            responses = await asyncio.wait_for(
+                transport.request_many([f'{url}/a', f'{url}/b', f'{url}/c'], timeout=2), 2)
+            await transport.close()
+            server.close()
+            return responses
+
+        responses = asyncio.run(run())
+        self.assertEqual([response.text for response in responses], ['/a', '/b', '/c'])
+
+    def test_unanswered_requests_are_resent(self):
+        connections = []
+
+        async def handle(reader, writer):
+            connections.append(writer)
+            path = await _read_request(reader)
+            writer.write(_response(path.encode(), b'Connection: close\r\n'))
+            await writer.drain()
+            writer.close()
+
+        async def run():
+            server, url = await _start_server(handle)
+            transport = StreamTransport()
+            responses = await transport.request_many([f'{url}/a', f'{url}/b'], timeout=2)
+            await transport.close()
+            server.close()
+            return responses
+
+        responses = asyncio.run(run())
+        self.assertEqual([response.text for response in responses], ['/a', '/b'])
+        self.assertEqual(len(connections), 2)
+
+    def test_errors(self):
+        async def handle(reader, writer):
+            await _read_request(reader)
+            try:
+                await asyncio.sleep(1)
+            finally:
+                writer.close()
+
+        async def run():
+            server, url = await _start_server(handle)
+            transport = StreamTransport()
+            with self.assertRaises(asyncio.TimeoutError):
+                await transport.request(f'{url}/slow', {}, timeout=0.1)
+            with self.assertRaises(aiohttp.ClientConnectionError):
+                await transport.request('http://127.0.0.1:1/', {}, timeout=1)
+            api = SolarFrontierAPI('127.0.0.1:1', transport=transport)
+            self.assertEqual(await api.get_measurements(), {})
+            await transport.close()
+            server.close()
+
+        asyncio.run(run())
+
+    def test_ttfb_is_time_to_headers(self):
+        async def handle(reader, writer):
+            await _read_request(reader)
+            writer.write(b'HTTP/1.1 200 OK\r\nContent-Length: 4\r\n\r\n')
+            await writer.drain()
+            await asyncio.sleep(0.3)
+            writer.write(b'body')
+            await writer.drain()
+            writer.close()
+
+        async def run():
+            server, url = await _start_server(handle)
+            transport = StreamTransport()
+            response = await transport.request(f'{url}/a', {}, timeout=2)
+            await transport.close()
+            server.close()
+            return response
+
+        response = asyncio.run(run())
+        self.assertEqual(response.text, 'body')
+        self.assertLess(response.ttfb, 0.2)
+
+    def test_reading_error_fails_pending_requests(self):
+        async def handle(reader, writer):
+            path = await _read_request(reader)
+            writer.write(_response(path.encode()))
+            await writer.drain()
+            writer.close()
+
+        async def run():
+            server, url = await _start_server(handle)
+            transport = StreamTransport()
+            with patch('python_solarfrontier.transport.read_response', side_effect=RuntimeError('boom')):
+                with self.assertRaises(aiohttp.ServerDisconnectedError):
+                    await transport.request(f'{url}/a', {}, timeout=2)
+            await transport.close()
+            server.close()
+
+        asyncio.run(run())
+
+    def test_read_unknown_charset(self):
+        async def run():
+            reader = asyncio.StreamReader()
+            reader.feed_data(_response('wärme'.encode(), b'Content-Type: text/html; charset=bogus\r\n'))
+            return await read_response(reader)
+
+        response, _, _ = asyncio.run(run())
+        self.assertEqual(response.text, 'wärme')
+
+    def test_read_chunked_response(self):
+        async def run():
+            reader = asyncio.StreamReader()
+            reader.feed_data(
+                b'HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\nContent-Type: text/plain; charset=latin-1\r\n'
+                b'ETag: "v1"\r\n\r\n4\r\nabc\xe4\r\n3;x=1\r\ndef\r\n0\r\n\r\n'
+                b'HTTP/1.1 304 Not Modified\r\nConnection: close\r\n\r\n'
+            )
+            return await read_response(reader), await read_response(reader)
+
+        (first, first_closing, _), (second, second_closing, _) = asyncio.run(run())
+        self.assertEqual(first.text, 'abcädef')
+        self.assertEqual(first.headers['etag'], '"v1"')
+        self.assertFalse(first_closing)
+        self.assertEqual(second.status, 304)
+        self.assertTrue(second_closing)
+
+
+if __name__ == '__main__':
+    unittest.main()
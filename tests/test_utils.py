@@ -1,5 +1,9 @@
 import unittest
-from python_solarfrontier.utils import SolarFrontierWebInfoParser, UnitConverter
+try:
+    import numpy
+except ImportError:
+    numpy = None
+from python_solarfrontier.utils import Reading, SolarFrontierWebInfoParser, UnitConverter, YieldSeries, to_base_unit
 
 
 class TestSolarFrontierWebInfoParser(unittest.TestCase):
@@ -10,6 +14,13 @@ class TestSolarFrontierWebInfoParser(unittest.TestCase):
         result = SolarFrontierWebInfoParser.parse_system_info(html_content)
         self.assertEqual(result, expected)
 
+    def test_parse_system_info_first_match_wins(self):
+        html_content = ("<td>Nominal Power</td><td>5.0 kW</td><td>Name</td><td>SF1234</td>"
+                        "<td>Name</td><td>other</td>")
+        expected = {"model_name": "SF1234", "nominal_power": "5.0 kW"}
+        result = SolarFrontierWebInfoParser.parse_system_info(html_content)
+        self.assertEqual(result, expected)
+
     def test_parse_system_info_invalid(self):
         html_content = "<div>Some unrelated content</div>"
         result = SolarFrontierWebInfoParser.parse_system_info(html_content)
@@ -21,6 +32,34 @@ class TestSolarFrontierWebInfoParser(unittest.TestCase):
         result = SolarFrontierWebInfoParser.parse_measurements(html_content)
         self.assertEqual(result, expected)
 
+    def test_parse_measurements_unknown_and_invalid_values(self):
+        html_content = ("<tr><td>P DC</td><td align='right'> 5 </td><td> W </td></tr>"
+                        "<tr><td>Temp Inside</td><td align='right'>---</td><td>C</td></tr>")
+        expected = {"dc_power": "5.0W", "temp_inside": None}
+        result = SolarFrontierWebInfoParser.parse_measurements(html_content)
+        self.assertEqual(result, expected)
+
+    def test_parse_measurements_typed(self):
+        html_content = ("<tr><td>P DC</td><td align='right'>1.5</td><td>kW</td></tr>"
+                        "<tr><td>F AC</td><td align='right'>50.01</td><td>Hz</td></tr>"
+                        "<tr><td>Temp Inside</td><td align='right'>---</td><td>C</td></tr>")
+        expected = {"dc_power": Reading(1500.0, "W"), "ac_frequency": Reading(50.01, "Hz"), "temp_inside": None}
+        result = SolarFrontierWebInfoParser.parse_measurements(html_content, typed=True)
+        self.assertEqual(result, expected)
+
+    def test_to_base_unit(self):
+        test_cases = [
+            ((2.5, "kWh"), Reading(2500.0, "Wh")),
+            ((1.0, "MW"), Reading(1e6, "W")),
+            ((300.0, "mA"), Reading(0.3, "A")),
+            ((20.0, "C"), Reading(20.0, "C")),
+        ]
+        for args, expected in test_cases:
+            with self.subTest(args=args):
+                result = to_base_unit(*args)
+                self.assertAlmostEqual(result.value, expected.value)
+                self.assertEqual(result.unit, expected.unit)
+
     def test_parse_measurements_invalid(self):
         html_content = "<div>Invalid content</div>"
         result = SolarFrontierWebInfoParser.parse_measurements(html_content)
@@ -37,6 +76,26 @@ class TestSolarFrontierWebInfoParser(unittest.TestCase):
         result = SolarFrontierWebInfoParser.parse_yield(html_content)
         self.assertIsNone(result)
         
+    def test_parse_yield_series_valid(self):
+        html_content = ('var chart = new Chart();'
+                        'chart.labels = ["Jan", "Feb", "Mar"];'
+                        'chart.data = [1.5, "2", null];'
+                        'chart.unit = "MWh";')
+        result = SolarFrontierWebInfoParser.parse_yield_series(html_content)
+        self.assertEqual(result, YieldSeries(["Jan", "Feb", "Mar"], [1.5, 2.0, None], "MWh"))
+        self.assertEqual(result.values_wh(), [1.5e6, 2e6, None])
+
+    def test_parse_yield_series_object_literal(self):
+        html_content = "new Chart({data: [0.1, 0.2]});"
+        result = SolarFrontierWebInfoParser.parse_yield_series(html_content)
+        self.assertEqual(result, YieldSeries(["0", "1"], [0.1, 0.2], None))
+        with self.assertRaises(ValueError):
+            result.values_wh()
+
+    def test_parse_yield_series_invalid(self):
+        html_content = 'document.getElementById("labelValueId").innerHTML = "10.5Wh"'
+        self.assertIsNone(SolarFrontierWebInfoParser.parse_yield_series(html_content))
+
 class TestUnitConverter(unittest.TestCase):
 
     def setUp(self):
@@ -82,5 +141,25 @@ class TestUnitConverter(unittest.TestCase):
             with self.subTest(measurement=measurement):
                 self.assertEqual(self.converter.get_unit(measurement), expected)
 
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_parse_many(self):
+        values, codes = self.converter.parse_many(["1.5kW", "230V", "bad", "20C", "1.5kW", " 3 MWh"])
+        numpy.testing.assert_allclose(values, [1500.0, 230.0, numpy.nan, 20.0, 1500.0, 3e6])
+        self.assertEqual(codes.tolist(), [0, 1, -1, -1, 0, 4])
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_parse_many_keeps_shape(self):
+        values, codes = self.converter.parse_many([["1kWh", "2kWh"], ["3kWh", "4kWh"]])
+        self.assertEqual(values.shape, (2, 2))
+        self.assertEqual(values[1, 1], 4000.0)
+        self.assertEqual(codes.shape, (2, 2))
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_parse_many_empty(self):
+        values, codes = self.converter.parse_many([])
+        self.assertEqual(values.shape, (0,))
+        self.assertEqual(codes.dtype, numpy.int8)
+
+
 if __name__ == '__main__':
     unittest.main()